@@ -3,6 +3,8 @@ from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.metrics import MetricsRoute
+from app.core.responses import model_response
 from app.db.session import get_session
 from app.dependencies.auth import get_current_admin
 from app.models.admin import Admin
@@ -14,13 +16,15 @@ from app.schema.user_purchased_package import UserPurchasedPackageCreate, UserPu
 from app.schema.wallet import WithdrawalStatusUpdate, AdminWithdrawalListResponse
 
 from app.service.admin_service import AdminService
-from app.schema.propfirm_registration import PropFirmRegistrationRead, PropFirmRegistrationUpdate
+from app.schema.propfirm_registration import (
+    PropFirmRegistrationRead, PropFirmRegistrationUpdate, BulkChallengeResultRequest, BulkChallengeResultResponse
+)
 from app.service.propfirm_registration_service import PropFirmRegistrationService
 from uuid import UUID
 from app.service.mail import send_email
 from app.models.user import User
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
 
 
 @router.post("", response_model=AdminRead)
@@ -67,7 +71,7 @@ async def read_users(
 ) -> Any:
     service = AdminService(session)
     users = await service.get_all_users()
-    return users
+    return model_response(List[UserRead], users)
 
 
 @router.get("/transactions", response_model=List[TransactionRead])
@@ -76,7 +80,7 @@ async def read_transactions(
     session: AsyncSession = Depends(get_session),
 ) -> Any:
     service = AdminService(session)
-    return await service.get_all_transactions()
+    return model_response(List[TransactionRead], await service.get_all_transactions())
 
 
 @router.get("/prop-firms", response_model=List[PropFirmRegistrationRead])
@@ -85,7 +89,7 @@ async def read_prop_firms(
     session: AsyncSession = Depends(get_session),
 ) -> Any:
     service = AdminService(session)
-    return await service.get_all_prop_firm_registrations()
+    return model_response(List[PropFirmRegistrationRead], await service.get_all_prop_firm_registrations())
 
 
 @router.put("/users/{user_id}", response_model=UserRead)
@@ -116,6 +120,19 @@ async def update_propfirm_registration(
         raise HTTPException(status_code=404, detail="Registration not found")
     return registration
 
+@router.post("/prop-firm/challenge-results", response_model=BulkChallengeResultResponse)
+async def bulk_update_challenge_results(
+    results_in: BulkChallengeResultRequest,
+    background_tasks: BackgroundTasks,
+    current_admin: Admin = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session),
+) -> Any:
+    """
+    Apply many challenge outcomes in one transaction; releases locked referral earnings of passed accounts.
+    """
+    service = PropFirmRegistrationService(session)
+    return await service.apply_challenge_results(results_in.results, background_tasks)
+
 @router.post("/packages", response_model=UserPurchasedPackageRead)
 async def assign_package_to_user(
     package_in: UserPurchasedPackageCreate,
@@ -159,7 +176,8 @@ async def list_all_withdrawals(
     """
     from app.service.wallet_service import WalletService
     service = WalletService(session)
-    return await service.get_all_withdrawals(status=status, limit=limit, offset=page * limit)
+    withdrawals = await service.get_all_withdrawals(status=status, limit=limit, offset=page * limit)
+    return model_response(AdminWithdrawalListResponse, withdrawals)
 
 
 @router.patch("/withdrawals/{withdrawal_id}", response_model=Any)
@@ -1,9 +1,11 @@
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.http_cache import make_etag, not_modified
+from app.core.metrics import MetricsRoute
 from app.db.session import get_session
 from app.dependencies.auth import get_current_admin
 from app.models.admin import Admin
@@ -14,7 +16,7 @@ from app.schema.affiliate_admin import (
 )
 from app.service.affiliate_admin_service import AffiliateAdminService
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
 
 @router.get("/dashboard", response_model=AffiliateDashboardStats)
 async def get_dashboard_stats(
@@ -46,12 +48,20 @@ async def get_product_stats(
 
 @router.get("/settings/global", response_model=GlobalSettingsResponse)
 async def get_global_settings(
+    request: Request,
+    response: Response,
     current_admin: Admin = Depends(get_current_admin),
     session: AsyncSession = Depends(get_session)
 ):
     """Get global affiliate settings"""
     service = AffiliateAdminService(session)
-    return await service.get_global_settings()
+    global_settings = await service.get_global_settings()
+    etag = make_etag(
+        global_settings.default_commission_rate, global_settings.minimum_withdrawal_amount,
+        global_settings.is_program_enabled
+    )
+    cached = not_modified(request, response, etag, "private, no-cache")
+    return cached or global_settings
 
 @router.patch("/settings/global", response_model=GlobalSettingsResponse)
 async def update_global_settings(
@@ -1,7 +1,7 @@
 from datetime import timedelta
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Request, status, BackgroundTasks
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import selectinload
 from sqlmodel import select
@@ -9,21 +9,25 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
 from app.core import security
+from app.core.metrics import MetricsRoute
+from app.core.rate_limit import limiter, enforce_limit, LOGIN_LIMIT
 from app.db.session import get_session
 from app.models.user import User
 from app.models.admin import Admin
 from app.schema.auth import Token
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
 
 
 @router.post("/login/access-token", response_model=Token)
+@limiter.limit(settings.RATE_LIMIT_LOGIN)
 async def login_access_token(
-    session: AsyncSession = Depends(get_session), form_data: OAuth2PasswordRequestForm = Depends()
+    request: Request, session: AsyncSession = Depends(get_session), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
+    enforce_limit(LOGIN_LIMIT, "login", form_data.username)
     query = select(User).where(User.email == form_data.username)
     result = await session.exec(query)
     user = result.first()
@@ -47,12 +51,14 @@ async def login_access_token(
 
 
 @router.post("/login/admin/access-token", response_model=Token)
+@limiter.limit(settings.RATE_LIMIT_LOGIN)
 async def login_admin_access_token(
-    session: AsyncSession = Depends(get_session), form_data: OAuth2PasswordRequestForm = Depends()
+    request: Request, session: AsyncSession = Depends(get_session), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login for admins
     """
+    enforce_limit(LOGIN_LIMIT, "admin-login", form_data.username)
     query = select(Admin).where(Admin.email == form_data.username)
     result = await session.exec(query)
     admin = result.first()
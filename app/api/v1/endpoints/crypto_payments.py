@@ -1,9 +1,11 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Header, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Header, BackgroundTasks
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.http_cache import make_etag, not_modified
+from app.core.metrics import MetricsRoute
 from app.db.session import get_session
 from app.dependencies.auth import get_current_user
 from app.models.user import User
@@ -14,8 +16,9 @@ from app.schema.crypto_payment import (
     NOWPaymentsIPNPayload,
 )
 from app.service.nowpayments_service import NOWPaymentsService
+from app.service.idempotency_service import IDEMPOTENCY_HEADER, run_idempotent
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
 
 
 @router.get("/status")
@@ -29,12 +32,15 @@ async def get_api_status(
 
 @router.get("/currencies")
 async def get_available_currencies(
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session),
 ):
     """Get list of available cryptocurrencies"""
     service = NOWPaymentsService(session)
     currencies = await service.get_available_currencies()
-    return {"currencies": currencies}
+    cached = not_modified(request, response, make_etag(*currencies), "public, max-age=3600")
+    return cached or {"currencies": currencies}
 
 
 @router.get("/min-amount")
@@ -87,10 +93,18 @@ async def create_payment(
     payment_data: NOWPaymentsPaymentRequest,
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
 ):
-    """Create a direct payment (white-label flow)"""
+    """Create a direct payment (white-label flow). Retries with the same Idempotency-Key replay the first result."""
     service = NOWPaymentsService(session)
-    return await service.create_payment(payment_data, current_user.id)
+    user_id = current_user.id
+    return await run_idempotent(
+        idempotency_key,
+        f"crypto_payments.payment:{user_id}",
+        payment_data,
+        lambda: service.create_payment(payment_data, user_id),
+        CryptoPaymentRead
+    )
 
 
 @router.get("/payment/{payment_id}/status")
@@ -146,7 +160,8 @@ async def ipn_callback(
     """
     IPN webhook endpoint for NOWPayments callbacks.
     This endpoint does not require authentication.
-    Handles payment status updates and triggers background tasks for notifications.
+    The payment update and its completion side effects (registration status, referral earning,
+    notification) are committed in one transaction; emails are sent as background tasks.
     """
     if not x_nowpayments_sig:
         raise HTTPException(status_code=400, detail="Missing signature header")
@@ -162,132 +177,16 @@ async def ipn_callback(
         service = NOWPaymentsService(session)
         updated_payment = await service.process_ipn_callback(
             payload=ipn_payload,
-            signature=x_nowpayments_sig
-        )
-
-        if not updated_payment:
-            raise HTTPException(status_code=404, detail="Payment not found")
-
-        # Add background task for notifications and additional processing
-        background_tasks.add_task(
-            process_payment_update,
-            payment_id=updated_payment.id,
-            payment_status=updated_payment.payment_status,
-            user_id=updated_payment.user_id
+            signature=x_nowpayments_sig,
+            raw_body=body,
+            background_tasks=background_tasks
         )
-
-        return {"status": "ok", "payment_id": str(updated_payment.id)}
-
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+    if not updated_payment:
+        raise HTTPException(status_code=404, detail="Payment not found")
 
-async def process_payment_update(payment_id: UUID, payment_status: str, user_id: UUID):
-    """
-    Background task to process payment updates.
-    Add your business logic here for:
-    - Sending email notifications
-    - Updating order status
-    - Triggering fulfillment
-    - Updating inventory
-    - Notifying admins
-    """
-    from app.service.mail import send_email
-    from app.config import settings
-    from app.db.session import async_session_maker
-    from app.models.user import User
-
-    # Get user details
-    async with async_session_maker() as session:
-        user = await session.get(User, user_id)
-        if not user:
-            return
-
-        user_email = user.email
-        user_name = user.name
-
-    # Send email notification based on payment status
-    if payment_status == "finished":
-        # Payment successful - send confirmation
-        await send_email(
-            email_to=user_email,
-            subject="Payment Successful - Crypto Payment Confirmed",
-            template_name="crypto_payment_success.html",
-            context={
-                "user_name": user_name,
-                "payment_id": str(payment_id),
-                "status": payment_status
-            }
-        )
-
-        # Notify admin
-        if settings.ADMIN_EMAIL:
-            await send_email(
-                email_to=settings.ADMIN_EMAIL,
-                subject="New Crypto Payment Received",
-                template_name="admin_crypto_payment_received.html",
-                context={
-                    "user_email": user_email,
-                    "payment_id": str(payment_id),
-                    "status": payment_status
-                }
-            )
-
-    elif payment_status == "partially_paid":
-        # Partially paid - notify user
-        await send_email(
-            email_to=user_email,
-            subject="Payment Partially Received",
-            template_name="crypto_payment_partial.html",
-            context={
-                "user_name": user_name,
-                "payment_id": str(payment_id),
-                "status": payment_status
-            }
-        )
-
-    elif payment_status == "failed":
-        # Payment failed - send notification
-        await send_email(
-            email_to=user_email,
-            subject="Payment Failed",
-            template_name="crypto_payment_failed.html",
-            context={
-                "user_name": user_name,
-                "payment_id": str(payment_id),
-                "status": payment_status
-            }
-        )
-
-    # Add your additional business logic here:
-    # - Update related orders
-    # - Trigger product delivery
-    # - Update user subscriptions
-    # - Log analytics events
-    # etc.
-
-    # Update propfirm registration payment status if order_id is present
-    if payment_status in ["finished", "failed"]:
-        async with async_session_maker() as session:
-            from app.models.crypto_payment import CryptoPayment
-            from app.service.propfirm_registration_service import PropFirmRegistrationService
-            from app.repository.propfirm_registration_repo import PropFirmRegistrationRepository
-            from app.models.propfirm_registration import PropFirmRegistration, PaymentStatus
-            from app.schema.propfirm_registration import PropFirmRegistrationUpdate
-
-            # Get the crypto payment to find the order_id
-            crypto_payment = await session.get(CryptoPayment, payment_id)
-            if crypto_payment and crypto_payment.order_id:
-                # Find propfirm registration by order_id
-                propfirm_repo = PropFirmRegistrationRepository(PropFirmRegistration, session)
-                registration = await propfirm_repo.get_by_order_id(crypto_payment.order_id)
-
-                if registration:
-                    # Update payment status based on payment result
-                    new_payment_status = PaymentStatus.completed if payment_status == "finished" else PaymentStatus.failed
-
-                    update_data = PropFirmRegistrationUpdate(payment_status=new_payment_status)
-                    await propfirm_repo.update(db_obj=registration, obj_in=update_data.dict(exclude_unset=True))
-                    await session.commit()
+    return {"status": "ok", "payment_id": str(updated_payment.id)}
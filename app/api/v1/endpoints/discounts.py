@@ -1,9 +1,11 @@
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.http_cache import not_modified, rows_etag
+from app.core.metrics import MetricsRoute
 from app.db.session import get_session
 from app.dependencies.auth import get_current_user, get_current_admin
 from app.models.user import User
@@ -15,7 +17,7 @@ from app.schema.vat_discount import (
 )
 from app.service.vat_discount_service import VatDiscountService
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
 
 # VAT Endpoints
 @router.post("/vat", response_model=VatRead)
@@ -29,10 +31,14 @@ async def create_vat(
 
 @router.get("/vat", response_model=List[VatRead])
 async def read_vats(
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session),
 ):
     service = VatDiscountService(session)
-    return await service.get_all_vats()
+    vats = await service.get_all_vats()
+    cached = not_modified(request, response, rows_etag(vats), "public, max-age=300")
+    return cached or vats
 
 # Discount Codes Endpoints (Admin)
 @router.post("/discounts", response_model=DiscountCodesRead)
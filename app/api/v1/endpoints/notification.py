@@ -4,13 +4,15 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.dependencies.auth import get_current_user, get_current_admin
+from app.core.metrics import MetricsRoute
+from app.core.responses import model_response
 from app.db.session import get_session
 from app.models.user import User
 from app.models.admin import Admin
 from app.schema.notification import NotificationRead
 from app.service.notification_service import NotificationService
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
 
 @router.get("/my-notifications", response_model=List[NotificationRead])
 async def read_my_notifications(
@@ -18,7 +20,7 @@ async def read_my_notifications(
     session: AsyncSession = Depends(get_session),
 ):
     service = NotificationService(session)
-    return await service.get_user_notifications(current_user.id)
+    return model_response(List[NotificationRead], await service.get_user_notifications(current_user.id))
 
 @router.get("/admin/notifications", response_model=List[NotificationRead])
 async def read_admin_notifications(
@@ -26,7 +28,7 @@ async def read_admin_notifications(
     session: AsyncSession = Depends(get_session),
 ):
     service = NotificationService(session)
-    return await service.get_admin_notifications(current_admin.id)
+    return model_response(List[NotificationRead], await service.get_admin_notifications(current_admin.id))
 
 @router.put("/{notification_id}/read", response_model=NotificationRead)
 async def mark_notification_as_read(
@@ -4,13 +4,14 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.metrics import MetricsRoute
 from app.db.session import get_session
 from app.dependencies.auth import get_current_user
 from app.models.user import User
 from app.schema.payment import PaymentCreate, PaymentRead
 from app.service.payment_service import PaymentService
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
 
 @router.post("", response_model=PaymentRead)
 async def create_payment(
@@ -1,23 +1,25 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Header
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.metrics import MetricsRoute
 from app.db.session import get_session
 from app.dependencies.auth import get_current_user
 from app.models.user import User
 from app.schema.propfirm_registration import PropFirmRegistrationCreate, PropFirmRegistrationRead
 from app.service.propfirm_registration_service import PropFirmRegistrationService
+from app.service.idempotency_service import IDEMPOTENCY_HEADER, run_idempotent
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
 
 async def create_registration_notification(user_id: UUID, propfirm_name: str, order_id: str):
     """Background task to create notification for new registration"""
-    from app.db.session import async_session_maker
+    from app.db.session import AsyncSessionLocal
     from app.service.notification_service import NotificationService
 
-    async with async_session_maker() as session:
+    async with AsyncSessionLocal() as session:
         notification_service = NotificationService(session)
         await notification_service.create_registration_created_notification(
             user_id=user_id,
@@ -32,22 +34,28 @@ async def create_propfirm_registration(
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
     background_tasks: BackgroundTasks = BackgroundTasks(),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
 ):
     # Extract user_id early to avoid greenlet issues
     user_id = current_user.id
 
-    service = PropFirmRegistrationService(session)
-    new_registration = await service.create_registration(registration, user_id)
+    async def create():
+        service = PropFirmRegistrationService(session)
+        new_registration = await service.create_registration(registration, user_id)
 
-    # Schedule notification creation as background task to avoid session issues
-    background_tasks.add_task(
-        create_registration_notification,
-        user_id=user_id,
-        propfirm_name=new_registration.propfirm_name,
-        order_id=new_registration.order_id
-    )
+        # Schedule notification creation as background task to avoid session issues
+        background_tasks.add_task(
+            create_registration_notification,
+            user_id=user_id,
+            propfirm_name=new_registration.propfirm_name,
+            order_id=new_registration.order_id
+        )
+
+        return new_registration
 
-    return new_registration
+    return await run_idempotent(
+        idempotency_key, f"prop_firm.create:{user_id}", registration, create, PropFirmRegistrationRead
+    )
 
 @router.get("", response_model=List[PropFirmRegistrationRead])
 async def read_propfirm_registrations(
@@ -1,11 +1,17 @@
+import asyncio
+import json
+from datetime import datetime
 from typing import Any, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, BackgroundTasks, Query, HTTPException, status
+from fastapi import APIRouter, Depends, BackgroundTasks, Query, HTTPException, WebSocket, WebSocketDisconnect, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db.session import get_session
-from app.dependencies.auth import get_current_user, get_current_admin
+from app.config import settings
+
+from app.core.metrics import MetricsRoute
+from app.db.session import get_session, AsyncSessionLocal
+from app.dependencies.auth import get_current_user, get_current_admin, get_user_from_token, get_admin_from_token
 from app.models.admin import Admin
 from app.models.user import User
 from app.models.support import TicketStatus, SenderType
@@ -13,11 +19,13 @@ from app.schema.support import (
     SupportCreate, SupportRead,
     SupportTicketCreate, SupportTicketRead, SupportTicketListItem,
     SupportMessageCreate, SupportMessageRead,
-    PaginatedTicketResponse, TicketStatusUpdate
+    PaginatedTicketResponse, PaginatedMessageResponse, TicketStatusUpdate
 )
-from app.service.support_service import SupportService, SupportTicketService
+from app.service.support_service import SupportService, SupportTicketService, MESSAGE_PAGE_SIZE
+from app.service.support_chat_service import SupportChatService
+from app.repository.support_repo import SupportTicketRepository
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
 
 
 # ============= User Ticket Endpoints =============
@@ -65,7 +73,7 @@ async def get_ticket_details(
     session: AsyncSession = Depends(get_session),
 ) -> Any:
     """
-    Get ticket details with all messages.
+    Get ticket details with the latest page of messages.
     """
     service = SupportTicketService(session)
     return await service.get_ticket_details(
@@ -75,6 +83,29 @@ async def get_ticket_details(
     )
 
 
+@router.get("/tickets/{ticket_id}/messages", response_model=PaginatedMessageResponse)
+async def get_ticket_messages(
+    ticket_id: UUID,
+    before: Optional[datetime] = Query(None, description="Only messages sent before this time"),
+    before_id: Optional[UUID] = Query(None, description="With `before`: the page's oldest message id (next_before_id)"),
+    limit: int = Query(MESSAGE_PAGE_SIZE, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+) -> Any:
+    """
+    Get a page of a ticket's message history, oldest first.
+    """
+    service = SupportTicketService(session)
+    return await service.get_ticket_messages(
+        ticket_id=ticket_id,
+        user_id=current_user.id,
+        is_admin=False,
+        before=before,
+        limit=limit,
+        before_id=before_id
+    )
+
+
 @router.post("/tickets/{ticket_id}/messages", response_model=SupportMessageRead)
 async def send_message(
     ticket_id: UUID,
@@ -116,6 +147,35 @@ async def get_all_tickets(
     )
 
 
+@router.get("/admin/tickets/awaiting-reply", response_model=PaginatedTicketResponse)
+async def get_tickets_awaiting_reply(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_admin: Admin = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session),
+) -> Any:
+    """
+    Open tickets whose latest message is from the user, longest waiting first (Admin only).
+    """
+    service = SupportTicketService(session)
+    return await service.get_awaiting_reply(skip=skip, limit=limit)
+
+
+@router.get("/admin/tickets/search", response_model=PaginatedTicketResponse)
+async def search_tickets(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_admin: Admin = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session),
+) -> Any:
+    """
+    Full-text search over ticket subjects, messages and user emails (Admin only).
+    """
+    service = SupportTicketService(session)
+    return await service.search_tickets(query=q, skip=skip, limit=limit)
+
+
 @router.get("/admin/tickets/{ticket_id}", response_model=SupportTicketRead)
 async def admin_get_ticket_details(
     ticket_id: UUID,
@@ -132,6 +192,28 @@ async def admin_get_ticket_details(
     )
 
 
+@router.get("/admin/tickets/{ticket_id}/messages", response_model=PaginatedMessageResponse)
+async def admin_get_ticket_messages(
+    ticket_id: UUID,
+    before: Optional[datetime] = Query(None, description="Only messages sent before this time"),
+    before_id: Optional[UUID] = Query(None, description="With `before`: the page's oldest message id (next_before_id)"),
+    limit: int = Query(MESSAGE_PAGE_SIZE, ge=1, le=200),
+    current_admin: Admin = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session),
+) -> Any:
+    """
+    Get a page of a ticket's message history (Admin only).
+    """
+    service = SupportTicketService(session)
+    return await service.get_ticket_messages(
+        ticket_id=ticket_id,
+        is_admin=True,
+        before=before,
+        limit=limit,
+        before_id=before_id
+    )
+
+
 @router.post("/admin/tickets/{ticket_id}/messages", response_model=SupportMessageRead)
 async def admin_send_message(
     ticket_id: UUID,
@@ -169,6 +251,71 @@ async def update_ticket_status(
     )
 
 
+# ============= Live Chat =============
+
+# Policy violation close code, sent when authentication or the ticket access check fails
+WS_ACCESS_DENIED = 1008
+
+
+async def _receive_auth_token(websocket: WebSocket) -> Optional[str]:
+    """
+    The access token from the socket's first frame, {"type": "auth", "token": "..."}. None when
+    that frame is not an auth frame or does not arrive within SUPPORT_WS_AUTH_TIMEOUT seconds.
+    The token travels inside the socket rather than in the URL, which ends up in access logs.
+    """
+    try:
+        data = json.loads(await asyncio.wait_for(websocket.receive_text(), settings.SUPPORT_WS_AUTH_TIMEOUT))
+    except (asyncio.TimeoutError, KeyError, ValueError):
+        # No frame in time, a binary frame, or text that is not JSON
+        return None
+    if not isinstance(data, dict) or data.get("type") != "auth" or not isinstance(data.get("token"), str):
+        return None
+    return data["token"]
+
+
+async def _open_ticket_chat(websocket: WebSocket, ticket_id: UUID, is_admin: bool) -> None:
+    await websocket.accept()
+    try:
+        token = await _receive_auth_token(websocket)
+    except WebSocketDisconnect:
+        return
+
+    sender = ticket = None
+    if token:
+        # Authenticate once with a short-lived session; no connection is held for the socket's lifetime
+        async with AsyncSessionLocal() as session:
+            if is_admin:
+                sender = await get_admin_from_token(session, token)
+            else:
+                sender = await get_user_from_token(session, token)
+            ticket = await SupportTicketRepository(session).get_ticket_by_id(ticket_id) if sender else None
+
+    if not sender or not ticket or (not is_admin and ticket.user_id != sender.id):
+        await websocket.close(code=WS_ACCESS_DENIED)
+        return
+
+    sender_type = SenderType.ADMIN if is_admin else SenderType.USER
+    await SupportChatService(websocket, ticket_id, sender.id, sender_type).run()
+
+
+@router.websocket("/tickets/{ticket_id}/ws")
+async def ticket_chat(websocket: WebSocket, ticket_id: UUID):
+    """
+    Live chat on the current user's ticket. The first frame must be
+    {"type": "auth", "token": "<access token>"}; the server answers {"type": "ready"}.
+    """
+    await _open_ticket_chat(websocket, ticket_id, is_admin=False)
+
+
+@router.websocket("/admin/tickets/{ticket_id}/ws")
+async def admin_ticket_chat(websocket: WebSocket, ticket_id: UUID):
+    """
+    Live chat on any ticket (Admin only). The first frame must be
+    {"type": "auth", "token": "<admin access token>"}; the server answers {"type": "ready"}.
+    """
+    await _open_ticket_chat(websocket, ticket_id, is_admin=True)
+
+
 # ============= Legacy Endpoints (for backward compatibility) =============
 
 @router.post("/", response_model=SupportRead)
@@ -4,13 +4,14 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.metrics import MetricsRoute
 from app.db.session import get_session
 from app.dependencies.auth import get_current_user
 from app.models.user import User
 from app.schema.transactions import TransactionCreate, TransactionRead
 from app.service.transactions_service import TransactionService
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
 
 @router.post("", response_model=TransactionRead)
 async def create_transaction(
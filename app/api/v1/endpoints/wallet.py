@@ -1,22 +1,25 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, status
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Header, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.metrics import MetricsRoute
+from app.core.responses import model_response
 from app.db.session import get_session
 from app.dependencies.auth import get_current_user, get_current_admin
 from app.models.user import User
 from app.models.admin import Admin
 from app.models.wallet import WithdrawalStatus
 from app.service.wallet_service import WalletService
+from app.service.idempotency_service import IDEMPOTENCY_HEADER, run_idempotent
 from app.schema.wallet import (
     WalletResponse, WalletSummaryResponse, ReferralEarningResponse,
     ReferralEarningsListResponse, WithdrawalCreate, WithdrawalResponse,
     WithdrawalListResponse, WithdrawalStatusUpdate, UnlockEarningRequest
 )
 
-router = APIRouter()
+router = APIRouter(route_class=MetricsRoute)
 
 
 @router.get("", response_model=WalletResponse)
@@ -26,16 +29,7 @@ async def get_wallet(
 ):
     """Get user's wallet balance"""
     service = WalletService(db)
-    wallet = await service.get_wallet(current_user.id)
-    return WalletResponse(
-        id=wallet.id,
-        user_id=wallet.user_id,
-        available_balance=float(wallet.available_balance),
-        locked_balance=float(wallet.locked_balance),
-        total_withdrawn=float(wallet.total_withdrawn),
-        created_at=wallet.created_at,
-        updated_at=wallet.updated_at
-    )
+    return await service.get_wallet_balance(current_user.id)
 
 
 @router.get("/summary", response_model=WalletSummaryResponse)
@@ -111,39 +105,46 @@ async def request_withdrawal(
     withdrawal_data: WithdrawalCreate,
     background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)
 ):
-    """Request a withdrawal (minimum $100)"""
+    """Request a withdrawal (minimum $100). Retries with the same Idempotency-Key replay the first result."""
     service = WalletService(db)
-
-    try:
-        withdrawal = await service.request_withdrawal(
-            user_id=current_user.id,
-            withdrawal_data=withdrawal_data,
-            background_tasks=background_tasks
-        )
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
+    user_id = current_user.id
+
+    async def withdraw():
+        try:
+            withdrawal = await service.request_withdrawal(
+                user_id=user_id,
+                withdrawal_data=withdrawal_data,
+                background_tasks=background_tasks
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+        return WithdrawalResponse(
+            id=withdrawal.id,
+            wallet_id=withdrawal.wallet_id,
+            amount=float(withdrawal.amount),
+            payment_method=withdrawal.payment_method,
+            status=withdrawal.status,
+            bank_name=withdrawal.bank_name,
+            account_number=withdrawal.account_number,
+            account_name=withdrawal.account_name,
+            crypto_wallet_address=withdrawal.crypto_wallet_address,
+            crypto_network=withdrawal.crypto_network,
+            crypto_currency=withdrawal.crypto_currency,
+            paypal_email=withdrawal.paypal_email,
+            admin_notes=withdrawal.admin_notes,
+            created_at=withdrawal.created_at,
+            processed_at=withdrawal.processed_at
         )
 
-    return WithdrawalResponse(
-        id=withdrawal.id,
-        wallet_id=withdrawal.wallet_id,
-        amount=float(withdrawal.amount),
-        payment_method=withdrawal.payment_method,
-        status=withdrawal.status,
-        bank_name=withdrawal.bank_name,
-        account_number=withdrawal.account_number,
-        account_name=withdrawal.account_name,
-        crypto_wallet_address=withdrawal.crypto_wallet_address,
-        crypto_network=withdrawal.crypto_network,
-        crypto_currency=withdrawal.crypto_currency,
-        paypal_email=withdrawal.paypal_email,
-        admin_notes=withdrawal.admin_notes,
-        created_at=withdrawal.created_at,
-        processed_at=withdrawal.processed_at
+    return await run_idempotent(
+        idempotency_key, f"wallet.withdraw:{user_id}", withdrawal_data, withdraw, WithdrawalResponse
     )
 
 
@@ -156,27 +157,9 @@ async def get_withdrawals(
     service = WalletService(db)
     withdrawals = await service.get_withdrawals(current_user.id)
 
-    return WithdrawalListResponse(
-        withdrawals=[
-            WithdrawalResponse(
-                id=w.id,
-                wallet_id=w.wallet_id,
-                amount=float(w.amount),
-                payment_method=w.payment_method,
-                status=w.status,
-                bank_name=w.bank_name,
-                account_number=w.account_number,
-                account_name=w.account_name,
-                crypto_wallet_address=w.crypto_wallet_address,
-                crypto_network=w.crypto_network,
-                crypto_currency=w.crypto_currency,
-                paypal_email=w.paypal_email,
-                admin_notes=w.admin_notes,
-                created_at=w.created_at,
-                processed_at=w.processed_at
-            ) for w in withdrawals
-        ],
-        total_count=len(withdrawals)
+    return model_response(
+        WithdrawalListResponse,
+        {"withdrawals": withdrawals, "total_count": len(withdrawals)}
     )
 
 
@@ -231,25 +214,7 @@ async def get_pending_withdrawals(
     service = WalletService(db)
     withdrawals = await service.get_pending_withdrawals()
 
-    return WithdrawalListResponse(
-        withdrawals=[
-            WithdrawalResponse(
-                id=w.id,
-                wallet_id=w.wallet_id,
-                amount=float(w.amount),
-                payment_method=w.payment_method,
-                status=w.status,
-                bank_name=w.bank_name,
-                account_number=w.account_number,
-                account_name=w.account_name,
-                crypto_wallet_address=w.crypto_wallet_address,
-                crypto_network=w.crypto_network,
-                crypto_currency=w.crypto_currency,
-                paypal_email=w.paypal_email,
-                admin_notes=w.admin_notes,
-                created_at=w.created_at,
-                processed_at=w.processed_at
-            ) for w in withdrawals
-        ],
-        total_count=len(withdrawals)
+    return model_response(
+        WithdrawalListResponse,
+        {"withdrawals": withdrawals, "total_count": len(withdrawals)}
     )
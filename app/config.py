@@ -13,6 +13,11 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
 
     DB_URI: str | None = os.getenv("DB_URI")
+    # "production" manages the schema with Alembic only (`alembic upgrade head` on deploy);
+    # elsewhere init_db creates missing tables on startup
+    ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
+    # Log every SQL statement (through the logging queue)
+    DB_ECHO: bool = os.getenv("DB_ECHO", "true").lower() == "true"
 
     @property
     def db_uri(self) -> str:
@@ -46,6 +51,82 @@ class Settings(BaseSettings):
     NOWPAYMENTS_API_KEY: str | None = os.getenv("NOWPAYMENTS_API_KEY")
     NOWPAYMENTS_IPN_SECRET: str | None = os.getenv("NOWPAYMENTS_IPN_SECRET")
     NOWPAYMENTS_API_URL: str = os.getenv("NOWPAYMENTS_API_URL", "https://api.nowpayments.io/v1")
+    NOWPAYMENTS_IPN_CALLBACK_URL: str | None = os.getenv("NOWPAYMENTS_IPN_CALLBACK_URL")
+
+    # NOWPayments client resilience
+    NOWPAYMENTS_TIMEOUT: float = float(os.getenv("NOWPAYMENTS_TIMEOUT", "10"))
+    NOWPAYMENTS_CONNECT_TIMEOUT: float = float(os.getenv("NOWPAYMENTS_CONNECT_TIMEOUT", "3"))
+    # Per-endpoint overrides, e.g. "payout=30,status=3"
+    NOWPAYMENTS_ENDPOINT_TIMEOUTS: str = os.getenv("NOWPAYMENTS_ENDPOINT_TIMEOUTS", "")
+    NOWPAYMENTS_MAX_RETRIES: int = int(os.getenv("NOWPAYMENTS_MAX_RETRIES", "2"))
+    NOWPAYMENTS_BACKOFF_BASE: float = float(os.getenv("NOWPAYMENTS_BACKOFF_BASE", "0.25"))
+    NOWPAYMENTS_BACKOFF_MAX: float = float(os.getenv("NOWPAYMENTS_BACKOFF_MAX", "2"))
+    NOWPAYMENTS_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("NOWPAYMENTS_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    NOWPAYMENTS_CIRCUIT_RESET_TIMEOUT: float = float(os.getenv("NOWPAYMENTS_CIRCUIT_RESET_TIMEOUT", "30"))
+
+    # Live events shared between workers: memory:// (single worker), redis://host:6379/0 or a postgresql:// DSN
+    PUBSUB_URL: str = os.getenv("PUBSUB_URL", "memory://")
+    # Seconds a new support chat socket has to send its auth frame
+    SUPPORT_WS_AUTH_TIMEOUT: float = float(os.getenv("SUPPORT_WS_AUTH_TIMEOUT", "10"))
+
+    # Stale crypto payment sweeper (interval 0 disables it)
+    CRYPTO_PAYMENT_SWEEP_INTERVAL: int = int(os.getenv("CRYPTO_PAYMENT_SWEEP_INTERVAL", "900"))
+    CRYPTO_PAYMENT_STALE_AFTER_MINUTES: int = int(os.getenv("CRYPTO_PAYMENT_STALE_AFTER_MINUTES", "1440"))
+    CRYPTO_PAYMENT_SWEEP_BATCH_SIZE: int = int(os.getenv("CRYPTO_PAYMENT_SWEEP_BATCH_SIZE", "200"))
+    # Ask NOWPayments for the final status before expiring a payment
+    CRYPTO_PAYMENT_SWEEP_CONFIRM: bool = os.getenv("CRYPTO_PAYMENT_SWEEP_CONFIRM", "true").lower() == "true"
+    CRYPTO_PAYMENT_SWEEP_CONCURRENCY: int = int(os.getenv("CRYPTO_PAYMENT_SWEEP_CONCURRENCY", "10"))
+
+    # Affiliate settings cache: entry TTL (0 disables) and how often each worker checks for updates
+    AFFILIATE_SETTINGS_CACHE_TTL: float = float(os.getenv("AFFILIATE_SETTINGS_CACHE_TTL", "300"))
+    AFFILIATE_SETTINGS_CACHE_VERSION_CHECK: float = float(os.getenv("AFFILIATE_SETTINGS_CACHE_VERSION_CHECK", "5"))
+
+    # Per-user /users/referrals cache, in seconds (0 disables)
+    REFERRAL_STATS_CACHE_TTL: float = float(os.getenv("REFERRAL_STATS_CACHE_TTL", "60"))
+
+    # Idempotency-Key handling: how long keys are kept, how long a duplicate waits for the first request
+    IDEMPOTENCY_KEY_TTL_HOURS: int = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+    IDEMPOTENCY_WAIT_TIMEOUT: float = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "30"))
+    IDEMPOTENCY_PURGE_INTERVAL: float = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "3600"))
+
+    # Wallet ledger drift check: interval in seconds (0 disables it) and wallets per query
+    WALLET_LEDGER_VERIFY_INTERVAL: int = int(os.getenv("WALLET_LEDGER_VERIFY_INTERVAL", "86400"))
+    WALLET_LEDGER_VERIFY_BATCH_SIZE: int = int(os.getenv("WALLET_LEDGER_VERIFY_BATCH_SIZE", "500"))
+
+    # Logging: "text" or "json" lines, and the share of INFO records kept per logger, e.g. "app.requests=0.1"
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text").lower()
+    LOG_SAMPLE_RATES: str = os.getenv("LOG_SAMPLE_RATES", "")
+
+    # Rate limits, counted in storage shared by all workers: sqlite:///path (one host),
+    # redis://host:6379/1 (any Redis-protocol server, needs the redis package) or memory:// (per process)
+    RATE_LIMIT_STORAGE_URI: str = os.getenv("RATE_LIMIT_STORAGE_URI", "sqlite:///./ratelimit.db")
+    RATE_LIMIT_DEFAULT: str = os.getenv("RATE_LIMIT_DEFAULT", "100/minute")
+    # Login and signup: per client address and route, and per account/email whatever the address
+    RATE_LIMIT_LOGIN: str = os.getenv("RATE_LIMIT_LOGIN", "20/minute")
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: str = os.getenv("RATE_LIMIT_LOGIN_PER_ACCOUNT", "10/15minutes")
+    RATE_LIMIT_SIGNUP: str = os.getenv("RATE_LIMIT_SIGNUP", "5/minute")
+    RATE_LIMIT_SIGNUP_PER_EMAIL: str = os.getenv("RATE_LIMIT_SIGNUP_PER_EMAIL", "3/hour")
+
+    # Production ASGI server (app/server.py, gunicorn.conf.py); WEB_CONCURRENCY 0 means 2 x CPUs + 1
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = int(os.getenv("PORT", "8000"))
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "0"))
+    SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", "2048"))
+    SERVER_KEEPALIVE: int = int(os.getenv("SERVER_KEEPALIVE", "5"))
+    # Comma separated proxy addresses whose X-Forwarded-* headers are trusted
+    FORWARDED_ALLOW_IPS: str = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+    # Per-worker warm-up before serving (app/service/warmup.py): DB connections to pre-open
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_DB_CONNECTIONS: int = int(os.getenv("WARMUP_DB_CONNECTIONS", "5"))
+
+    # Who may scrape GET /metrics: a bearer token, and/or comma separated client addresses or networks
+    # (as seen after FORWARDED_ALLOW_IPS proxies). With neither set, /metrics answers 404.
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+    METRICS_ALLOWED_IPS: str = os.getenv("METRICS_ALLOWED_IPS", "")
+
+    # Warn when one request runs the same statement shape more than this many times (0 disables)
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = int(os.getenv("SQL_REPEATED_STATEMENT_THRESHOLD", "10"))
 
     class Config:
         env_file = ".env"
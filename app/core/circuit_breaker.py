@@ -0,0 +1,74 @@
+import time
+from enum import Enum
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    - CLOSED: calls go through; `failure_threshold` consecutive failures open it.
+    - OPEN: calls fail fast until `reset_timeout` seconds have passed.
+    - HALF_OPEN: a single trial call is let through; success closes, failure re-opens.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = CircuitState.CLOSED
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call must not be attempted"""
+        state = self.state
+        if state == CircuitState.OPEN:
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        if state == CircuitState.HALF_OPEN:
+            if self._trial_in_flight:
+                raise CircuitOpenError(f"{self.name} circuit is half-open, trial call in flight")
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._trial_in_flight = False
+        self._state = CircuitState.CLOSED
+
+    def record_failure(self) -> None:
+        self._trial_in_flight = False
+        if self._state == CircuitState.HALF_OPEN:
+            self._open()
+            return
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._open()
+
+    def release_trial(self) -> None:
+        """The call ended without a verdict on the provider (cancelled, unexpected error): let another trial through"""
+        self._trial_in_flight = False
+
+    def reset(self) -> None:
+        self._failures = 0
+        self._trial_in_flight = False
+        self._state = CircuitState.CLOSED
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
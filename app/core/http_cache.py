@@ -0,0 +1,43 @@
+"""
+Conditional GET support: strong ETags, Cache-Control and 304 Not Modified.
+
+Endpoints build the ETag from what the body is derived from (row ids and updated_at, or the
+raw upstream values) and call `not_modified` before returning; on a match the 304 goes out
+without the response model being validated or serialized.
+"""
+import hashlib
+from typing import Any, Iterable, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the string form of `parts`"""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def rows_etag(rows: Iterable[Any], *extra: Any) -> str:
+    """ETag for a list of rows that keep `updated_at` current; ids catch inserts and deletes"""
+    return make_etag(*extra, *((row.id, row.updated_at.isoformat()) for row in rows))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison (RFC 9110 13.1.2), so a W/ prefix is ignored"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """
+    Put ETag and Cache-Control on `response` (the endpoint's injected Response).
+    Returns the 304 to send instead when the client's copy is current.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    return None
@@ -1,45 +1,130 @@
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
-from logging.handlers import RotatingFileHandler
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Dict
+
+from app.config import settings
 
 # Create logs directory if it doesn't exist
 LOGS_DIR = Path("logs")
 LOGS_DIR.mkdir(exist_ok=True)
 LOG_FILE = LOGS_DIR / "app.log"
 
+# Loggers whose records go through the queue; uvicorn prints its own console lines
+QUEUED_LOGGERS = ("app", "sqlalchemy.engine.Engine", "uvicorn.access", "uvicorn.error")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler that hands the record over untouched. The stock prepare() renders the message
+    and traceback in the calling thread (the event loop); here the listener thread does it.
+    Args are therefore formatted later, so don't log objects you mutate right after.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps `rate` of the INFO-and-below records of a logger; warnings and errors always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.INFO or random.random() < self.rate
+
+
+def parse_sample_rates(raw: str) -> Dict[str, float]:
+    """
+    "app.requests=0.1,other=0.5" -> {"app.requests": 0.1, "other": 0.5}. Invalid rates are
+    skipped with a warning, so call it once the "app" logger has its handlers.
+    """
+    rates = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        try:
+            rates[name.strip()] = min(max(float(value), 0.0), 1.0)
+        except ValueError:
+            logging.getLogger("app").warning("Ignoring invalid log sample rate: %s", item)
+    return rates
+
+
 def setup_logging():
     """
     Configures logging for the application.
-    - Writes logs to logs/app.log with rotation.
-    - Writes logs to console (stdout).
+    - Log calls only enqueue the record; a QueueListener thread writes to logs/app.log
+      (with rotation) and the console (stdout).
+    - LOG_FORMAT=json switches both outputs to one JSON object per line.
+    - LOG_SAMPLE_RATES keeps a fraction of the INFO records of chosen loggers.
     """
     # Create a custom logger
     logger = logging.getLogger("app")
     logger.setLevel(logging.INFO)
 
+    # Check if handlers are already added to avoid duplicates
+    if logger.handlers:
+        return logger
+
     # Create handlers
     c_handler = logging.StreamHandler(sys.stdout)
     f_handler = RotatingFileHandler(LOG_FILE, maxBytes=10*1024*1024, backupCount=5) # 10MB, 5 backups
 
     c_handler.setLevel(logging.INFO)
     f_handler.setLevel(logging.INFO)
+    # uvicorn already prints to the console; only the file gets a copy
+    c_handler.addFilter(lambda record: not record.name.startswith("uvicorn."))
 
     # Create formatters and add it to handlers
-    log_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if settings.LOG_FORMAT == "json":
+        log_format = JsonFormatter()
+    else:
+        log_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     c_handler.setFormatter(log_format)
     f_handler.setFormatter(log_format)
 
-    # Add handlers to the logger
-    # Check if handlers are already added to avoid duplicates
-    if not logger.hasHandlers():
-        logger.addHandler(c_handler)
-        logger.addHandler(f_handler)
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, c_handler, f_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    # Engine echo output reuses this handler instead of adding its own stdout one
+    queue_handler = LazyQueueHandler(log_queue)
+    for name in QUEUED_LOGGERS:
+        logging.getLogger(name).addHandler(queue_handler)
+    logging.getLogger("sqlalchemy.engine.Engine").propagate = False
 
-    # Also configure uvicorn loggers to use our file handler
-    logging.getLogger("uvicorn.access").addHandler(f_handler)
-    logging.getLogger("uvicorn.error").addHandler(f_handler)
+    for name, rate in parse_sample_rates(settings.LOG_SAMPLE_RATES).items():
+        logging.getLogger(name).addFilter(SamplingFilter(rate))
 
     return logger
 
 logger = setup_logging()
+# One line per request, written by the log_requests middleware; the usual candidate for sampling
+request_logger = logging.getLogger("app.requests")
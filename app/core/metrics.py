@@ -0,0 +1,174 @@
+"""
+Prometheus metrics, served by GET /metrics to the scrapers METRICS_TOKEN or METRICS_ALLOWED_IPS admit.
+
+With several workers, set PROMETHEUS_MULTIPROC_DIR to an empty directory shared by them (wiped
+before start): every process then writes its samples there and /metrics aggregates all of them.
+Gauges use "livesum", so values of exited workers drop out once their files are marked dead.
+"""
+import ipaddress
+import os
+import secrets
+import time
+from typing import Callable, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.background import BackgroundTask, BackgroundTasks
+
+from app.config import settings
+
+# Outbound NOWPayments API calls
+NOWPAYMENTS_REQUEST_LATENCY = Histogram(
+    "nowpayments_request_duration_seconds",
+    "Latency of NOWPayments API calls",
+    ["endpoint", "method", "outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+NOWPAYMENTS_REQUEST_ERRORS = Counter(
+    "nowpayments_request_errors_total",
+    "NOWPayments API calls that failed, by error kind",
+    ["endpoint", "method", "error"],
+)
+NOWPAYMENTS_CIRCUIT_REJECTIONS = Counter(
+    "nowpayments_circuit_open_total",
+    "NOWPayments calls rejected because the circuit breaker was open",
+    ["endpoint"],
+)
+
+# Outbound Mailjet sends
+MAILJET_REQUEST_LATENCY = Histogram(
+    "mailjet_request_duration_seconds",
+    "Latency of Mailjet send calls",
+    ["outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+# Our own endpoints, labelled with the route template (e.g. /api/v1/wallet/earnings/{earning_id})
+HTTP_REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent in the route handler",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently in the route handler",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+BACKGROUND_TASKS_PENDING = Gauge(
+    "background_tasks_pending",
+    "Background tasks queued by responses and not finished yet",
+    multiprocess_mode="livesum",
+)
+
+# Database connection pool
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured connection pool size", multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", multiprocess_mode="livesum")
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections open beyond the pool size (negative while below it)", multiprocess_mode="livesum"
+)
+
+# In-process caches (TTLCache); hit ratio = hit / (hit + miss)
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups", ["cache", "result"])
+
+
+def _count_background(background) -> Callable:
+    """Wrap a response's background work so BACKGROUND_TASKS_PENDING follows it"""
+    tasks = list(background.tasks) if isinstance(background, BackgroundTasks) else [background]
+    BACKGROUND_TASKS_PENDING.inc(len(tasks))
+
+    async def run() -> None:
+        remaining = len(tasks)
+        try:
+            for task in tasks:
+                await task()
+                remaining -= 1
+                BACKGROUND_TASKS_PENDING.dec()
+        finally:
+            if remaining:
+                BACKGROUND_TASKS_PENDING.dec(remaining)
+
+    return run
+
+
+class MetricsRoute(APIRoute):
+    """APIRoute that records latency, in-flight requests and queued background tasks per route template"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        route = self.path_format
+
+        async def instrumented_handler(request: Request) -> Response:
+            in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method=request.method, route=route)
+            in_progress.inc()
+            start = time.perf_counter()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except RequestValidationError:
+                status = 422
+                raise
+            finally:
+                HTTP_REQUEST_LATENCY.labels(method=request.method, route=route, status=str(status)).observe(
+                    time.perf_counter() - start
+                )
+                in_progress.dec()
+            if response.background is not None:
+                response.background = BackgroundTask(_count_background(response.background))
+            return response
+
+        return instrumented_handler
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    """Keep the DB_POOL_* gauges current as connections are checked out and returned"""
+    pool = engine.sync_engine.pool
+    if not hasattr(pool, "checkedout"):
+        # StaticPool / NullPool: nothing to report
+        return
+    DB_POOL_SIZE.set(pool.size())
+
+    def update(*args) -> None:
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_OVERFLOW.set(pool.overflow())
+
+    event.listen(pool, "checkout", update)
+    event.listen(pool, "checkin", update)
+
+
+def metrics_access_allowed(request: Request) -> bool:
+    """True when the request carries METRICS_TOKEN as its bearer token or comes from METRICS_ALLOWED_IPS"""
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+            return True
+    if settings.METRICS_ALLOWED_IPS and request.client:
+        try:
+            client = ipaddress.ip_address(request.client.host)
+        except ValueError:
+            return False
+        for network in settings.METRICS_ALLOWED_IPS.split(","):
+            if network.strip() and client in ipaddress.ip_network(network.strip(), strict=False):
+                return True
+    return False
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition body and content type; aggregates every worker in multiprocess mode"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,159 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from app.config import settings
+from app.core.logging_config import logger
+
+# Postgres NOTIFY payloads must stay under 8000 bytes
+PG_NOTIFY_MAX_PAYLOAD = 7900
+
+
+class PubSub(ABC):
+    """
+    Channel based publish/subscribe used for live events (e.g. support ticket chat).
+    Subscribers in this process share one broker subscription per channel; the broker
+    (Redis or Postgres LISTEN/NOTIFY) carries events between workers.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._queues: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+
+    @abstractmethod
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """Send `message` to every subscriber of `channel`, in any worker"""
+
+    @abstractmethod
+    async def _listen(self, channel: str) -> None:
+        """Start receiving `channel` from the broker"""
+
+    @abstractmethod
+    async def _unlisten(self, channel: str) -> None:
+        """Stop receiving `channel` from the broker"""
+
+    def _deliver(self, channel: str, message: Dict[str, Any]) -> None:
+        for queue in list(self._queues.get(channel, ())):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # A subscriber that stopped reading must not hold up the others
+                logger.warning(f"Dropping event on {channel}: subscriber queue full")
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        first = not self._queues[channel]
+        self._queues[channel].add(queue)
+        try:
+            if first:
+                await self._listen(channel)
+            yield queue
+        finally:
+            self._queues[channel].discard(queue)
+            if not self._queues[channel]:
+                del self._queues[channel]
+                await self._unlisten(channel)
+
+
+class InMemoryPubSub(PubSub):
+    """Single-process pub/sub; events do not reach other workers"""
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        self._deliver(channel, message)
+
+    async def _listen(self, channel: str) -> None:
+        """Nothing to do: publish delivers straight to this process's subscribers"""
+
+    async def _unlisten(self, channel: str) -> None:
+        """Nothing to do: there is no broker subscription"""
+
+
+class RedisPubSub(PubSub):
+    """Redis pub/sub (requires the optional `redis` package)"""
+
+    def __init__(self, url: str, **kwargs):
+        super().__init__(**kwargs)
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("PUBSUB_URL points at Redis but the 'redis' package is not installed") from e
+        self._client = redis.from_url(url)
+        self._pubsub = self._client.pubsub()
+        self._reader: Optional[asyncio.Task] = None
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        await self._client.publish(channel, json.dumps(message, default=str))
+
+    async def _listen(self, channel: str) -> None:
+        await self._pubsub.subscribe(channel)
+        if not self._reader or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+
+    async def _unlisten(self, channel: str) -> None:
+        await self._pubsub.unsubscribe(channel)
+
+    async def _read(self) -> None:
+        async for item in self._pubsub.listen():
+            if item["type"] != "message":
+                continue
+            channel = item["channel"].decode() if isinstance(item["channel"], bytes) else item["channel"]
+            self._deliver(channel, json.loads(item["data"]))
+
+
+class PostgresPubSub(PubSub):
+    """Postgres LISTEN/NOTIFY on one dedicated connection; publishing goes through the app's pool"""
+
+    def __init__(self, dsn: str, **kwargs):
+        super().__init__(**kwargs)
+        self._dsn = dsn.replace("postgresql+asyncpg://", "postgresql://")
+        self._conn = None
+        self._lock = asyncio.Lock()
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        from sqlalchemy import text
+        from app.db.session import engine
+
+        payload = json.dumps(message, default=str)
+        if len(payload.encode()) > PG_NOTIFY_MAX_PAYLOAD:
+            # Too big for NOTIFY: tell subscribers to refetch instead
+            payload = json.dumps({"type": message.get("type"), "truncated": True})
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+            await conn.commit()
+
+    async def _listen(self, channel: str) -> None:
+        import asyncpg
+
+        async with self._lock:
+            if self._conn is None or self._conn.is_closed():
+                self._conn = await asyncpg.connect(self._dsn)
+            await self._conn.add_listener(channel, self._on_notify)
+
+    async def _unlisten(self, channel: str) -> None:
+        async with self._lock:
+            if self._conn is not None and not self._conn.is_closed():
+                await self._conn.remove_listener(channel, self._on_notify)
+
+    def _on_notify(self, connection, pid, channel: str, payload: str) -> None:
+        self._deliver(channel, json.loads(payload))
+
+
+_pubsub: Optional[PubSub] = None
+
+
+def get_pubsub() -> PubSub:
+    """Process-wide pub/sub selected by PUBSUB_URL: memory://, redis://..., or postgresql://..."""
+    global _pubsub
+    if _pubsub is None:
+        url = settings.PUBSUB_URL
+        if url.startswith(("redis://", "rediss://")):
+            _pubsub = RedisPubSub(url)
+        elif url.startswith("postgresql"):
+            _pubsub = PostgresPubSub(url)
+        else:
+            _pubsub = InMemoryPubSub()
+    return _pubsub
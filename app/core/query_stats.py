@@ -0,0 +1,112 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# A parenthesised run of bind placeholders, e.g. an expanded IN list: (?, ?, ?) or ($1, $2)
+_PLACEHOLDER_LIST = re.compile(
+    r"\(\s*(?:\?|\$\d+|%s|%\(\w+\)s)(?:\s*,\s*(?:\?|\$\d+|%s|%\(\w+\)s))*\s*\)"
+)
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace collapsed and IN lists folded, so repeats of one query compare equal"""
+    return _PLACEHOLDER_LIST.sub("(?)", " ".join(statement.split()))
+
+
+@dataclass
+class QueryStats:
+    """SQL run while handling one request"""
+    count: int = 0
+    total_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: Optional[str] = None
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed >= self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes run more than `threshold` times, most frequent first"""
+        if threshold <= 0:
+            return []
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+    def server_timing(self) -> str:
+        """`Server-Timing` entries for the database work"""
+        return (
+            f'db;dur={self.total_time * 1000:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_time * 1000:.2f}"
+        )
+
+    def summary(self) -> str:
+        """Fragment for the request log line"""
+        text = f"Queries: {self.count} - DB: {self.total_time * 1000:.2f}ms"
+        if self.slowest_statement:
+            slowest = " ".join(self.slowest_statement.split())
+            if len(slowest) > 200:
+                slowest = slowest[:200] + "..."
+            text += f" - Slowest: {self.slowest_time * 1000:.2f}ms {slowest}"
+        return text
+
+    def __str__(self) -> str:
+        # Lets the request log line pass the stats as a lazy %s argument
+        return self.summary()
+
+
+# Set per request by the logging middleware; None outside a request (startup, background loops)
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def track_queries() -> QueryStats:
+    """
+    Start collecting statements for the current request.
+    Tasks spawned afterwards (e.g. the endpoint behind call_next) share the same object.
+    """
+    stats = QueryStats()
+    _current.set(stats)
+    return stats
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement the engine runs into the current request's QueryStats"""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
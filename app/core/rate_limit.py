@@ -0,0 +1,209 @@
+"""
+Rate limiting shared by every worker.
+
+Counters live in the storage named by RATE_LIMIT_STORAGE_URI:
+- sqlite:///./ratelimit.db: a SQLite file, shared by the workers of one host, no extra service
+- redis://host:6379/1 (or rediss://, redis+sentinel://): anything speaking the Redis protocol,
+  e.g. Redis, Valkey or KeyDB; needs the `redis` package
+- memory://: per-process counters, so N workers allow N times the limit
+
+Limits use sliding-window counters: two integers per key (this window and the previous one),
+weighted by how far into the window we are. Checks fail open: if the storage is locked or
+down, the request is let through (and logged) rather than delayed or answered with a 500.
+"""
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from math import floor
+from typing import Iterator, Tuple
+
+from fastapi import HTTPException, Request
+from limits import RateLimitItem, parse
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
+from slowapi import Limiter
+from slowapi.middleware import SlowAPIMiddleware
+from slowapi.util import get_remote_address
+
+from app.config import settings
+from app.core.logging_config import logger
+
+# Expired rows are dropped once every this many writes
+_PURGE_EVERY = 1000
+# Seconds a check waits for another worker's lock on the file. Checks run on the event loop,
+# so this must stay short: a check that can't get the lock in time fails open instead.
+_BUSY_TIMEOUT = 0.05
+
+
+class SQLiteStorage(Storage, TimestampedSlidingWindow, SlidingWindowCounterSupport):
+    """
+    `limits` storage backed by a SQLite file. Every check is one short IMMEDIATE transaction,
+    so concurrent workers serialize on the file lock instead of racing. A lock not granted
+    within `timeout` seconds raises sqlite3.OperationalError.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        # Same convention as SQLAlchemy: sqlite:///relative.db, sqlite:////absolute.db
+        self.path = uri.split(":///", 1)[1] if ":///" in uri else ":memory:"
+        self.timeout = float(options.get("timeout", _BUSY_TIMEOUT))
+        self._connection = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily so each worker gets its own connection after forking
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit ("
+                "key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._connection = connection
+        return self._connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    @staticmethod
+    def _read(connection: sqlite3.Connection, key: str, now: float) -> Tuple[int, float]:
+        row = connection.execute(
+            "SELECT count, expires_at FROM rate_limit WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row if row else (0, now)
+
+    def _incr(self, connection: sqlite3.Connection, key: str, expiry: float, amount: int, now: float) -> int:
+        self._writes += 1
+        if self._writes % _PURGE_EVERY == 0:
+            connection.execute("DELETE FROM rate_limit WHERE expires_at <= ?", (now,))
+        row = connection.execute(
+            "INSERT INTO rate_limit (key, count, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END, "
+            "expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END "
+            "RETURNING count",
+            (key, amount, now + expiry, now, now),
+        ).fetchone()
+        return row[0]
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._transaction() as connection:
+            return self._incr(connection, key, expiry, amount, now)
+
+    def get(self, key: str) -> int:
+        with self._transaction() as connection:
+            return self._read(connection, key, time.time())[0]
+
+    def get_expiry(self, key: str) -> float:
+        with self._transaction() as connection:
+            return self._read(connection, key, time.time())[1]
+
+    def check(self) -> bool:
+        try:
+            with self._transaction() as connection:
+                connection.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        with self._transaction() as connection:
+            return connection.execute("DELETE FROM rate_limit").rowcount
+
+    def clear(self, key: str) -> None:
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM rate_limit WHERE key = ?", (key,))
+
+    def _sliding_window(self, connection, key: str, expiry: int, now: float) -> Tuple[int, float, int, float]:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self._read(connection, previous_key, now)[0]
+        current_count = self._read(connection, current_key, now)[0]
+        # Share of the previous window still inside the sliding one, in seconds
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        with self._transaction() as connection:
+            previous_count, previous_ttl, current_count, _ = self._sliding_window(connection, key, expiry, now)
+            if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+                return False
+            # Read and increment share the transaction, so unlike the in-memory storage no hit is over-granted
+            _, current_key = self.sliding_window_keys(key, expiry, now)
+            self._incr(connection, current_key, 2 * expiry, amount, now)
+            return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        with self._transaction() as connection:
+            return self._sliding_window(connection, key, expiry, time.time())
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM rate_limit WHERE key IN (?, ?)", (previous_key, current_key))
+
+
+limiter = Limiter(
+    key_func=get_remote_address,
+    default_limits=[settings.RATE_LIMIT_DEFAULT],
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    strategy="sliding-window-counter",
+    # Keep serving (with per-process counters) if Redis goes away
+    in_memory_fallback_enabled=not settings.RATE_LIMIT_STORAGE_URI.startswith(("memory://", "sqlite://")),
+    # A locked or unreachable storage lets the request through instead of answering 500
+    swallow_errors=True,
+)
+
+class RateLimitMiddleware(SlowAPIMiddleware):
+    """
+    SlowAPIMiddleware that survives swallowed storage errors: slowapi then never sets
+    request.state.view_rate_limit, yet both the middleware and @limiter.limit read it to add
+    headers. Starting every request with None makes that step a no-op.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        request.state.view_rate_limit = None
+        return await super().dispatch(request, call_next)
+
+
+# Parsed once; the per-identity limits below run on every login/signup attempt
+LOGIN_LIMIT: RateLimitItem = parse(settings.RATE_LIMIT_LOGIN_PER_ACCOUNT)
+SIGNUP_LIMIT: RateLimitItem = parse(settings.RATE_LIMIT_SIGNUP_PER_EMAIL)
+
+
+def enforce_limit(limit: RateLimitItem, route: str, identity: str) -> None:
+    """
+    Count one attempt for `identity` (an email or username) on `route`, whatever the client
+    address; raises 429 once the limit is used up. Complements the per-address route limits.
+    """
+    try:
+        allowed = limiter.limiter.hit(limit, route, identity.strip().lower())
+    except Exception as e:
+        # Fail open like the route limits (swallow_errors)
+        logger.warning(f"Rate limit storage error on {route}, allowing the attempt: {e}")
+        return
+    if not allowed:
+        raise HTTPException(status_code=429, detail="Too many attempts, please try again later")
+
@@ -0,0 +1,52 @@
+"""
+JSON rendering for the API.
+
+ORJSONResponse is the app's default response class: FastAPI still validates and converts the
+return value with the route's response_model, and orjson writes the bytes (UUID, datetime and
+enums natively, Decimal like jsonable_encoder does). List endpoints that return many rows use
+model_response instead, which skips FastAPI's intermediate dicts: one cached TypeAdapter per
+response type validates the ORM rows and pydantic-core writes the JSON directly. Keep
+response_model on those routes for the OpenAPI schema. scripts/benchmark_serialization.py
+compares the paths.
+"""
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+import orjson
+from fastapi.encoders import decimal_encoder, jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return decimal_encoder(value)
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def type_adapter(response_type: Any) -> TypeAdapter:
+    """One adapter per response type: building its validator/serializer is the costly part"""
+    return TypeAdapter(response_type)
+
+
+def model_response(
+    response_type: Any,
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Validate `content` (ORM rows, dicts or models) as `response_type` and render it in one pass"""
+    adapter = type_adapter(response_type)
+    value = adapter.validate_python(content, from_attributes=True)
+    return Response(adapter.dump_json(value, by_alias=True), status_code, headers, media_type="application/json")
@@ -2,6 +2,9 @@ from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from app.config import settings
+from app.core.logging_config import logger
+from app.core.metrics import instrument_pool
+from app.core.query_stats import instrument_engine
 
 connect_args = {}
 if settings.db_uri.startswith("sqlite"):
@@ -9,12 +12,15 @@ if settings.db_uri.startswith("sqlite"):
 
 engine = create_async_engine(
     settings.db_uri,
-    echo=True,
+    echo=settings.DB_ECHO,
     future=True,
     # pool_size=20, # SQLite doesn't support pool_size in the same way, and it can cause issues if not handled carefully.
     # max_overflow=10,
     connect_args=connect_args,
 )
+# Per-request query count and DB time, reported by the logging middleware
+instrument_engine(engine)
+instrument_pool(engine)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -28,5 +34,13 @@ async def get_session() -> AsyncSession:
         yield session
 
 async def init_db():
+    from app.repository.support_search_repo import create_support_search_schema
+
+    if settings.ENVIRONMENT == "production":
+        # Schema changes ship as Alembic revisions (migrations/), applied before the app starts
+        logger.info("Production: skipping create_all, schema is managed by Alembic")
+        return
+
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+        await create_support_search_schema(conn)
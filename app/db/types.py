@@ -0,0 +1,50 @@
+import uuid
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Uuid, inspect, text
+from sqlalchemy.engine.interfaces import Dialect
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.types import TypeDecorator
+
+
+class UUIDType(TypeDecorator):
+    """
+    UUID column stored one way per backend: native UUID on Postgres, 32 char lowercase hex
+    elsewhere. Bound values may be UUIDs or strings in any form (dashed, hex, upper case),
+    so a lookup always matches the stored key. Rows written before this type existed are
+    rewritten by `normalize_uuid_storage` (scripts/migrate_uuid_storage.py).
+    """
+    impl = Uuid
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> Optional[uuid.UUID]:
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
+
+async def normalize_uuid_storage(conn: AsyncConnection) -> Dict[str, int]:
+    """
+    Rewrite dashed or upper case UUID strings left by raw SQL and older code into the hex form
+    UUIDType binds on SQLite, for every UUIDType column (foreign keys included) in one pass.
+    Postgres stores UUIDs natively and is left alone. Returns rows changed per "table.column".
+    """
+    from sqlmodel import SQLModel
+
+    changed: Dict[str, int] = {}
+    if conn.dialect.name != "sqlite":
+        return changed
+    existing = set(await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names()))
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        for column in table.columns:
+            if not isinstance(column.type, UUIDType):
+                continue
+            result = await conn.execute(text(
+                f'UPDATE "{table.name}" SET "{column.name}" = lower(replace("{column.name}", \'-\', \'\')) '
+                f'WHERE "{column.name}" LIKE \'%-%\' OR "{column.name}" <> lower("{column.name}")'
+            ))
+            if result.rowcount:
+                changed[f"{table.name}.{column.name}"] = result.rowcount
+    return changed
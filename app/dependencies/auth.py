@@ -72,3 +72,28 @@ async def get_current_admin(
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
     return admin
+
+
+def _token_subject(token: str) -> Optional[uuid.UUID]:
+    try:
+        payload = jwt.decode(token, settings.PUBLIC_KEY, algorithms=[settings.ALGORITHM])
+        return uuid.UUID(TokenPayload(**payload).sub)
+    except (JWTError, ValidationError, TypeError, ValueError):
+        return None
+
+
+async def get_user_from_token(session: AsyncSession, token: str) -> Optional[User]:
+    """Resolve an active user from a bearer token, for callers outside the Depends flow (WebSockets)"""
+    user_id = _token_subject(token)
+    if not user_id:
+        return None
+    user = (await session.exec(select(User).where(User.id == user_id))).first()
+    return user if user and user.Status else None
+
+
+async def get_admin_from_token(session: AsyncSession, token: str) -> Optional[Admin]:
+    """Resolve an admin from a bearer token, for callers outside the Depends flow (WebSockets)"""
+    admin_id = _token_subject(token)
+    if not admin_id:
+        return None
+    return (await session.exec(select(Admin).where(Admin.id == admin_id))).first()
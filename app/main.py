@@ -1,13 +1,16 @@
+import asyncio
+import contextlib
 import sys
 import time
 import traceback
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 import uvicorn
 from contextlib import asynccontextmanager
 
 # Setup logging first to capture any startup errors
 try:
-    from app.core.logging_config import logger
+    from app.core.logging_config import logger, request_logger
 except ImportError as e:
     print(f"Failed to import logging config: {e}")
     sys.exit(1)
@@ -16,29 +19,52 @@ try:
     from app.db.session import init_db
     import app.models
     from app.api.v1.endpoints import auth, users, admin, payments, transactions, prop_firm, discounts, notification, support, crypto_payments, wallet, affiliate_admin
+    from app.service.nowpayments_service import NOWPaymentsError, NOWPaymentsAPIError
+    from app.service.crypto_payment_sweeper import run_crypto_payment_sweeper
+    from app.service.wallet_ledger_verifier import run_wallet_ledger_verifier
+    from app.service.warmup import warm_up
+    from app.config import settings
+    from app.core.metrics import metrics_access_allowed, render_metrics
+    from app.core.query_stats import track_queries
+    from app.core.rate_limit import limiter, RateLimitMiddleware
+    from app.core.responses import ORJSONResponse
     from fastapi.middleware.cors import CORSMiddleware
     from fastapi.middleware.trustedhost import TrustedHostMiddleware
     from fastapi.middleware.gzip import GZipMiddleware
-    from slowapi import Limiter, _rate_limit_exceeded_handler
-    from slowapi.util import get_remote_address
+    from slowapi import _rate_limit_exceeded_handler
     from slowapi.errors import RateLimitExceeded
-    from slowapi.middleware import SlowAPIMiddleware
 except Exception as e:
     logger.critical(f"Failed to start application: {e}")
     logger.critical(traceback.format_exc())
     sys.exit(1)
 
-limiter = Limiter(key_func=get_remote_address, default_limits=["100/minute"])
-
 async def lifespan(app: FastAPI):
     logger.info("Starting up application...")
     await init_db()
+    if settings.WARMUP_ENABLED:
+        await warm_up()
+    sweeper = None
+    if settings.CRYPTO_PAYMENT_SWEEP_INTERVAL > 0:
+        sweeper = asyncio.create_task(run_crypto_payment_sweeper(settings.CRYPTO_PAYMENT_SWEEP_INTERVAL))
+    ledger_verifier = None
+    if settings.WALLET_LEDGER_VERIFY_INTERVAL > 0:
+        ledger_verifier = asyncio.create_task(run_wallet_ledger_verifier(settings.WALLET_LEDGER_VERIFY_INTERVAL))
     yield
     logger.info("Shutting down application...")
+    if sweeper:
+        sweeper.cancel()
+        # Let it give up its job lease before the loop closes
+        with contextlib.suppress(asyncio.CancelledError):
+            await sweeper
+    if ledger_verifier:
+        ledger_verifier.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await ledger_verifier
 
 app = FastAPI(
     title="PROPSOL",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Security Middlewares
@@ -55,20 +81,42 @@ app.add_middleware(GZipMiddleware, minimum_size=1000)
 # Rate Limiting
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(RateLimitMiddleware)
+
+
+# Upstream payment provider failures: 503 when down or timing out, 400/502 for error answers
+async def nowpayments_error_handler(request: Request, exc: NOWPaymentsError):
+    status_code = 503
+    if isinstance(exc, NOWPaymentsAPIError):
+        status_code = 400 if exc.status_code and 400 <= exc.status_code < 500 else 502
+    logger.warning(f"NOWPayments call failed for {request.method} {request.url.path}: {exc}")
+    return JSONResponse(status_code=status_code, content={"detail": str(exc)})
+
+app.add_exception_handler(NOWPaymentsError, nowpayments_error_handler)
 
 # Logging Middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     start_time = time.time()
+    query_stats = track_queries()
     try:
         response = await call_next(request)
         process_time = (time.time() - start_time) * 1000
-        logger.info(f"Request: {request.method} {request.url.path} - Status: {response.status_code} - Duration: {process_time:.2f}ms")
+        response.headers.append("Server-Timing", f"{query_stats.server_timing()}, app;dur={process_time:.2f}")
+        # Lazy args: formatted by the log writer thread, and not at all when sampled out;
+        # the stats object renders its summary only then
+        request_logger.info(
+            "Request: %s %s - Status: %s - Duration: %.2fms - %s",
+            request.method, request.url.path, response.status_code, process_time, query_stats
+        )
+        # Same statement over and over is usually an N+1: a lookup per row instead of one joined query
+        route = request.scope.get("route")
+        for shape, times in query_stats.repeated(settings.SQL_REPEATED_STATEMENT_THRESHOLD):
+            logger.warning(f"Repeated statement: {request.method} {getattr(route, 'path', request.url.path)} ran {times}x: {shape[:200]}")
         return response
     except Exception as e:
         process_time = (time.time() - start_time) * 1000
-        logger.error(f"Request failed: {request.method} {request.url.path} - Duration: {process_time:.2f}ms - Error: {str(e)}")
+        logger.error(f"Request failed: {request.method} {request.url.path} - Duration: {process_time:.2f}ms - {query_stats.summary()} - Error: {str(e)}")
         logger.error(traceback.format_exc())
         return Response("Internal Server Error", status_code=500)
 
@@ -87,6 +135,16 @@ app.include_router(wallet.router, prefix="/api/v1/wallet", tags=["wallet"])
 app.include_router(affiliate_admin.router, prefix="/api/v1/admin/affiliates", tags=["admin-affiliates"])
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus scrape endpoint (all workers when PROMETHEUS_MULTIPROC_DIR is set)"""
+    if not metrics_access_allowed(request):
+        # Same answer as a missing route: don't advertise the endpoint
+        raise HTTPException(status_code=404, detail="Not Found")
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+
 @app.get("/")
 @limiter.limit("5/minute")
 async def root(request: Request):
@@ -7,7 +7,13 @@ from .transactions import Transaction
 from .vat_discount import Vat, UserDiscount, DiscountCodes
 from .user_purchased_package import UserPurchasedPackage
 from .notification import Notification
-from .wallet import Wallet, ReferralEarning, WithdrawalRequest, EarningStatus, PaymentMethod, WithdrawalStatus
+from .wallet import (
+    Wallet, ReferralEarning, WithdrawalRequest, WalletLedgerEntry,
+    EarningStatus, PaymentMethod, WithdrawalStatus, LedgerEntryType
+)
 from .affiliate_settings import AffiliateSettings
 from .global_affiliate_settings import GlobalAffiliateSettings
 from .support import Support, SupportTicket, SupportMessage, TicketStatus, TicketPriority, SenderType
+from .cache_version import CacheVersion
+from .idempotency_key import IdempotencyKey, IdempotencyStatus
+from .job_lease import JobLease
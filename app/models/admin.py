@@ -5,6 +5,7 @@ from sqlalchemy import Column, DateTime
 from sqlmodel import Field, SQLModel, ForeignKey, Relationship
 from uuid import UUID
 from enum import Enum
+from app.db.types import UUIDType
 
 class AdminStatus(str, Enum):
     ACTIVE = "active"
@@ -13,7 +14,7 @@ class AdminStatus(str, Enum):
 
 
 class Admin(SQLModel, table=True):
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     email: EmailStr = Field(unique=True, nullable=False, index=True)
     name: str = Field(nullable=False)
     password: str = Field(nullable=False)
@@ -6,12 +6,13 @@ from uuid import UUID
 
 from sqlalchemy import Column, DateTime, ForeignKey, Numeric, Text
 from sqlmodel import Field, SQLModel, Relationship
+from app.db.types import UUIDType
 
 class AffiliateSettings(SQLModel, table=True):
     """Per-user affiliate settings"""
     __tablename__ = "affiliate_settings"
 
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     user_id: UUID = Field(
         sa_column=Column(ForeignKey("user.id", ondelete="CASCADE"), nullable=False, unique=True)
     )
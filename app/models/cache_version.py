@@ -0,0 +1,12 @@
+from sqlmodel import Field, SQLModel
+
+
+class CacheVersion(SQLModel, table=True):
+    """
+    Version counters for in-process caches. A write bumps the counter in its own
+    transaction; every worker compares it with the version its cache was filled at.
+    """
+    __tablename__ = "cache_version"
+
+    key: str = Field(primary_key=True, max_length=64)
+    version: int = Field(default=0, nullable=False)
@@ -1,13 +1,21 @@
 from datetime import datetime, timezone
 import uuid
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index
 from sqlmodel import Field, SQLModel, ForeignKey, Relationship
 from uuid import UUID
+from app.db.types import UUIDType
 
 
 class CryptoPayment(SQLModel, table=True):
     """Model for NOWPayments cryptocurrency payments"""
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    # Serves the stale payment sweeper: waiting payments ordered by age
+    __table_args__ = (
+        Index("ix_cryptopayment_payment_status_created_at", "payment_status", "created_at"),
+        Index("ix_cryptopayment_user_id_created_at", "user_id", "created_at"),
+        Index("ix_cryptopayment_order_id", "order_id"),
+    )
+
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     user_id: UUID = Field(
         sa_column=Column(ForeignKey("user.id"), nullable=False)
     )
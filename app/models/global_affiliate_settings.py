@@ -6,12 +6,13 @@ from uuid import UUID
 
 from sqlalchemy import Column, DateTime, Numeric
 from sqlmodel import Field, SQLModel
+from app.db.types import UUIDType
 
 class GlobalAffiliateSettings(SQLModel, table=True):
     """Global affiliate settings (Singleton)"""
     __tablename__ = "global_affiliate_settings"
 
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
 
     # Default commission rate (e.g. 0.02 for 2%)
     default_commission_rate: Decimal = Field(
@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, Text
+from sqlmodel import Field, SQLModel
+
+
+class IdempotencyStatus(str, Enum):
+    in_progress = "in_progress"
+    completed = "completed"
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """Stored outcome of a request made with an Idempotency-Key header"""
+    __tablename__ = "idempotency_key"
+
+    # "<scope>:<client key>", where the scope names the endpoint and the caller
+    key: str = Field(primary_key=True, max_length=320)
+    request_hash: str = Field(nullable=False, max_length=64)
+    status: IdempotencyStatus = Field(default=IdempotencyStatus.in_progress, nullable=False)
+    response_status: Optional[int] = Field(default=None, nullable=True)
+    response_body: Optional[str] = Field(
+        sa_column=Column(Text, nullable=True),
+        default=None
+    )
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+        default_factory=lambda: datetime.now(timezone.utc)
+    )
+    expires_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False, index=True)
+    )
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime
+from sqlmodel import Field, SQLModel
+
+
+class JobLease(SQLModel, table=True):
+    """
+    Lease on a periodic background job. Every worker runs the job's loop, but a pass only
+    runs on the worker holding an unexpired lease; when the holder stops renewing it, the
+    next worker to try takes it over.
+    """
+    __tablename__ = "job_lease"
+
+    name: str = Field(primary_key=True, max_length=64)
+    # "<host>:<pid>" of the worker holding the lease
+    holder: str = Field(nullable=False, max_length=128)
+    expires_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
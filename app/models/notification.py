@@ -3,8 +3,9 @@ from datetime import datetime, timezone
 from enum import Enum
 from uuid import UUID
 
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index
 from sqlmodel import Field, SQLModel, ForeignKey, Relationship
+from app.db.types import UUIDType
 
 class NotificationType(str, Enum):
     GENERAL = "general"
@@ -30,7 +31,10 @@ class NotificationType(str, Enum):
 
 class Notification(SQLModel, table=True):
     __tablename__ = "notification"
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    __table_args__ = (
+        Index("ix_notification_user_id_created_at", "user_id", "created_at"),
+    )
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     user_id: UUID | None = Field(
         sa_column=Column(ForeignKey("user.id"), nullable=True)
     )
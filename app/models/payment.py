@@ -4,11 +4,12 @@ import uuid
 from sqlalchemy import Column, DateTime
 from sqlmodel import Field, SQLModel, ForeignKey, Relationship
 from uuid import UUID
+from app.db.types import UUIDType
 
 
 
 class Payment(SQLModel, table=True):
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     user_id: UUID = Field(
         sa_column=Column(ForeignKey("user.id"), nullable=False)
     )
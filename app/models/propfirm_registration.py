@@ -3,10 +3,11 @@ import string
 from datetime import datetime, timezone
 import uuid
 from pydantic import EmailStr
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index
 from sqlmodel import Field, SQLModel, ForeignKey, Relationship
 from uuid import UUID
 from enum import Enum
+from app.db.types import UUIDType
 
 
 class PassType(str, Enum):
@@ -27,7 +28,13 @@ class PaymentStatus(str, Enum):
 
 class PropFirmRegistration(SQLModel, table=True):
     __tablename__ = "prop_firm_registration"
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    # Referral stats aggregate a referred user's registrations by status
+    __table_args__ = (
+        # Also serves lookups by user_id alone
+        Index("ix_prop_firm_registration_user_id_account_status", "user_id", "account_status"),
+        Index("ix_prop_firm_registration_order_id", "order_id"),
+    )
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     user_id: UUID = Field(
         sa_column=Column(ForeignKey("user.id"), nullable=False)
     )
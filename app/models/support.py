@@ -4,8 +4,9 @@ from enum import Enum
 from typing import List, Optional
 from uuid import UUID
 
-from sqlalchemy import Column, DateTime, Text
+from sqlalchemy import Column, DateTime, Index, Text
 from sqlmodel import SQLModel, Field, ForeignKey, Relationship
+from app.db.types import UUIDType
 
 
 class TicketStatus(str, Enum):
@@ -29,8 +30,17 @@ class SenderType(str, Enum):
 
 class SupportTicket(SQLModel, table=True):
     __tablename__ = "support_ticket"
+    # Admin triage: open tickets whose last message came from the user, oldest first
+    __table_args__ = (
+        Index(
+            "ix_support_ticket_status_last_sender_type_last_message_at",
+            "status", "last_sender_type", "last_message_at"
+        ),
+        # A user's tickets, most recently updated first
+        Index("ix_support_ticket_user_id_updated_at", "user_id", "updated_at"),
+    )
 
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     user_id: UUID = Field(
         sa_column=Column(ForeignKey("user.id"), nullable=False)
     )
@@ -45,6 +55,13 @@ class SupportTicket(SQLModel, table=True):
         sa_column=Column(DateTime(timezone=True), nullable=False),
         default_factory=lambda: datetime.now(timezone.utc)
     )
+    # Denormalized from the messages, maintained on every message insert
+    message_count: int = Field(default=0, nullable=False)
+    last_message_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+    last_sender_type: Optional[SenderType] = Field(default=None, nullable=True)
 
     # Relationships
     messages: List["SupportMessage"] = Relationship(back_populates="ticket")
@@ -53,12 +70,16 @@ class SupportTicket(SQLModel, table=True):
 
 class SupportMessage(SQLModel, table=True):
     __tablename__ = "support_message"
+    # Per-ticket counts, latest message and thread pages are all range scans on this
+    __table_args__ = (
+        Index("ix_support_message_ticket_id_created_at", "ticket_id", "created_at"),
+    )
 
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     ticket_id: UUID = Field(
         sa_column=Column(ForeignKey("support_ticket.id"), nullable=False)
     )
-    sender_id: UUID = Field(nullable=False)
+    sender_id: UUID = Field(nullable=False, sa_type=UUIDType)
     sender_type: SenderType = Field(nullable=False)
     message: str = Field(sa_column=Column(Text, nullable=False))
     created_at: datetime = Field(
@@ -74,7 +95,7 @@ class SupportMessage(SQLModel, table=True):
 # This can be removed after data is migrated
 class Support(SQLModel, table=True):
     __tablename__ = "support"
-    id: uuid.UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    id: uuid.UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     name: str = Field(nullable=False)
     email: str = Field(nullable=False)
     phone: str = Field(nullable=False)
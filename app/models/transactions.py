@@ -2,8 +2,9 @@ import uuid
 from datetime import datetime, timezone
 
 from sqlmodel import SQLModel, Field, Column, ForeignKey, Relationship
-from sqlalchemy import Enum, BigInteger, DateTime
+from sqlalchemy import Enum, BigInteger, DateTime, Index
 import enum
+from app.db.types import UUIDType
 
 class TxnType(str, enum.Enum):
     deposit = "deposit"
@@ -22,9 +23,13 @@ class TxnStatus(str, enum.Enum):
 
 class Transaction(SQLModel, table=True):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_users_id", "users_id"),
+    )
 
     id: uuid.UUID = Field(
         default_factory=uuid.uuid4,
+        sa_type=UUIDType,
         primary_key=True,
         index=True,
         nullable=False
@@ -8,6 +8,7 @@ from sqlalchemy import Column, DateTime
 from sqlmodel import Field, SQLModel, ForeignKey, Relationship
 from uuid import UUID
 from enum import Enum
+from app.db.types import UUIDType
 
 
 class UserStatus(str, Enum):
@@ -20,7 +21,7 @@ def generate_referral_code(length=12):
     return "".join(secrets.choice(alphabet) for i in range(length))
 
 class User(SQLModel, table=True):
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     email: EmailStr = Field(unique=True, nullable=False, index=True)
     name: str = Field(nullable=False)
     password: str = Field(nullable=False)
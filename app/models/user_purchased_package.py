@@ -3,10 +3,11 @@ import uuid
 from sqlalchemy import Column, DateTime
 from sqlmodel import Field, SQLModel, ForeignKey, Relationship
 from uuid import UUID
+from app.db.types import UUIDType
 
 class UserPurchasedPackage(SQLModel, table=True):
     __tablename__ = "user_purchased_package"
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     user_id: UUID = Field(
         sa_column=Column(ForeignKey("user.id"), nullable=False)
     )
@@ -4,6 +4,7 @@ from datetime import datetime, timezone
 from sqlmodel import SQLModel, Field, Column, ForeignKey, Relationship
 from sqlalchemy import Enum, BigInteger, DateTime
 import enum
+from app.db.types import UUIDType
 
 class TxnType(str, enum.Enum):
     deposit = "deposit"
@@ -25,6 +26,7 @@ class DiscountCodes(SQLModel, table=True):
 
     id: uuid.UUID = Field(
         default_factory=uuid.uuid4,
+        sa_type=UUIDType,
         primary_key=True,
         index=True,
         nullable=False
@@ -53,12 +55,13 @@ class UserDiscount(SQLModel, table=True):
 
     id: uuid.UUID = Field(
         default_factory=uuid.uuid4,
+        sa_type=UUIDType,
         primary_key=True,
         index=True,
         nullable=False
     )
 
-    discount_id: uuid.UUID = Field(ForeignKey("discount_codes.id"), nullable=False, index=True)
+    discount_id: uuid.UUID = Field(ForeignKey("discount_codes.id"), nullable=False, index=True, sa_type=UUIDType)
     user_id: uuid.UUID = Field(
         sa_column=Column(ForeignKey("user.id"), nullable=False, index=True)
     )
@@ -79,6 +82,7 @@ class Vat(SQLModel, table=True):
 
     id: uuid.UUID = Field(
         default_factory=uuid.uuid4,
+        sa_type=UUIDType,
         primary_key=True,
         index=True,
         nullable=False
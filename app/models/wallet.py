@@ -5,8 +5,9 @@ from enum import Enum
 from typing import Optional, List
 from uuid import UUID
 
-from sqlalchemy import Column, DateTime, ForeignKey, Numeric, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Numeric, Text
 from sqlmodel import Field, SQLModel, Relationship
+from app.db.types import UUIDType
 
 
 class EarningStatus(str, Enum):
@@ -32,11 +33,23 @@ class WithdrawalStatus(str, Enum):
     completed = "completed"
 
 
+class LedgerEntryType(str, Enum):
+    """Kind of balance movement recorded in the wallet ledger"""
+    opening_balance = "opening_balance"  # Balances carried over when the ledger was introduced
+    credit = "credit"                    # Standard pass commission, straight to available
+    lock = "lock"                        # Guaranteed pass commission, held in locked
+    release = "release"                  # Locked earning released to available
+    withdrawal_hold = "withdrawal_hold"  # Available reserved by a withdrawal request
+    refund = "refund"                    # Rejected withdrawal returned to available
+    payout = "payout"                    # Completed withdrawal added to total withdrawn
+    adjustment = "adjustment"            # Manual correction
+
+
 class Wallet(SQLModel, table=True):
     """User's wallet containing balance information"""
     __tablename__ = "wallet"
 
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     user_id: UUID = Field(
         sa_column=Column(ForeignKey("user.id", ondelete="CASCADE"), nullable=False, unique=True)
     )
@@ -66,14 +79,17 @@ class Wallet(SQLModel, table=True):
 class ReferralEarning(SQLModel, table=True):
     """Individual referral earning record"""
     __tablename__ = "referral_earning"
+    __table_args__ = (
+        Index("ix_referral_earning_wallet_id_status", "wallet_id", "status"),
+    )
 
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     wallet_id: UUID = Field(
         sa_column=Column(ForeignKey("wallet.id", ondelete="CASCADE"), nullable=False)
     )
-    referrer_id: UUID = Field(nullable=False, index=True)  # User who earns the commission
-    referred_user_id: UUID = Field(nullable=False, index=True)  # User who used the referral code
-    registration_id: Optional[UUID] = Field(nullable=True, index=True)  # PropFirmRegistration ID
+    referrer_id: UUID = Field(nullable=False, index=True, sa_type=UUIDType)  # User who earns the commission
+    referred_user_id: UUID = Field(nullable=False, index=True, sa_type=UUIDType)  # User who used the referral code
+    registration_id: Optional[UUID] = Field(nullable=True, index=True, sa_type=UUIDType)  # PropFirmRegistration ID
     pass_type: str = Field(nullable=False)  # "standard_pass" or "guaranteed_pass"
     amount: Decimal = Field(
         sa_column=Column(Numeric(12, 2), nullable=False)
@@ -96,8 +112,13 @@ class ReferralEarning(SQLModel, table=True):
 class WithdrawalRequest(SQLModel, table=True):
     """Withdrawal request record"""
     __tablename__ = "withdrawal_request"
+    __table_args__ = (
+        # A wallet's withdrawals newest first, and the admin queue by status
+        Index("ix_withdrawal_request_wallet_id_created_at", "wallet_id", "created_at"),
+        Index("ix_withdrawal_request_status_created_at", "status", "created_at"),
+    )
 
-    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
     wallet_id: UUID = Field(
         sa_column=Column(ForeignKey("wallet.id", ondelete="CASCADE"), nullable=False)
     )
@@ -142,3 +163,35 @@ class WithdrawalRequest(SQLModel, table=True):
 
     # Relationships
     wallet: "Wallet" = Relationship(back_populates="withdrawal_requests")
+
+
+class WalletLedgerEntry(SQLModel, table=True):
+    """
+    Append-only record of every balance movement. Summing the deltas of a wallet's entries gives
+    its balances; the columns on Wallet are a projection kept in step in the same transaction.
+    """
+    __tablename__ = "wallet_ledger"
+    __table_args__ = (
+        Index("ix_wallet_ledger_wallet_id_created_at", "wallet_id", "created_at"),
+    )
+
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, sa_type=UUIDType)
+    wallet_id: UUID = Field(
+        sa_column=Column(ForeignKey("wallet.id", ondelete="CASCADE"), nullable=False)
+    )
+    entry_type: LedgerEntryType = Field(nullable=False)
+    available_delta: Decimal = Field(
+        sa_column=Column(Numeric(12, 2), nullable=False, default=0.00)
+    )
+    locked_delta: Decimal = Field(
+        sa_column=Column(Numeric(12, 2), nullable=False, default=0.00)
+    )
+    withdrawn_delta: Decimal = Field(
+        sa_column=Column(Numeric(12, 2), nullable=False, default=0.00)
+    )
+    # ReferralEarning or WithdrawalRequest behind the movement, depending on entry_type
+    reference_id: Optional[UUID] = Field(default=None, nullable=True, sa_type=UUIDType)
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+        default_factory=lambda: datetime.now(timezone.utc)
+    )
@@ -27,12 +27,16 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await self.session.exec(query)
         return result.all()
 
-    async def create(self, obj_in: CreateSchemaType | dict) -> ModelType:
+    async def create(self, obj_in: CreateSchemaType | dict, commit: bool = True) -> ModelType:
         if isinstance(obj_in, dict):
             db_obj = self.model(**obj_in)
         else:
             db_obj = self.model.from_orm(obj_in)
         self.session.add(db_obj)
+        if not commit:
+            # Caller owns the transaction
+            await self.session.flush()
+            return db_obj
         await self.session.commit()
         await self.session.refresh(db_obj)
         return db_obj
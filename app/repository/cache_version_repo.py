@@ -0,0 +1,38 @@
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.cache_version import CacheVersion
+
+
+class CacheVersionRepository:
+    """Repository for CacheVersion counters"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_version(self, key: str) -> int:
+        """Current version of `key` (0 if it was never bumped)"""
+        result = await self.session.exec(select(CacheVersion.version).where(CacheVersion.key == key))
+        return result.first() or 0
+
+    async def bump(self, key: str) -> None:
+        """Increment the version of `key`; only flushed, the caller commits with its write"""
+        result = await self.session.exec(
+            update(CacheVersion)
+            .where(CacheVersion.key == key)
+            .values(version=CacheVersion.version + 1)
+        )
+        if result.rowcount:
+            return
+        try:
+            async with self.session.begin_nested():
+                self.session.add(CacheVersion(key=key, version=1))
+        except IntegrityError:
+            # Created concurrently; bump that row instead
+            await self.session.exec(
+                update(CacheVersion)
+                .where(CacheVersion.key == key)
+                .values(version=CacheVersion.version + 1)
+            )
@@ -1,6 +1,7 @@
+from datetime import datetime, timezone
 from uuid import UUID
-from typing import List
-from sqlmodel import select
+from typing import List, Optional, Tuple
+from sqlmodel import select, update, or_, and_
 from app.models.crypto_payment import CryptoPayment
 from app.schema.crypto_payment import CryptoPaymentCreate, CryptoPaymentUpdate
 from app.repository.base_repo import BaseRepository
@@ -26,3 +27,40 @@ class CryptoPaymentRepository(BaseRepository[CryptoPayment, CryptoPaymentCreate,
         query = select(self.model).where(self.model.invoice_id == invoice_id)
         result = await self.session.exec(query)
         return result.first()
+
+    async def get_stale_waiting(
+        self,
+        older_than: datetime,
+        limit: int,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[CryptoPayment]:
+        """
+        Next batch of payments still waiting since before `older_than`, oldest first.
+        Keyset pagination on (created_at, id) so the batch is an index range scan.
+        """
+        query = select(self.model).where(
+            self.model.payment_status == "waiting",
+            self.model.created_at < older_than
+        )
+        if after:
+            created_at, payment_id = after
+            query = query.where(or_(
+                self.model.created_at > created_at,
+                and_(self.model.created_at == created_at, self.model.id > payment_id)
+            ))
+        query = query.order_by(self.model.created_at, self.model.id).limit(limit)
+        result = await self.session.exec(query)
+        return result.all()
+
+    async def mark_expired(self, payment_ids: List[UUID]) -> int:
+        """Expire the given payments if they are still waiting; returns the number of rows changed"""
+        if not payment_ids:
+            return 0
+        stmt = (
+            update(self.model)
+            .where(self.model.id.in_(payment_ids))
+            .where(self.model.payment_status == "waiting")
+            .values(payment_status="expired", updated_at=datetime.now(timezone.utc))
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount
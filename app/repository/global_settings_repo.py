@@ -14,20 +14,25 @@ class GlobalSettingsRepository(BaseRepository[GlobalAffiliateSettings, dict, dic
     def __init__(self, session: AsyncSession):
         super().__init__(GlobalAffiliateSettings, session)
 
-    async def get_settings(self) -> GlobalAffiliateSettings:
+    async def get_settings(self, commit: bool = True) -> GlobalAffiliateSettings:
         """Get global settings (create default if not exists)"""
         query = select(GlobalAffiliateSettings)
         result = await self.session.exec(query)
         settings = result.first()
 
         if not settings:
+            # Create default settings
+            settings = GlobalAffiliateSettings(
+                default_commission_rate=Decimal("0.02"),
+                minimum_withdrawal_amount=Decimal("100.00"),
+                is_program_enabled=True
+            )
+            if not commit:
+                # Caller owns the transaction
+                self.session.add(settings)
+                await self.session.flush()
+                return settings
             try:
-                # Create default settings
-                settings = GlobalAffiliateSettings(
-                    default_commission_rate=Decimal("0.02"),
-                    minimum_withdrawal_amount=Decimal("100.00"),
-                    is_program_enabled=True
-                )
                 self.session.add(settings)
                 await self.session.commit()
                 await self.session.refresh(settings)
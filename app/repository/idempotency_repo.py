@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.idempotency_key import IdempotencyKey, IdempotencyStatus
+
+
+class IdempotencyRepository:
+    """Repository for IdempotencyKey rows. Every method commits: keys live outside the request's transaction."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, key: str) -> Optional[IdempotencyKey]:
+        result = await self.session.exec(select(IdempotencyKey).where(IdempotencyKey.key == key))
+        return result.first()
+
+    async def claim(
+        self, key: str, request_hash: str, expires_at: datetime
+    ) -> Tuple[bool, Optional[IdempotencyKey]]:
+        """
+        Insert `key` as in progress until `expires_at`, a short lease that complete() extends.
+        Returns (True, None) only when this insert claimed it, otherwise (False, the existing
+        row), where the row is None if it was released meanwhile.
+        """
+        try:
+            self.session.add(IdempotencyKey(key=key, request_hash=request_hash, expires_at=expires_at))
+            await self.session.commit()
+            return True, None
+        except IntegrityError:
+            await self.session.rollback()
+        existing = await self.get(key)
+        if existing is not None:
+            # The row is re-read while waiting; don't serve it from the identity map
+            self.session.expunge(existing)
+        return False, existing
+
+    async def complete(self, key: str, response_status: int, response_body: str, expires_at: datetime) -> None:
+        """Store the response and keep the key until `expires_at`"""
+        await self.session.exec(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(
+                status=IdempotencyStatus.completed,
+                response_status=response_status,
+                response_body=response_body,
+                expires_at=expires_at
+            )
+        )
+        await self.session.commit()
+
+    async def release(self, key: str) -> None:
+        """Forget an in-progress key so a retry runs the request again"""
+        await self.session.exec(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .where(IdempotencyKey.status == IdempotencyStatus.in_progress)
+        )
+        await self.session.commit()
+
+    async def delete_expired(self, key: Optional[str] = None) -> int:
+        """Delete expired keys (only `key`, if given); returns the number deleted"""
+        stmt = delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.now(timezone.utc))
+        if key is not None:
+            stmt = stmt.where(IdempotencyKey.key == key)
+        result = await self.session.exec(stmt)
+        await self.session.commit()
+        return result.rowcount
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.job_lease import JobLease
+
+
+class JobLeaseRepository:
+    """Repository for JobLease rows. Every method commits: a lease lives outside the job's transaction."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def acquire(self, name: str, holder: str, ttl: timedelta) -> bool:
+        """
+        Take or renew the lease on `name` for `ttl`. True when `holder` now has it: it already
+        held it, the previous holder's lease had expired, or nobody held it yet.
+        """
+        now = datetime.now(timezone.utc)
+        expires_at = now + ttl
+        # Conditional, so of two workers taking over an expired lease only one matches
+        result = await self.session.exec(
+            update(JobLease)
+            .where(JobLease.name == name)
+            .where(or_(JobLease.holder == holder, JobLease.expires_at < now))
+            .values(holder=holder, expires_at=expires_at)
+        )
+        if result.rowcount:
+            await self.session.commit()
+            return True
+        try:
+            self.session.add(JobLease(name=name, holder=holder, expires_at=expires_at))
+            await self.session.commit()
+            return True
+        except IntegrityError:
+            # Held by another worker
+            await self.session.rollback()
+            return False
+
+    async def release(self, name: str, holder: str) -> None:
+        """Give the lease up so another worker takes over without waiting for it to expire"""
+        await self.session.exec(
+            delete(JobLease).where(JobLease.name == name).where(JobLease.holder == holder)
+        )
+        await self.session.commit()
@@ -16,3 +16,8 @@ class NotificationRepository(BaseRepository[Notification, NotificationCreate, No
         query = select(self.model).where(self.model.admin_id == admin_id).order_by(self.model.created_at.desc())
         result = await self.session.exec(query)
         return result.all()
+
+    async def create_many(self, objs_in: List[NotificationCreate]) -> None:
+        """Insert several notifications with a single commit"""
+        self.session.add_all([self.model.from_orm(obj_in) for obj_in in objs_in])
+        await self.session.commit()
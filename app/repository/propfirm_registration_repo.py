@@ -1,7 +1,10 @@
+from datetime import datetime, timezone
 from uuid import UUID
-from typing import List
-from sqlmodel import select
-from app.models.propfirm_registration import PropFirmRegistration
+from typing import List, Tuple
+from sqlmodel import select, update
+from app.models.crypto_payment import CryptoPayment
+from app.models.propfirm_registration import PropFirmRegistration, PaymentStatus, AccountStatus
+from app.models.user import User
 from app.schema.propfirm_registration import PropFirmRegistrationCreate, PropFirmRegistrationUpdate
 from app.repository.base_repo import BaseRepository
 
@@ -18,3 +21,51 @@ class PropFirmRegistrationRepository(BaseRepository[PropFirmRegistration, PropFi
         query = select(self.model).where(self.model.order_id == order_id)
         result = await self.session.exec(query)
         return result.first()
+
+    async def fail_pending_by_order_ids(self, order_ids: List[str]) -> int:
+        """
+        Mark pending registrations for the given orders as failed, unless the order
+        still has a crypto payment that can complete. Returns the number of rows changed.
+        """
+        if not order_ids:
+            return 0
+        open_payment = (
+            select(CryptoPayment.id)
+            .where(CryptoPayment.order_id == self.model.order_id)
+            .where(CryptoPayment.payment_status.not_in(["expired", "failed", "refunded"]))
+        )
+        stmt = (
+            update(self.model)
+            .where(self.model.order_id.in_(order_ids))
+            .where(self.model.payment_status == PaymentStatus.pending)
+            .where(~open_payment.exists())
+            .values(payment_status=PaymentStatus.failed, updated_at=datetime.now(timezone.utc))
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount
+
+    async def get_many_with_users(self, registration_ids: List[UUID]) -> List[Tuple[PropFirmRegistration, User]]:
+        """(registration, user) rows for the given registration ids"""
+        if not registration_ids:
+            return []
+        query = (
+            select(self.model, User)
+            .join(User, User.id == self.model.user_id)
+            .where(self.model.id.in_(registration_ids))
+        )
+        result = await self.session.exec(query)
+        return list(result.all())
+
+    async def set_account_status(self, registration_ids: List[UUID], status: AccountStatus) -> List[UUID]:
+        """Set account_status on every registration not already in it; returns the ids that changed"""
+        if not registration_ids:
+            return []
+        stmt = (
+            update(self.model)
+            .where(self.model.id.in_(registration_ids))
+            .where(self.model.account_status != status)
+            .values(account_status=status, updated_at=datetime.now(timezone.utc))
+            .returning(self.model.id)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
@@ -1,8 +1,8 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 from datetime import datetime, timezone
 
-from sqlalchemy import func
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import selectinload
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -11,6 +11,7 @@ from app.models.support import Support, SupportTicket, SupportMessage, TicketSta
 from app.models.user import User
 from app.schema.support import SupportCreate, SupportTicketCreate
 from app.repository.base_repo import BaseRepository
+from app.repository.support_search_repo import SupportSearchRepository
 
 
 class SupportRepository(BaseRepository[Support, SupportCreate, SupportCreate]):
@@ -48,11 +49,15 @@ class SupportTicketRepository:
         initial_message: str
     ) -> SupportTicket:
         """Create a new support ticket with an initial message"""
+        now = datetime.now(timezone.utc)
         ticket = SupportTicket(
             user_id=user_id,
             subject=subject,
             priority=priority,
-            status=TicketStatus.OPEN
+            status=TicketStatus.OPEN,
+            message_count=1,
+            last_message_at=now,
+            last_sender_type=SenderType.USER
         )
         self.session.add(ticket)
         await self.session.commit()
@@ -63,33 +68,34 @@ class SupportTicketRepository:
             ticket_id=ticket.id,
             sender_id=user_id,
             sender_type=SenderType.USER,
-            message=initial_message
+            message=initial_message,
+            created_at=now
         )
         self.session.add(message)
+
+        # Searchable by subject and the user's email as well as the messages
+        user_email = (await self.session.exec(select(User.email).where(User.id == user_id))).first()
+        await SupportSearchRepository(self.session).index_documents(ticket.id, [
+            ("ticket", f"{subject} {user_email or ''}"),
+            ("message", initial_message),
+        ])
         await self.session.commit()
         await self.session.refresh(ticket)
 
         return ticket
 
     async def get_ticket_by_id(self, ticket_id: UUID) -> Optional[SupportTicket]:
-        """Get a ticket by ID with messages loaded"""
-        query = (
-            select(SupportTicket)
-            .where(SupportTicket.id == ticket_id)
-            .options(selectinload(SupportTicket.messages))
-        )
+        """Get a ticket by ID (messages are paged separately)"""
+        query = select(SupportTicket).where(SupportTicket.id == ticket_id)
         result = await self.session.exec(query)
         return result.first()
 
     async def get_ticket_with_user(self, ticket_id: UUID) -> Optional[SupportTicket]:
-        """Get a ticket by ID with user and messages loaded"""
+        """Get a ticket by ID with its user loaded"""
         query = (
             select(SupportTicket)
             .where(SupportTicket.id == ticket_id)
-            .options(
-                selectinload(SupportTicket.messages),
-                selectinload(SupportTicket.user)
-            )
+            .options(selectinload(SupportTicket.user))
         )
         result = await self.session.exec(query)
         return result.first()
@@ -100,11 +106,10 @@ class SupportTicketRepository:
         skip: int = 0,
         limit: int = 20
     ) -> List[SupportTicket]:
-        """Get all tickets for a user"""
+        """Get a page of a user's tickets"""
         query = (
             select(SupportTicket)
             .where(SupportTicket.user_id == user_id)
-            .options(selectinload(SupportTicket.messages))
             .order_by(SupportTicket.updated_at.desc())
             .offset(skip)
             .limit(limit)
@@ -117,12 +122,9 @@ class SupportTicketRepository:
         skip: int = 0,
         limit: int = 20,
         status: Optional[TicketStatus] = None
-    ) -> List[SupportTicket]:
-        """Get all tickets (admin view) with optional status filter"""
-        query = select(SupportTicket).options(
-            selectinload(SupportTicket.messages),
-            selectinload(SupportTicket.user)
-        )
+    ) -> List[Tuple[SupportTicket, User]]:
+        """Get a page of all tickets (admin view) with optional status filter, as (ticket, user) rows"""
+        query = select(SupportTicket, User).join(User, User.id == SupportTicket.user_id)
 
         if status:
             query = query.where(SupportTicket.status == status)
@@ -131,6 +133,58 @@ class SupportTicketRepository:
         result = await self.session.exec(query)
         return list(result.all())
 
+    @staticmethod
+    def _awaiting_reply_filter():
+        """Tickets still being worked on whose latest message is from the user"""
+        return (
+            SupportTicket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS]),
+            SupportTicket.last_sender_type == SenderType.USER,
+        )
+
+    async def get_awaiting_reply(
+        self,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Tuple[SupportTicket, User]]:
+        """
+        Tickets awaiting an admin reply, longest waiting first, as (ticket, user) rows.
+        ix_support_ticket_status_last_sender_type_last_message_at limits the scan to the awaiting
+        rows of each status, but with two statuses those come as two sorted ranges, which the
+        database still sorts together for the ORDER BY. Only the (small) queue is sorted.
+        """
+        query = (
+            select(SupportTicket, User)
+            .join(User, User.id == SupportTicket.user_id)
+            .where(*self._awaiting_reply_filter())
+            .order_by(SupportTicket.last_message_at.asc())
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await self.session.exec(query)
+        return list(result.all())
+
+    async def count_awaiting_reply(self) -> int:
+        """Count tickets awaiting an admin reply"""
+        query = select(func.count()).select_from(SupportTicket).where(*self._awaiting_reply_filter())
+        result = await self.session.exec(query)
+        return result.one()
+
+    async def get_tickets_by_ids(
+        self,
+        ticket_ids: List[UUID]
+    ) -> List[Tuple[SupportTicket, User]]:
+        """(ticket, user) rows in the order of `ticket_ids`"""
+        if not ticket_ids:
+            return []
+        query = (
+            select(SupportTicket, User)
+            .join(User, User.id == SupportTicket.user_id)
+            .where(SupportTicket.id.in_(ticket_ids))
+        )
+        result = await self.session.exec(query)
+        rows = {row[0].id: row for row in result.all()}
+        return [rows[ticket_id] for ticket_id in ticket_ids if ticket_id in rows]
+
     async def count_tickets(
         self,
         user_id: Optional[UUID] = None,
@@ -190,28 +244,61 @@ class SupportTicketRepository:
         sender_type: SenderType,
         message_content: str
     ) -> SupportMessage:
-        """Add a message to a ticket"""
+        """Add a message to a ticket and update the ticket's activity fields"""
+        now = datetime.now(timezone.utc)
         message = SupportMessage(
             ticket_id=ticket_id,
             sender_id=sender_id,
             sender_type=sender_type,
-            message=message_content
+            message=message_content,
+            created_at=now
         )
         self.session.add(message)
 
-        # Update ticket's updated_at timestamp
         ticket = await self.get_ticket_by_id(ticket_id)
         if ticket:
-            ticket.updated_at = datetime.now(timezone.utc)
+            ticket.updated_at = now
+            ticket.last_message_at = now
+            ticket.last_sender_type = sender_type
+            # Incremented in SQL so concurrent messages are all counted
+            ticket.message_count = SupportTicket.message_count + 1
             # If admin replies to open ticket, set to in_progress
             if sender_type == SenderType.ADMIN and ticket.status == TicketStatus.OPEN:
                 ticket.status = TicketStatus.IN_PROGRESS
             self.session.add(ticket)
 
+        await SupportSearchRepository(self.session).index_documents(ticket_id, [("message", message_content)])
         await self.session.commit()
         await self.session.refresh(message)
         return message
 
+    async def get_message_page(
+        self,
+        ticket_id: UUID,
+        before: Optional[datetime] = None,
+        limit: int = 50,
+        before_id: Optional[UUID] = None
+    ) -> Tuple[List[SupportMessage], bool]:
+        """
+        Latest `limit` messages older than the (before, before_id) keyset position (or the latest
+        overall), oldest first, plus whether older messages exist. Messages are ordered by
+        (created_at, id) so ones sharing a timestamp across a page edge are neither skipped nor
+        repeated. One extra row is fetched to answer has_more.
+        """
+        query = select(SupportMessage).where(SupportMessage.ticket_id == ticket_id)
+        if before and before_id:
+            query = query.where(or_(
+                SupportMessage.created_at < before,
+                and_(SupportMessage.created_at == before, SupportMessage.id < before_id)
+            ))
+        elif before:
+            query = query.where(SupportMessage.created_at < before)
+        query = query.order_by(SupportMessage.created_at.desc(), SupportMessage.id.desc()).limit(limit + 1)
+        result = await self.session.exec(query)
+        messages = list(result.all())
+        has_more = len(messages) > limit
+        return list(reversed(messages[:limit])), has_more
+
     async def get_messages_for_ticket(self, ticket_id: UUID) -> List[SupportMessage]:
         """Get all messages for a ticket"""
         query = (
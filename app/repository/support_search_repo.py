@@ -0,0 +1,137 @@
+import re
+from typing import List, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# One row per searchable document: a ticket (subject + user email) or a single message.
+# Indexing a message is an insert, so the index is maintained incrementally. Changing a user's
+# email rewrites their ticket documents (UserRepository.update). Postgres drops a deleted ticket's
+# documents by cascade; FTS5 has no foreign keys, so code deleting tickets calls
+# delete_ticket_documents, and rows left by deletes outside the app go with
+# `python scripts/migrate_support_tickets.py --rebuild-search`.
+SQLITE_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS support_search_fts USING fts5("
+    "ticket_id UNINDEXED, kind UNINDEXED, body, tokenize = 'unicode61')",
+]
+POSTGRES_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS support_search_document ("
+    "id BIGSERIAL PRIMARY KEY, "
+    "ticket_id UUID NOT NULL REFERENCES support_ticket (id) ON DELETE CASCADE, "
+    "kind VARCHAR(16) NOT NULL, "
+    "body TEXT NOT NULL, "
+    "search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED)",
+    "CREATE INDEX IF NOT EXISTS ix_support_search_document_vector "
+    "ON support_search_document USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_support_search_document_ticket_id "
+    "ON support_search_document (ticket_id)",
+]
+
+
+async def create_support_search_schema(conn: AsyncConnection) -> None:
+    """Create the backend specific full-text index (idempotent)"""
+    dialect = conn.dialect.name
+    statements = SQLITE_SCHEMA if dialect == "sqlite" else POSTGRES_SCHEMA if dialect == "postgresql" else []
+    for statement in statements:
+        await conn.execute(text(statement))
+
+
+def _fts5_query(query: str) -> str:
+    """
+    User input as an FTS5 expression: every word must match, as a prefix.
+    Quoting each term keeps order ids, emails and stray operators from being parsed as syntax.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+class SupportSearchRepository:
+    """Full-text search over support tickets: SQLite FTS5 or Postgres tsvector/GIN"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @property
+    def dialect(self) -> str:
+        return self.session.bind.dialect.name
+
+    @property
+    def table(self) -> str:
+        return "support_search_fts" if self.dialect == "sqlite" else "support_search_document"
+
+    def _uuid_key(self, value: UUID):
+        # Match how SQLModel stores UUIDs: native on Postgres, 32 char hex on SQLite
+        return value.hex if self.dialect == "sqlite" else value
+
+    async def index_documents(self, ticket_id: UUID, documents: List[Tuple[str, str]]) -> None:
+        """Add (kind, body) documents for a ticket; committed with the caller's transaction"""
+        if self.dialect == "sqlite":
+            statement = "INSERT INTO support_search_fts (ticket_id, kind, body) VALUES (:ticket_id, :kind, :body)"
+        elif self.dialect == "postgresql":
+            statement = "INSERT INTO support_search_document (ticket_id, kind, body) VALUES (:ticket_id, :kind, :body)"
+        else:
+            return
+        key = self._uuid_key(ticket_id)
+        for kind, body in documents:
+            await self.session.execute(text(statement), {"ticket_id": key, "kind": kind, "body": body})
+
+    async def update_user_email(self, user_id: UUID, email: str) -> None:
+        """Re-index the ticket documents of `user_id`'s tickets with their new email; committed by the caller"""
+        if self.dialect not in ("sqlite", "postgresql"):
+            return
+        params = {"user_id": self._uuid_key(user_id), "email": email}
+        user_tickets = "SELECT id FROM support_ticket WHERE user_id = :user_id"
+        await self.session.execute(text(
+            f"DELETE FROM {self.table} WHERE kind = 'ticket' AND ticket_id IN ({user_tickets})"
+        ), params)
+        await self.session.execute(text(
+            f"INSERT INTO {self.table} (ticket_id, kind, body) "
+            "SELECT id, 'ticket', subject || ' ' || :email FROM support_ticket WHERE user_id = :user_id"
+        ), params)
+
+    async def delete_ticket_documents(self, ticket_id: UUID) -> None:
+        """Drop every document of a ticket that is being deleted; committed by the caller"""
+        if self.dialect not in ("sqlite", "postgresql"):
+            return
+        await self.session.execute(
+            text(f"DELETE FROM {self.table} WHERE ticket_id = :ticket_id"), {"ticket_id": self._uuid_key(ticket_id)}
+        )
+
+    async def search(self, query: str, skip: int = 0, limit: int = 20) -> Tuple[List[UUID], int]:
+        """Ticket ids ordered by best matching document, and the total number of matching tickets"""
+        if self.dialect == "sqlite":
+            match = _fts5_query(query)
+            if not match:
+                return [], 0
+            params = {"match": match, "skip": skip, "limit": limit}
+            # bm25() is lower for better matches. It only works on the MATCH scan itself,
+            # so score the hits in a materialized CTE and aggregate per ticket outside it.
+            rows = await self.session.execute(text(
+                "WITH hits AS MATERIALIZED ("
+                "SELECT ticket_id, bm25(support_search_fts) AS score FROM support_search_fts "
+                "WHERE support_search_fts MATCH :match) "
+                "SELECT ticket_id, MIN(score) AS rank FROM hits "
+                "GROUP BY ticket_id ORDER BY rank LIMIT :limit OFFSET :skip"
+            ), params)
+            total = await self.session.execute(text(
+                "SELECT COUNT(DISTINCT ticket_id) FROM support_search_fts WHERE support_search_fts MATCH :match"
+            ), params)
+        elif self.dialect == "postgresql":
+            params = {"query": query, "skip": skip, "limit": limit}
+            rows = await self.session.execute(text(
+                "SELECT ticket_id, MAX(ts_rank(search_vector, q)) AS rank "
+                "FROM support_search_document, websearch_to_tsquery('simple', :query) AS q "
+                "WHERE search_vector @@ q GROUP BY ticket_id "
+                "ORDER BY rank DESC LIMIT :limit OFFSET :skip"
+            ), params)
+            total = await self.session.execute(text(
+                "SELECT COUNT(DISTINCT ticket_id) FROM support_search_document "
+                "WHERE search_vector @@ websearch_to_tsquery('simple', :query)"
+            ), params)
+        else:
+            return [], 0
+
+        ticket_ids = [row[0] if isinstance(row[0], UUID) else UUID(row[0]) for row in rows.all()]
+        return ticket_ids, total.scalar() or 0
@@ -1,11 +1,22 @@
-from typing import Optional
-from sqlmodel import select
+from typing import Any, Optional, Tuple
+from sqlmodel import select, func
+from sqlalchemy import case
 from sqlalchemy.orm import selectinload
 from app.models.user import User
+from app.models.propfirm_registration import PropFirmRegistration, AccountStatus
 from app.schema.user import UserCreate, UserUpdate
 from app.repository.base_repo import BaseRepository
+from app.repository.support_search_repo import SupportSearchRepository
 
 class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
+    async def update(self, *, db_obj: User, obj_in: UserUpdate | dict[str, Any]) -> User:
+        """Update a user; a new email is written to their support tickets' search documents in the same commit"""
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+        email = update_data.get("email")
+        if email and email != db_obj.email:
+            await SupportSearchRepository(self.session).update_user_email(db_obj.id, email)
+        return await super().update(db_obj=db_obj, obj_in=obj_in)
+
     async def get_by_email(self, email: str) -> Optional[User]:
         query = select(self.model).where(self.model.email == email)
         result = await self.session.exec(query)
@@ -15,3 +26,24 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         query = select(self.model).where(self.model.referral_code == code)
         result = await self.session.exec(query)
         return result.first()
+
+    async def get_referral_stats(self, referral_code: str) -> Tuple[int, int, int, float]:
+        """
+        (referred users, passed registrations, pending registrations, cost of passed registrations)
+        for everyone referred with `referral_code`, in one query
+        """
+        passed = PropFirmRegistration.account_status == AccountStatus.passed
+        pending = PropFirmRegistration.account_status == AccountStatus.pending
+        query = (
+            select(
+                func.count(func.distinct(User.id)),
+                func.count(case((passed, PropFirmRegistration.id))),
+                func.count(case((pending, PropFirmRegistration.id))),
+                func.coalesce(func.sum(case((passed, PropFirmRegistration.propfirm_account_cost))), 0.0),
+            )
+            .select_from(User)
+            .outerjoin(PropFirmRegistration, PropFirmRegistration.user_id == User.id)
+            .where(User.referred_by == referral_code)
+        )
+        result = await self.session.exec(query)
+        return tuple(result.one())
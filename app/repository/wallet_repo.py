@@ -1,12 +1,19 @@
-from typing import List, Optional
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 from decimal import Decimal
 from datetime import datetime, timezone
 
-from sqlmodel import select
+from sqlalchemy import bindparam, func, insert
+from sqlmodel import select, update
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models.wallet import Wallet, ReferralEarning, WithdrawalRequest, EarningStatus, WithdrawalStatus
+from app.models.wallet import (
+    Wallet, ReferralEarning, WithdrawalRequest, WalletLedgerEntry,
+    EarningStatus, WithdrawalStatus, LedgerEntryType
+)
+from app.models.user import User
 from app.repository.base_repo import BaseRepository
 
 
@@ -22,45 +29,232 @@ class WalletRepository(BaseRepository[Wallet, dict, dict]):
         result = await self.session.exec(query)
         return result.first()
 
-    async def get_or_create(self, user_id: UUID) -> Wallet:
-        """Get existing wallet or create new one"""
+    async def ensure(self, user_id: UUID) -> None:
+        """
+        Create the user's zero-balance wallet unless it exists, as one INSERT ... ON CONFLICT DO NOTHING
+        so concurrent callers neither fail nor roll back. Only executed; the caller commits.
+        """
+        if self.session.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        now = datetime.now(timezone.utc)
+        stmt = dialect_insert(Wallet.__table__).values(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            available_balance=Decimal("0.00"),
+            locked_balance=Decimal("0.00"),
+            total_withdrawn=Decimal("0.00"),
+            created_at=now,
+            updated_at=now
+        ).on_conflict_do_nothing(index_elements=["user_id"])
+        await self.session.execute(stmt)
+
+    async def get_or_create(self, user_id: UUID, commit: bool = True) -> Wallet:
+        """
+        Get the user's wallet, creating it with `ensure` if missing. Wallets are created at signup,
+        so this only writes for accounts older than that. With commit=False the insert is left
+        in the caller's transaction.
+        """
         wallet = await self.get_by_user_id(user_id)
         if not wallet:
-            try:
-                wallet = Wallet(
-                    user_id=user_id,
-                    available_balance=Decimal("0.00"),
-                    locked_balance=Decimal("0.00"),
-                    total_withdrawn=Decimal("0.00")
-                )
-                self.session.add(wallet)
+            await self.ensure(user_id)
+            if commit:
                 await self.session.commit()
-                await self.session.refresh(wallet)
-            except Exception:
-                # Wallet was created by another request, rollback and fetch
-                await self.session.rollback()
-                wallet = await self.get_by_user_id(user_id)
+            wallet = await self.get_by_user_id(user_id)
         return wallet
 
+    async def get_summary(self, user_id: UUID) -> Tuple[Decimal, Decimal, Decimal, int, int]:
+        """
+        (available, locked, withdrawn, referrals, locked earnings) for a user in one read-only query;
+        zero balances when the user has no wallet yet.
+        """
+        zero = Decimal("0")
+        total_referrals = (
+            select(func.count(ReferralEarning.id))
+            .where(ReferralEarning.referrer_id == User.id)
+            .scalar_subquery()
+        )
+        pending_earnings = (
+            select(func.count(ReferralEarning.id))
+            .where(ReferralEarning.wallet_id == Wallet.id)
+            .where(ReferralEarning.status == EarningStatus.locked)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                func.coalesce(Wallet.available_balance, zero),
+                func.coalesce(Wallet.locked_balance, zero),
+                func.coalesce(Wallet.total_withdrawn, zero),
+                total_referrals,
+                pending_earnings
+            )
+            .select_from(User)
+            .outerjoin(Wallet, Wallet.user_id == User.id)
+            .where(User.id == user_id)
+        )
+        result = await self.session.execute(query)
+        row = result.first()
+        if row is None:
+            return zero, zero, zero, 0, 0
+        available, locked, withdrawn, referrals, pending = row
+        return Decimal(str(available)), Decimal(str(locked)), Decimal(str(withdrawn)), referrals, pending
+
     async def update_balances(
         self,
         wallet_id: UUID,
         available_delta: Decimal = Decimal("0"),
         locked_delta: Decimal = Decimal("0"),
-        withdrawn_delta: Decimal = Decimal("0")
-    ) -> Wallet:
-        """Update wallet balances by deltas"""
-        wallet = await self.get(wallet_id)
-        if wallet:
-            wallet.available_balance = Decimal(str(wallet.available_balance)) + available_delta
-            wallet.locked_balance = Decimal(str(wallet.locked_balance)) + locked_delta
-            wallet.total_withdrawn = Decimal(str(wallet.total_withdrawn)) + withdrawn_delta
-            wallet.updated_at = datetime.now(timezone.utc)
-            self.session.add(wallet)
+        withdrawn_delta: Decimal = Decimal("0"),
+        commit: bool = True,
+        *,
+        entry_type: LedgerEntryType,
+        reference_id: Optional[UUID] = None
+    ) -> Optional[Wallet]:
+        """
+        Record a balance movement in the ledger and apply it to the wallet's balance columns,
+        incremented in SQL so concurrent movements are not lost. Returns None if the wallet is missing.
+        """
+        now = datetime.now(timezone.utc)
+        result = await self.session.exec(
+            update(Wallet)
+            .where(Wallet.id == wallet_id)
+            .values(
+                available_balance=Wallet.available_balance + available_delta,
+                locked_balance=Wallet.locked_balance + locked_delta,
+                total_withdrawn=Wallet.total_withdrawn + withdrawn_delta,
+                updated_at=now
+            )
+            .execution_options(synchronize_session="fetch")
+        )
+        if not result.rowcount:
+            return None
+        await WalletLedgerRepository(self.session).append([{
+            "wallet_id": wallet_id,
+            "entry_type": entry_type,
+            "available_delta": available_delta,
+            "locked_delta": locked_delta,
+            "withdrawn_delta": withdrawn_delta,
+            "reference_id": reference_id,
+            "created_at": now
+        }])
+        if commit:
             await self.session.commit()
-            await self.session.refresh(wallet)
+        wallet = await self.get(wallet_id)
+        await self.session.refresh(wallet)
         return wallet
 
+    async def move_locked_to_available(self, releases: List[Tuple[UUID, UUID, Decimal]]) -> None:
+        """
+        Move released earnings, given as (earning_id, wallet_id, amount), from locked to available:
+        one release ledger entry per earning and one executemany UPDATE of the wallets, computed in SQL.
+        Only flushed; the caller commits.
+        """
+        if not releases:
+            return
+        amounts: Dict[UUID, Decimal] = defaultdict(Decimal)
+        for _, wallet_id, amount in releases:
+            amounts[wallet_id] += amount
+        wallet = Wallet.__table__
+        stmt = (
+            update(wallet)
+            .where(wallet.c.id == bindparam("wallet_id"))
+            .values(
+                available_balance=wallet.c.available_balance + bindparam("amount"),
+                locked_balance=wallet.c.locked_balance - bindparam("amount"),
+                updated_at=bindparam("now")
+            )
+        )
+        now = datetime.now(timezone.utc)
+        await self.session.execute(stmt, [
+            {"wallet_id": wallet_id, "amount": amount, "now": now}
+            for wallet_id, amount in amounts.items()
+        ])
+        await WalletLedgerRepository(self.session).append([
+            {
+                "wallet_id": wallet_id,
+                "entry_type": LedgerEntryType.release,
+                "available_delta": amount,
+                "locked_delta": -amount,
+                "withdrawn_delta": Decimal("0"),
+                "reference_id": earning_id,
+                "created_at": now
+            }
+            for earning_id, wallet_id, amount in releases
+        ])
+
+
+class WalletLedgerRepository:
+    """Repository for the append-only wallet ledger"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def append(self, entries: List[dict]) -> None:
+        """
+        Insert ledger entries (dicts of WalletLedgerEntry columns, id optional) as one batched
+        INSERT. Only executed in the caller's transaction; entries are never updated or deleted.
+        """
+        if not entries:
+            return
+        await self.session.execute(
+            insert(WalletLedgerEntry.__table__),
+            [{"id": uuid.uuid4(), **entry} for entry in entries]
+        )
+
+    async def get_by_wallet_id(self, wallet_id: UUID) -> List[WalletLedgerEntry]:
+        """A wallet's entries, oldest first"""
+        query = (
+            select(WalletLedgerEntry)
+            .where(WalletLedgerEntry.wallet_id == wallet_id)
+            .order_by(WalletLedgerEntry.created_at, WalletLedgerEntry.id)
+        )
+        result = await self.session.exec(query)
+        return list(result.all())
+
+    async def get_projection_chunk(
+        self,
+        limit: int,
+        after: Optional[UUID] = None
+    ) -> List[Tuple[UUID, Decimal, Decimal, Decimal, Decimal, Decimal, Decimal]]:
+        """
+        Up to `limit` wallets after `after` in id order, as (wallet_id, available, locked, withdrawn,
+        ledger available, ledger locked, ledger withdrawn). One aggregate query per chunk.
+        """
+        chunk = select(Wallet.id).order_by(Wallet.id).limit(limit)
+        if after is not None:
+            chunk = chunk.where(Wallet.id > after)
+        chunk = chunk.subquery()
+
+        zero = Decimal("0")
+        query = (
+            select(
+                Wallet.id,
+                Wallet.available_balance,
+                Wallet.locked_balance,
+                Wallet.total_withdrawn,
+                func.coalesce(func.sum(WalletLedgerEntry.available_delta), zero),
+                func.coalesce(func.sum(WalletLedgerEntry.locked_delta), zero),
+                func.coalesce(func.sum(WalletLedgerEntry.withdrawn_delta), zero)
+            )
+            .join(chunk, chunk.c.id == Wallet.id)
+            .outerjoin(WalletLedgerEntry, WalletLedgerEntry.wallet_id == Wallet.id)
+            .group_by(Wallet.id, Wallet.available_balance, Wallet.locked_balance, Wallet.total_withdrawn)
+            .order_by(Wallet.id)
+        )
+        result = await self.session.execute(query)
+        return [
+            (row[0], *(Decimal(str(value)) for value in row[1:]))
+            for row in result.all()
+        ]
+
+    async def get_wallets_without_entries(self, limit: int) -> List[Wallet]:
+        """Wallets that have no ledger entry yet (created before the ledger existed)"""
+        has_entry = select(WalletLedgerEntry.id).where(WalletLedgerEntry.wallet_id == Wallet.id)
+        query = select(Wallet).where(~has_entry.exists()).order_by(Wallet.id).limit(limit)
+        result = await self.session.exec(query)
+        return list(result.all())
+
 
 class ReferralEarningRepository(BaseRepository[ReferralEarning, dict, dict]):
     """Repository for ReferralEarning operations"""
@@ -97,18 +291,18 @@ class ReferralEarningRepository(BaseRepository[ReferralEarning, dict, dict]):
 
     async def count_by_referrer(self, referrer_id: UUID) -> int:
         """Count total referrals for a referrer"""
-        query = select(ReferralEarning).where(ReferralEarning.referrer_id == referrer_id)
+        query = select(func.count(ReferralEarning.id)).where(ReferralEarning.referrer_id == referrer_id)
         result = await self.session.exec(query)
-        return len(result.all())
+        return result.one()
 
     async def count_locked_by_wallet(self, wallet_id: UUID) -> int:
         """Count locked earnings for a wallet"""
-        query = select(ReferralEarning).where(
+        query = select(func.count(ReferralEarning.id)).where(
             ReferralEarning.wallet_id == wallet_id,
             ReferralEarning.status == EarningStatus.locked
         )
         result = await self.session.exec(query)
-        return len(result.all())
+        return result.one()
 
     async def release_earning(self, earning_id: UUID) -> Optional[ReferralEarning]:
         """Release a locked earning"""
@@ -122,6 +316,30 @@ class ReferralEarningRepository(BaseRepository[ReferralEarning, dict, dict]):
             await self.session.refresh(earning)
         return earning
 
+    async def release_locked_by_registrations(self, registration_ids: List[UUID]) -> List[Tuple[UUID, UUID, Decimal]]:
+        """
+        Release every locked earning for the given registrations in one UPDATE.
+        Returns (earning_id, wallet_id, amount) per released earning; only flushed, the caller commits.
+        """
+        if not registration_ids:
+            return []
+        stmt = (
+            update(ReferralEarning)
+            .where(ReferralEarning.registration_id.in_(registration_ids))
+            .where(ReferralEarning.status == EarningStatus.locked)
+            .values(
+                status=EarningStatus.released,
+                challenge_passed=True,
+                released_at=datetime.now(timezone.utc)
+            )
+            .returning(ReferralEarning.id, ReferralEarning.wallet_id, ReferralEarning.amount)
+        )
+        result = await self.session.execute(stmt)
+        return [
+            (earning_id, wallet_id, Decimal(str(amount)))
+            for earning_id, wallet_id, amount in result.all()
+        ]
+
     async def get_total_earnings_stats(self) -> dict:
         """Get overall earning statistics"""
         # This is a basic implementation. For large datasets, use direct SQL aggregation.
@@ -199,20 +417,8 @@ class WithdrawalRequestRepository(BaseRepository[WithdrawalRequest, dict, dict])
         result = await self.session.exec(query)
         return result.all()
 
-    async def get(self, id: UUID) -> Optional[WithdrawalRequest]:
-        """Get withdrawal by ID with UUID mismatch handling"""
-        obj = await super().get(id)
-        if not obj:
-             # Try fetching by string ID
-             from sqlalchemy import text
-             query = select(WithdrawalRequest).where(text("id = :uid")).params(uid=str(id))
-             result = await self.session.exec(query)
-             obj = result.first()
-        return obj
-
     async def get_all_with_filters(self, status: Optional[str] = None, limit: int = 10, offset: int = 0) -> tuple[List[tuple[WithdrawalRequest, dict]], int]:
         """Get all withdrawals with filters and pagination, including user info"""
-        from app.models.user import User
 
         # Join with User table
         query = select(WithdrawalRequest, User).join(Wallet, WithdrawalRequest.wallet_id == Wallet.id).join(User, Wallet.user_id == User.id)
@@ -239,40 +445,33 @@ class WithdrawalRequestRepository(BaseRepository[WithdrawalRequest, dict, dict])
         withdrawal_id: UUID,
         status: WithdrawalStatus,
         admin_notes: Optional[str] = None,
-        rejection_reason: Optional[str] = None
+        rejection_reason: Optional[str] = None,
+        commit: bool = True
     ) -> Optional[WithdrawalRequest]:
-        """Update withdrawal status"""
-        # Ensure we can find it first (using our robust get)
-        withdrawal = await self.get(withdrawal_id)
-        if not withdrawal:
+        """
+        Settle a pending withdrawal as completed or rejected. The UPDATE only matches while the
+        withdrawal is still pending, so of two concurrent admin actions just one applies. Returns
+        None when nothing changed: missing, already settled, or any other target status.
+        With commit=False it is only executed; the caller commits.
+        """
+        if status not in (WithdrawalStatus.completed, WithdrawalStatus.rejected):
             return None
-
-        processed_at = withdrawal.processed_at
-        if status in [WithdrawalStatus.completed, WithdrawalStatus.rejected]:
-            processed_at = datetime.now(timezone.utc)
-
-        # Use direct SQL update to avoid StaleDataError with UUID mismatch in SQLite
-        from sqlalchemy import text
-        stmt = text("""
-            UPDATE withdrawal_request
-            SET status = :status,
-                admin_notes = :notes,
-                rejection_reason = :reason,
-                processed_at = :processed_at
-            WHERE id = :uid
-        """)
-
-        await self.session.exec(stmt, params={
-            "status": status.value,
-            "notes": admin_notes if admin_notes is not None else withdrawal.admin_notes,
-            "reason": rejection_reason if rejection_reason is not None else withdrawal.rejection_reason,
-            "processed_at": processed_at,
-            "uid": str(withdrawal_id)
-        })
-        await self.session.commit()
-
-        # Re-fetch the object to ensure it's loaded and not expired
-        # session.refresh() failed, so we fetch a fresh instance
-        withdrawal = await self.get(withdrawal_id)
-
+        values = {"status": status, "processed_at": datetime.now(timezone.utc)}
+        if admin_notes is not None:
+            values["admin_notes"] = admin_notes
+        if rejection_reason is not None:
+            values["rejection_reason"] = rejection_reason
+
+        result = await self.session.exec(
+            update(WithdrawalRequest)
+            .where(WithdrawalRequest.id == withdrawal_id, WithdrawalRequest.status == WithdrawalStatus.pending)
+            .values(**values)
+            .execution_options(synchronize_session="fetch")
+        )
+        if not result.rowcount:
+            return None
+        if commit:
+            await self.session.commit()
+        withdrawal = await self.session.get(WithdrawalRequest, withdrawal_id)
+        await self.session.refresh(withdrawal)
         return withdrawal
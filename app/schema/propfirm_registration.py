@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import List
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from enum import Enum
 
@@ -60,3 +61,18 @@ class PropFirmRegistrationUpdate(BaseModel):
     telegram_username: str | None = None
     account_status: AccountStatus | None = None
     payment_status: PaymentStatus | None = None
+
+
+class ChallengeResultItem(BaseModel):
+    registration_id: UUID
+    account_status: AccountStatus
+
+class BulkChallengeResultRequest(BaseModel):
+    results: List[ChallengeResultItem] = Field(..., min_length=1, max_length=1000)
+
+class BulkChallengeResultResponse(BaseModel):
+    updated: int
+    unchanged: int
+    not_found: List[UUID]
+    earnings_released: int
+    amount_released: float
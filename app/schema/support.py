@@ -45,6 +45,8 @@ class SupportTicketListItem(BaseModel):
     created_at: datetime
     updated_at: datetime
     message_count: int = 0
+    last_message_at: Optional[datetime] = None
+    last_sender_type: Optional[SenderType] = None
     user_name: Optional[str] = None
     user_email: Optional[str] = None
 
@@ -53,7 +55,7 @@ class SupportTicketListItem(BaseModel):
 
 
 class SupportTicketRead(BaseModel):
-    """Schema for full ticket view with messages"""
+    """Schema for ticket view with the latest page of messages"""
     id: UUID
     user_id: UUID
     subject: str
@@ -62,6 +64,11 @@ class SupportTicketRead(BaseModel):
     created_at: datetime
     updated_at: datetime
     messages: List[SupportMessageRead] = []
+    # Older messages exist; fetch them from /tickets/{id}/messages passing next_before as `before`
+    # and next_before_id as `before_id` (both are needed: messages can share a timestamp)
+    has_more_messages: bool = False
+    next_before: Optional[datetime] = None
+    next_before_id: Optional[UUID] = None
     user_name: Optional[str] = None
     user_email: Optional[str] = None
 
@@ -81,6 +88,15 @@ class TicketPriorityUpdate(BaseModel):
 
 # ============= Paginated Response =============
 
+class PaginatedMessageResponse(BaseModel):
+    """A page of ticket messages, oldest first"""
+    items: List[SupportMessageRead]
+    has_more: bool
+    # Pass as `before` and `before_id` to load the previous page
+    next_before: Optional[datetime] = None
+    next_before_id: Optional[UUID] = None
+
+
 class PaginatedTicketResponse(BaseModel):
     """Paginated response for ticket lists"""
     items: List[SupportTicketListItem]
@@ -10,14 +10,14 @@ from app.models.wallet import EarningStatus, PaymentMethod, WithdrawalStatus
 # --- Wallet Response Schemas ---
 
 class WalletResponse(BaseModel):
-    """Wallet balance response"""
-    id: UUID
+    """Wallet balance response; id and timestamps are null while the user has no wallet row"""
+    id: Optional[UUID] = None
     user_id: UUID
     available_balance: float
     locked_balance: float
     total_withdrawn: float
-    created_at: datetime
-    updated_at: datetime
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
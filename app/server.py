@@ -0,0 +1,51 @@
+"""
+Production ASGI entry point: uvicorn serving app.main:app directly, no WSGI bridge.
+
+    python -m app.server                        # uvicorn, WEB_CONCURRENCY worker processes
+    gunicorn -c gunicorn.conf.py app.main:app   # gunicorn managing uvicorn workers
+
+Both pick uvloop and httptools when installed (requirements.txt) and read HOST, PORT,
+WEB_CONCURRENCY, SERVER_BACKLOG, SERVER_KEEPALIVE and FORWARDED_ALLOW_IPS from the settings.
+Prefer gunicorn where available: it restarts crashed workers and recycles them (max_requests),
+and its child_exit hook keeps multiprocess /metrics correct. passenger_wsgi.py remains as the
+fallback for hosts that can only run WSGI apps.
+"""
+import importlib.util
+import multiprocessing
+
+import uvicorn
+
+from app.config import settings
+
+
+def worker_count() -> int:
+    return settings.WEB_CONCURRENCY or multiprocessing.cpu_count() * 2 + 1
+
+
+def event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def main() -> None:
+    uvicorn.run(
+        "app.main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=worker_count(),
+        loop=event_loop(),
+        http=http_protocol(),
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        # The app logs each request itself (app.requests)
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
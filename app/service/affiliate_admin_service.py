@@ -15,6 +15,7 @@ from app.schema.affiliate_admin import (
     ProductAffiliateStats, AffiliateUserListResponse, GlobalSettingsResponse
 )
 from app.service.wallet_service import COMMISSION_RATE
+from app.service.affiliate_settings_cache import affiliate_settings_cache
 
 class AffiliateAdminService:
     """Service for admin affiliate operations"""
@@ -55,7 +56,9 @@ class AffiliateAdminService:
             settings.is_program_enabled = is_program_enabled
 
         self.session.add(settings)
+        await affiliate_settings_cache.bump_version(self.session)
         await self.session.commit()
+        affiliate_settings_cache.clear()
         await self.session.refresh(settings)
 
         return await self.get_global_settings()
@@ -176,7 +179,9 @@ class AffiliateAdminService:
             settings.notes = notes
 
         self.session.add(settings)
+        await affiliate_settings_cache.bump_version(self.session)
         await self.session.commit()
+        affiliate_settings_cache.clear()
         await self.session.refresh(settings)
 
         return settings
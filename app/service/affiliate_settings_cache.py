@@ -0,0 +1,109 @@
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.core.cache import MISSING, TTLCache
+from app.repository.affiliate_settings_repo import AffiliateSettingsRepository
+from app.repository.cache_version_repo import CacheVersionRepository
+from app.repository.global_settings_repo import GlobalSettingsRepository
+
+CACHE_VERSION_KEY = "affiliate_settings"
+_GLOBAL = "global"
+
+
+@dataclass(frozen=True)
+class GlobalAffiliateSnapshot:
+    """Detached copy of GlobalAffiliateSettings, safe to share between sessions"""
+    default_commission_rate: Decimal
+    minimum_withdrawal_amount: Decimal
+    is_program_enabled: bool
+
+
+@dataclass(frozen=True)
+class UserAffiliateSnapshot:
+    """Detached copy of a user's AffiliateSettings"""
+    custom_commission_rate: Optional[Decimal]
+    is_affiliate_enabled: bool
+
+
+class AffiliateSettingsCache:
+    """
+    In-process cache of the global and per-user affiliate settings, read on every referral purchase.
+
+    Writers call `bump_version` in the transaction that changes the settings and `clear` once it
+    has committed. Other workers notice the new version within `version_check_interval` seconds
+    (one tiny query per interval instead of two per purchase) and drop their entries.
+    """
+
+    def __init__(self, ttl: float, version_check_interval: float, maxsize: int = 10000):
+        self.version_check_interval = version_check_interval
+        self._cache = TTLCache("affiliate_settings", ttl=ttl, maxsize=maxsize)
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.ttl > 0
+
+    async def _sync_version(self, session: AsyncSession) -> None:
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < self.version_check_interval:
+            return
+        version = await CacheVersionRepository(session).get_version(CACHE_VERSION_KEY)
+        if version != self._version:
+            self._cache.clear()
+            self._version = version
+        self._checked_at = now
+
+    async def get_global(self, session: AsyncSession, commit: bool = True) -> GlobalAffiliateSnapshot:
+        """Global settings (created with defaults if missing, see GlobalSettingsRepository.get_settings)"""
+        if self.enabled:
+            await self._sync_version(session)
+            cached = self._cache.get(_GLOBAL)
+            if cached is not None:
+                return cached
+
+        row = await GlobalSettingsRepository(session).get_settings(commit=commit)
+        snapshot = GlobalAffiliateSnapshot(
+            default_commission_rate=row.default_commission_rate,
+            minimum_withdrawal_amount=row.minimum_withdrawal_amount,
+            is_program_enabled=row.is_program_enabled
+        )
+        self._cache.set(_GLOBAL, snapshot)
+        return snapshot
+
+    async def get_user(self, session: AsyncSession, user_id: UUID) -> Optional[UserAffiliateSnapshot]:
+        """A user's settings, or None when they have none (that is cached too)"""
+        if self.enabled:
+            await self._sync_version(session)
+            cached = self._cache.get(user_id)
+            if cached is not None:
+                return None if cached is MISSING else cached
+
+        row = await AffiliateSettingsRepository(session).get_by_user_id(user_id)
+        snapshot = UserAffiliateSnapshot(
+            custom_commission_rate=row.custom_commission_rate,
+            is_affiliate_enabled=row.is_affiliate_enabled
+        ) if row else None
+        self._cache.set(user_id, snapshot if snapshot else MISSING)
+        return snapshot
+
+    async def bump_version(self, session: AsyncSession) -> None:
+        """Invalidate every worker's cache; commits with the caller's transaction"""
+        await CacheVersionRepository(session).bump(CACHE_VERSION_KEY)
+
+    def clear(self) -> None:
+        """Drop this worker's entries and re-read the version on next use"""
+        self._cache.clear()
+        self._version = None
+
+
+affiliate_settings_cache = AffiliateSettingsCache(
+    ttl=settings.AFFILIATE_SETTINGS_CACHE_TTL,
+    version_check_interval=settings.AFFILIATE_SETTINGS_CACHE_VERSION_CHECK
+)
@@ -0,0 +1,47 @@
+import asyncio
+import contextlib
+import os
+import socket
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+
+from app.core.logging_config import logger
+from app.repository.job_lease_repo import JobLeaseRepository
+
+
+def lease_holder() -> str:
+    """This worker's name in job_lease; read per call, since workers fork after import"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def run_periodic(
+    name: str,
+    interval: float,
+    job: Callable[[], Awaitable[None]],
+    holder: Optional[str] = None,
+) -> None:
+    """
+    Background loop started from the app lifespan of every worker: each `interval` seconds,
+    take or renew the `name` lease for two intervals and run `job` only while holding it, so
+    one worker runs the job and another takes over once it stops renewing. A pass must finish
+    within the lease. The lease is given up when the loop is cancelled at shutdown.
+    """
+    from app.db.session import AsyncSessionLocal
+
+    holder = holder or lease_holder()
+    ttl = timedelta(seconds=interval * 2)
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSessionLocal() as session:
+                    leader = await JobLeaseRepository(session).acquire(name, holder, ttl)
+            except Exception as e:
+                logger.error(f"Taking the {name} lease failed: {e}")
+                continue
+            if leader:
+                await job()
+    finally:
+        with contextlib.suppress(Exception):
+            async with AsyncSessionLocal() as session:
+                await JobLeaseRepository(session).release(name, holder)
@@ -0,0 +1,153 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import BackgroundTasks
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.core.logging_config import logger
+from app.models.crypto_payment import CryptoPayment
+from app.models.propfirm_registration import PropFirmRegistration
+from app.repository.crypto_payment_repo import CryptoPaymentRepository
+from app.repository.propfirm_registration_repo import PropFirmRegistrationRepository
+from app.service.background_jobs import run_periodic
+from app.service.nowpayments_service import NOWPaymentsService, NOWPaymentsError, NOWPaymentsAPIError
+
+# Provider answers that mean the payment will never complete
+EXPIRED_PROVIDER_STATUSES = {"waiting", "expired"}
+# Final answers applied as if their IPN had arrived. Anything else (confirming, confirmed,
+# sending, partially_paid) is still in flight: the payment stays waiting, so the next sweep
+# asks again instead of the payment dropping out of the scan with a non-final status.
+RECONCILED_PROVIDER_STATUSES = {"finished", "failed", "refunded"}
+
+
+@dataclass
+class SweepResult:
+    scanned: int = 0
+    expired: int = 0
+    registrations_failed: int = 0
+    reconciled: int = 0
+    skipped: int = 0
+
+
+class CryptoPaymentSweeper:
+    """
+    Expires crypto payments that have been `waiting` for longer than the stale threshold.
+    Each batch is one transaction: payments and their pending registrations are updated
+    with set-based UPDATEs. When `confirm` is on, NOWPayments is asked for the final status
+    first so a payment whose IPN got lost is completed instead of expired, and a payment
+    the provider is still processing is left for a later sweep.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        stale_after: timedelta = timedelta(minutes=settings.CRYPTO_PAYMENT_STALE_AFTER_MINUTES),
+        batch_size: int = settings.CRYPTO_PAYMENT_SWEEP_BATCH_SIZE,
+        confirm: bool = settings.CRYPTO_PAYMENT_SWEEP_CONFIRM,
+        concurrency: int = settings.CRYPTO_PAYMENT_SWEEP_CONCURRENCY,
+    ):
+        self.session = session
+        self.stale_after = stale_after
+        self.batch_size = batch_size
+        self.confirm = confirm
+        self.concurrency = concurrency
+        self.payment_repo = CryptoPaymentRepository(CryptoPayment, session)
+        self.registration_repo = PropFirmRegistrationRepository(PropFirmRegistration, session)
+        self.nowpayments = NOWPaymentsService()
+
+    async def sweep(self) -> SweepResult:
+        result = SweepResult()
+        cutoff = datetime.now(timezone.utc) - self.stale_after
+        after = None
+        while True:
+            batch = await self.payment_repo.get_stale_waiting(cutoff, self.batch_size, after)
+            if not batch:
+                break
+            after = (batch[-1].created_at, batch[-1].id)
+            result.scanned += len(batch)
+            await self._sweep_batch(batch, result)
+            if len(batch) < self.batch_size:
+                break
+        return result
+
+    async def _sweep_batch(self, batch: List[CryptoPayment], result: SweepResult) -> None:
+        to_expire = batch
+        background_tasks = BackgroundTasks()
+        if self.confirm:
+            statuses = await self._fetch_statuses(batch)
+            to_expire = []
+            for payment, status in zip(batch, statuses):
+                provider_status = status.get("payment_status", "expired") if status else None
+                if provider_status in EXPIRED_PROVIDER_STATUSES:
+                    to_expire.append(payment)
+                elif provider_status in RECONCILED_PROVIDER_STATUSES:
+                    await self._reconcile(payment, status, background_tasks)
+                    result.reconciled += 1
+                else:
+                    # Provider unreachable or still processing: leave it for the next sweep
+                    result.skipped += 1
+
+        order_ids = list({p.order_id for p in to_expire if p.order_id})
+        result.expired += await self.payment_repo.mark_expired([p.id for p in to_expire])
+        result.registrations_failed += await self.registration_repo.fail_pending_by_order_ids(order_ids)
+        await self.session.commit()
+        # Emails for reconciled payments go out only once the batch is committed
+        await background_tasks()
+
+    async def _fetch_statuses(self, batch: List[CryptoPayment]) -> List[Optional[Dict[str, Any]]]:
+        """Look up the batch concurrently; None means the status could not be confirmed"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(payment: CryptoPayment) -> Optional[Dict[str, Any]]:
+            if not payment.payment_id:
+                # Invoice never turned into a payment, nothing to ask the provider about
+                return {"payment_status": "expired"}
+            async with semaphore:
+                try:
+                    return await self.nowpayments.get_payment_status(payment.payment_id)
+                except NOWPaymentsAPIError as e:
+                    if e.status_code == 404:
+                        return {"payment_status": "expired"}
+                    return None
+                except NOWPaymentsError:
+                    return None
+
+        return await asyncio.gather(*(fetch(p) for p in batch))
+
+    async def _reconcile(self, payment: CryptoPayment, status: Dict[str, Any], background_tasks: BackgroundTasks) -> None:
+        """Apply a final status the provider reported but whose IPN never arrived"""
+        from app.service.payment_completion_service import PaymentCompletionService
+
+        previous_status = payment.payment_status
+        payment.payment_status = status["payment_status"]
+        for field in ("pay_amount", "actually_paid", "outcome_amount", "outcome_currency"):
+            if status.get(field) is not None:
+                setattr(payment, field, status[field])
+        payment.updated_at = datetime.now(timezone.utc)
+        self.session.add(payment)
+        await PaymentCompletionService(self.session).handle_status_change(payment, previous_status, background_tasks)
+
+
+async def sweep_crypto_payments() -> None:
+    """One sweep with the configured settings, logged"""
+    from app.db.session import AsyncSessionLocal
+
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await CryptoPaymentSweeper(session).sweep()
+        if result.scanned:
+            logger.info(
+                f"Crypto payment sweep: scanned={result.scanned} expired={result.expired} "
+                f"registrations_failed={result.registrations_failed} reconciled={result.reconciled} "
+                f"skipped={result.skipped}"
+            )
+    except Exception as e:
+        logger.error(f"Crypto payment sweep failed: {e}")
+
+
+async def run_crypto_payment_sweeper(interval: int = settings.CRYPTO_PAYMENT_SWEEP_INTERVAL) -> None:
+    """Background loop started from the app lifespan; sweeps on one worker at a time"""
+    await run_periodic("crypto_payment_sweeper", interval, sweep_crypto_payments)
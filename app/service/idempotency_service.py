@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional, Type
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.config import settings
+from app.core.logging_config import logger
+from app.models.idempotency_key import IdempotencyStatus
+from app.repository.idempotency_repo import IdempotencyRepository
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+# How often a duplicate re-reads the key while the first request is still running
+POLL_INTERVAL = 0.1
+# An in-progress claim is a lease: if its worker dies, the key frees up this long after the
+# duplicates stop waiting, instead of blocking retries for the whole IDEMPOTENCY_KEY_TTL_HOURS
+CLAIM_LEASE_MARGIN = 30
+
+_last_purge = 0.0
+
+
+def _request_hash(payload: Any) -> str:
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _stored_expires_at() -> datetime:
+    """A completed key is kept for the full TTL"""
+    return datetime.now(timezone.utc) + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+def _replay(status_code: int, body: str) -> JSONResponse:
+    return JSONResponse(content=json.loads(body), status_code=status_code, headers={"Idempotent-Replayed": "true"})
+
+
+async def _session_call(method: str, *args):
+    """Run an IdempotencyRepository method in its own short session, apart from the request's transaction"""
+    from app.db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        return await getattr(IdempotencyRepository(session), method)(*args)
+
+
+async def _purge_expired() -> None:
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge < settings.IDEMPOTENCY_PURGE_INTERVAL:
+        return
+    _last_purge = now
+    deleted = await _session_call("delete_expired")
+    if deleted:
+        logger.info(f"Purged {deleted} expired idempotency keys")
+
+
+async def run_idempotent(
+    idempotency_key: Optional[str],
+    scope: str,
+    payload: Any,
+    handler: Callable[[], Awaitable[Any]],
+    response_model: Optional[Type[BaseModel]] = None,
+) -> Any:
+    """
+    Run `handler` at most once per (scope, Idempotency-Key) within IDEMPOTENCY_KEY_TTL_HOURS.
+
+    - No key: the handler just runs.
+    - First request with a key: runs the handler and stores the JSON response (and any 4xx error).
+    - Retry with the same key and payload: gets the stored response, marked Idempotent-Replayed.
+    - Retry while the first is still running: waits for its result (up to IDEMPOTENCY_WAIT_TIMEOUT).
+      A claim whose worker died without completing it expires soon after, so a retry runs again.
+    - Same key, different payload: 422.
+    Server errors are not stored; the key is released so a retry runs again.
+    `scope` must identify the endpoint and the caller, so keys never collide across users.
+    """
+    if not idempotency_key:
+        return await handler()
+    if len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"
+        )
+
+    key = f"{scope}:{idempotency_key}"
+    request_hash = _request_hash(payload)
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+
+    while True:
+        lease_expires_at = datetime.now(timezone.utc) + timedelta(
+            seconds=settings.IDEMPOTENCY_WAIT_TIMEOUT + CLAIM_LEASE_MARGIN
+        )
+        claimed, existing = await _session_call("claim", key, request_hash, lease_expires_at)
+        if claimed:
+            break
+        if existing is None:
+            # Released between our insert and the re-read: only a successful insert is a claim
+            continue
+        if await _session_call("delete_expired", key):
+            continue
+        if existing.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"{IDEMPOTENCY_HEADER} was already used with a different request"
+            )
+        if existing.status == IdempotencyStatus.completed:
+            return _replay(existing.response_status, existing.response_body)
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"A request with this {IDEMPOTENCY_HEADER} is still being processed"
+            )
+        await asyncio.sleep(POLL_INTERVAL)
+
+    await _purge_expired()
+    try:
+        result = await handler()
+    except HTTPException as e:
+        if e.status_code < 500:
+            body = json.dumps(jsonable_encoder({"detail": e.detail}))
+            await _session_call("complete", key, e.status_code, body, _stored_expires_at())
+        else:
+            await _session_call("release", key)
+        raise
+    except BaseException:
+        await _session_call("release", key)
+        raise
+
+    if response_model is not None:
+        result = response_model.model_validate(result, from_attributes=True)
+    content = jsonable_encoder(result)
+    await _session_call("complete", key, status.HTTP_200_OK, json.dumps(content), _stored_expires_at())
+    return JSONResponse(content=content)
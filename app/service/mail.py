@@ -1,16 +1,21 @@
 import os
+import time
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
-from jinja2 import Environment, FileSystemLoader
-from mailjet_rest import Client
 
 from app.config import settings
+from app.core.metrics import MAILJET_REQUEST_LATENCY
 
-# Setup Jinja2 environment
 template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
-env = Environment(loader=FileSystemLoader(template_dir))
+
+@lru_cache(maxsize=1)
+def get_template_env():
+    """Jinja2 environment, built on first use (most workers render no mail for a while)"""
+    from jinja2 import Environment, FileSystemLoader
+    return Environment(loader=FileSystemLoader(template_dir))
 
 def render_template(template_name: str, context: Dict[str, Any]) -> str:
-    template = env.get_template(template_name)
+    template = get_template_env().get_template(template_name)
     return template.render(**context)
 
 def send_email(
@@ -25,6 +30,7 @@ def send_email(
 
     html_content = render_template(template_name, context)
 
+    from mailjet_rest import Client
     mailjet = Client(auth=(settings.MAILJET_API_KEY, settings.MAILJET_SECRET_KEY), version='v3.1')
     data = {
         'Messages': [
@@ -44,7 +50,15 @@ def send_email(
             }
         ]
     }
-    result = mailjet.send.create(data=data)
+    start = time.perf_counter()
+    try:
+        result = mailjet.send.create(data=data)
+    except Exception:
+        MAILJET_REQUEST_LATENCY.labels(outcome="error").observe(time.perf_counter() - start)
+        raise
+    MAILJET_REQUEST_LATENCY.labels(
+        outcome="ok" if result.status_code == 200 else f"http_{result.status_code}"
+    ).observe(time.perf_counter() - start)
     if result.status_code != 200:
         print(f"Failed to send email: {result.status_code} {result.json()}")
     else:
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Tuple
 from uuid import UUID
 from fastapi import BackgroundTasks
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -11,8 +11,8 @@ class NotificationService:
     def __init__(self, session: AsyncSession):
         self.repo = NotificationRepository(Notification, session)
 
-    async def create_notification(self, notification_in: NotificationCreate) -> Notification:
-        return await self.repo.create(notification_in)
+    async def create_notification(self, notification_in: NotificationCreate, commit: bool = True) -> Notification:
+        return await self.repo.create(notification_in, commit=commit)
 
     async def get_user_notifications(self, user_id: UUID) -> List[Notification]:
         return await self.repo.get_by_user(user_id)
@@ -20,7 +20,8 @@ class NotificationService:
     async def get_admin_notifications(self, admin_id: UUID) -> List[Notification]:
         return await self.repo.get_by_admin(admin_id)
 
-    async def create_status_change_notification(self, user_id: UUID, status: str, propfirm_name: str) -> Notification:
+    @staticmethod
+    def _status_change_notification(user_id: UUID, status: str, propfirm_name: str) -> NotificationCreate:
         title = f"PropFirm Account {status.title()}"
         message = f"Your account for {propfirm_name} has been marked as {status}."
         type_map = {
@@ -31,14 +32,21 @@ class NotificationService:
         }
         notification_type = type_map.get(status, NotificationType.GENERAL)
 
-        notification_in = NotificationCreate(
+        return NotificationCreate(
             user_id=user_id,
             title=title,
             message=message,
             type=notification_type
         )
+
+    async def create_status_change_notification(self, user_id: UUID, status: str, propfirm_name: str) -> Notification:
+        notification_in = self._status_change_notification(user_id, status, propfirm_name)
         return await self.create_notification(notification_in)
 
+    async def create_status_change_notifications(self, changes: List[Tuple[UUID, str, str]]) -> None:
+        """Insert a status change notification per (user_id, status, propfirm_name) in one commit"""
+        await self.repo.create_many([self._status_change_notification(*change) for change in changes])
+
     async def _get_active_admin_emails(self) -> List[str]:
         from sqlmodel import select
         from app.models.admin import Admin
@@ -72,7 +80,7 @@ class NotificationService:
         )
         return await self.create_notification(notification_in)
 
-    async def create_payment_success_notification(self, user_id: UUID, order_id: str, propfirm_name: str) -> Notification:
+    async def create_payment_success_notification(self, user_id: UUID, order_id: str, propfirm_name: str, commit: bool = True) -> Notification:
         """Create notification for successful payment"""
         notification_in = NotificationCreate(
             user_id=user_id,
@@ -80,9 +88,9 @@ class NotificationService:
             message=f"Your payment for {propfirm_name} registration has been completed successfully!",
             type=NotificationType.PAYMENT_SUCCESS
         )
-        return await self.create_notification(notification_in)
+        return await self.create_notification(notification_in, commit=commit)
 
-    async def create_payment_failed_notification(self, user_id: UUID, order_id: str) -> Notification:
+    async def create_payment_failed_notification(self, user_id: UUID, order_id: str, commit: bool = True) -> Notification:
         """Create notification for failed payment"""
         notification_in = NotificationCreate(
             user_id=user_id,
@@ -90,9 +98,9 @@ class NotificationService:
             message=f"Your payment for order {order_id} could not be processed. Please try again.",
             type=NotificationType.PAYMENT_FAILED
         )
-        return await self.create_notification(notification_in)
+        return await self.create_notification(notification_in, commit=commit)
 
-    async def create_payment_partial_notification(self, user_id: UUID, order_id: str) -> Notification:
+    async def create_payment_partial_notification(self, user_id: UUID, order_id: str, commit: bool = True) -> Notification:
         """Create notification for partially paid payment"""
         notification_in = NotificationCreate(
             user_id=user_id,
@@ -100,7 +108,7 @@ class NotificationService:
             message=f"A partial payment has been received for order {order_id}. The remaining amount is still pending.",
             type=NotificationType.PAYMENT_PARTIAL
         )
-        return await self.create_notification(notification_in)
+        return await self.create_notification(notification_in, commit=commit)
 
     # Authentication Notifications
     async def create_email_verified_notification(self, user_id: UUID) -> Notification:
@@ -1,9 +1,103 @@
-import httpx
-from typing import Optional, List, Dict, Any
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional, List, Dict, Any
+from uuid import UUID
+
+from fastapi import BackgroundTasks
+from sqlmodel.ext.asyncio.session import AsyncSession
+
 from app.config import settings
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.logging_config import logger
+from app.core.metrics import NOWPAYMENTS_REQUEST_LATENCY, NOWPAYMENTS_REQUEST_ERRORS, NOWPAYMENTS_CIRCUIT_REJECTIONS
+from app.models.crypto_payment import CryptoPayment
+from app.repository.crypto_payment_repo import CryptoPaymentRepository
+from app.schema.crypto_payment import (
+    CryptoPaymentRead,
+    NOWPaymentsInvoiceRequest,
+    NOWPaymentsPaymentRequest,
+    NOWPaymentsIPNPayload,
+)
+
+if TYPE_CHECKING:
+    # Imported where the calls are made: httpx is only needed once a payment call happens
+    import httpx
+
+
+class NOWPaymentsError(Exception):
+    """Base error for NOWPayments API calls"""
+
+
+class NOWPaymentsTimeoutError(NOWPaymentsError):
+    """The API did not answer within the endpoint timeout"""
+
+
+class NOWPaymentsUnavailableError(NOWPaymentsError):
+    """The circuit breaker is open, the call was not attempted"""
+
+
+class NOWPaymentsAPIError(NOWPaymentsError):
+    """The API answered with an error status"""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# Default timeouts (seconds) per endpoint; anything else uses NOWPAYMENTS_TIMEOUT.
+# Overridable with NOWPAYMENTS_ENDPOINT_TIMEOUTS="payout=30,status=3".
+DEFAULT_ENDPOINT_TIMEOUTS: Dict[str, float] = {
+    "status": 3.0,
+    "currencies": 5.0,
+    "min-amount": 5.0,
+    "estimate": 5.0,
+    "payment/{id}": 5.0,
+    "payout/validate-address": 8.0,
+    "payout": 20.0,
+}
+
+# Status codes worth retrying for idempotent requests
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _parse_endpoint_timeouts(raw: str) -> Dict[str, float]:
+    timeouts = dict(DEFAULT_ENDPOINT_TIMEOUTS)
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        try:
+            timeouts[name.strip()] = float(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid NOWPayments timeout override: {item}")
+    return timeouts
+
+
+ENDPOINT_TIMEOUTS = _parse_endpoint_timeouts(settings.NOWPAYMENTS_ENDPOINT_TIMEOUTS)
+
+# One breaker per process, shared by every service instance
+circuit_breaker = CircuitBreaker(
+    "nowpayments",
+    failure_threshold=settings.NOWPAYMENTS_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.NOWPAYMENTS_CIRCUIT_RESET_TIMEOUT,
+)
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter"""
+    ceiling = min(settings.NOWPAYMENTS_BACKOFF_MAX, settings.NOWPAYMENTS_BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
 
 class NOWPaymentsService:
-    def __init__(self):
+    def __init__(self, session: Optional[AsyncSession] = None):
+        self.session = session
+        self.repo = CryptoPaymentRepository(CryptoPayment, session) if session else None
         self.api_key = settings.NOWPAYMENTS_API_KEY
         self.api_url = settings.NOWPAYMENTS_API_URL
         self.headers = {
@@ -11,51 +105,148 @@ class NOWPaymentsService:
             "Content-Type": "application/json"
         }
 
-    async def _post(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.api_url}/{endpoint}",
-                    headers=self.headers,
-                    json=data
-                )
-                response.raise_for_status()
+    # ============= Transport =============
+
+    def _timeout(self, name: str) -> "httpx.Timeout":
+        import httpx
+
+        total = ENDPOINT_TIMEOUTS.get(name, settings.NOWPAYMENTS_TIMEOUT)
+        return httpx.Timeout(total, connect=min(settings.NOWPAYMENTS_CONNECT_TIMEOUT, total))
+
+    @staticmethod
+    def _parse_response(response: "httpx.Response") -> Dict[str, Any]:
+        try:
+            return response.json()
+        except Exception:
+            # If response is not JSON (e.g. 200 OK but empty or HTML), return empty dict or raise error
+            # For validation, 200 OK is enough
+            if not response.content or response.text.strip() == "OK":
+                return {}
+            raise NOWPaymentsAPIError(f"Invalid JSON response from NOWPayments: {response.text}", response.status_code)
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        name: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Send a request to NOWPayments.
+        `name` is the templated endpoint (e.g. "payout/{id}") used for timeouts and metrics.
+        Only GETs are retried; every call goes through the shared circuit breaker.
+        """
+        import httpx
+
+        name = name or endpoint
+        attempts = 1 + (settings.NOWPAYMENTS_MAX_RETRIES if method == "GET" else 0)
+
+        async with httpx.AsyncClient(timeout=self._timeout(name)) as client:
+            for attempt in range(attempts):
                 try:
-                    return response.json()
-                except Exception:
-                    # If response is not JSON (e.g. 200 OK but empty or HTML), return empty dict or raise error
-                    # For validation, 200 OK is enough, but let's be safe
-                    if not response.content or response.text.strip() == "OK":
-                        return {}
-                    raise Exception(f"Invalid JSON response from NOWPayments: {response.text}")
-            except httpx.TimeoutException:
-                raise Exception("NOWPayments API timeout")
-            except httpx.HTTPStatusError as e:
-                raise Exception(f"NOWPayments API error: {e.response.text}")
-            except httpx.RequestError as e:
-                raise Exception(f"NOWPayments API connection error: {str(e)}")
-
-    async def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(
-                    f"{self.api_url}/{endpoint}",
-                    headers=self.headers,
-                    params=params
-                )
-                response.raise_for_status()
+                    circuit_breaker.before_call()
+                except CircuitOpenError:
+                    NOWPAYMENTS_CIRCUIT_REJECTIONS.labels(endpoint=name).inc()
+                    raise NOWPaymentsUnavailableError("NOWPayments API temporarily unavailable")
+
+                is_last = attempt == attempts - 1
+                start = time.perf_counter()
                 try:
-                    return response.json()
-                except Exception:
-                    if not response.content:
-                        return {}
-                    raise Exception(f"Invalid JSON response from NOWPayments: {response.text}")
-            except httpx.TimeoutException:
-                raise Exception("NOWPayments API timeout")
-            except httpx.HTTPStatusError as e:
-                raise Exception(f"NOWPayments API error: {e.response.text}")
-            except httpx.RequestError as e:
-                raise Exception(f"NOWPayments API connection error: {str(e)}")
+                    response = await client.request(
+                        method,
+                        f"{self.api_url}/{endpoint}",
+                        headers=self.headers,
+                        params=params,
+                        json=data,
+                    )
+                except httpx.TimeoutException:
+                    self._record_failure(name, method, "timeout", start)
+                    if is_last:
+                        raise NOWPaymentsTimeoutError("NOWPayments API timeout")
+                except httpx.RequestError as e:
+                    self._record_failure(name, method, "connection", start)
+                    if is_last:
+                        raise NOWPaymentsError(f"NOWPayments API connection error: {str(e)}")
+                except BaseException:
+                    # Cancelled (client gone, shutdown) or a bug: no verdict, so don't hold the half-open trial
+                    circuit_breaker.release_trial()
+                    raise
+                else:
+                    if response.status_code >= 500 or response.status_code == 429:
+                        self._record_failure(name, method, f"http_{response.status_code}", start)
+                        if is_last or response.status_code not in RETRYABLE_STATUS_CODES:
+                            raise NOWPaymentsAPIError(f"NOWPayments API error: {response.text}", response.status_code)
+                    else:
+                        # A 4xx still means the provider is up
+                        circuit_breaker.record_success()
+                        outcome = "ok" if response.is_success else f"http_{response.status_code}"
+                        NOWPAYMENTS_REQUEST_LATENCY.labels(endpoint=name, method=method, outcome=outcome).observe(
+                            time.perf_counter() - start
+                        )
+                        if not response.is_success:
+                            NOWPAYMENTS_REQUEST_ERRORS.labels(endpoint=name, method=method, error=outcome).inc()
+                            raise NOWPaymentsAPIError(f"NOWPayments API error: {response.text}", response.status_code)
+                        return self._parse_response(response)
+
+                delay = _backoff_delay(attempt)
+                logger.warning(f"NOWPayments {method} {name} failed (attempt {attempt + 1}/{attempts}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+        raise NOWPaymentsError("NOWPayments API request failed")
+
+    @staticmethod
+    def _record_failure(name: str, method: str, error: str, start: float) -> None:
+        circuit_breaker.record_failure()
+        NOWPAYMENTS_REQUEST_LATENCY.labels(endpoint=name, method=method, outcome=error).observe(time.perf_counter() - start)
+        NOWPAYMENTS_REQUEST_ERRORS.labels(endpoint=name, method=method, error=error).inc()
+
+    async def _post(self, endpoint: str, data: Dict[str, Any], name: Optional[str] = None) -> Dict[str, Any]:
+        return await self._request("POST", endpoint, name=name, data=data)
+
+    async def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None, name: Optional[str] = None) -> Dict[str, Any]:
+        return await self._request("GET", endpoint, name=name, params=params)
+
+    # ============= Public API =============
+
+    async def get_api_status(self) -> Dict[str, Any]:
+        """Check NOWPayments API status"""
+        return await self._get("status")
+
+    async def get_available_currencies(self) -> List[str]:
+        """Get list of available cryptocurrencies"""
+        response = await self._get("currencies")
+        return response.get("currencies", [])
+
+    async def get_minimum_amount(
+        self,
+        currency_from: str,
+        currency_to: Optional[str] = None,
+        is_fixed_rate: bool = False,
+        is_fee_paid_by_user: bool = False
+    ) -> Dict[str, Any]:
+        """Get minimum payment amount for currency pair"""
+        params = {
+            "currency_from": currency_from,
+            "is_fixed_rate": str(is_fixed_rate).lower(),
+            "is_fee_paid_by_user": str(is_fee_paid_by_user).lower(),
+        }
+        if currency_to:
+            params["currency_to"] = currency_to
+        return await self._get("min-amount", params)
+
+    async def get_estimated_price(self, amount: float, currency_from: str, currency_to: str) -> Dict[str, Any]:
+        """Get estimated price for conversion"""
+        return await self._get("estimate", {
+            "amount": amount,
+            "currency_from": currency_from,
+            "currency_to": currency_to
+        })
+
+    async def get_payment_status(self, payment_id: str) -> Dict[str, Any]:
+        """Get payment status from NOWPayments"""
+        return await self._get(f"payment/{payment_id}", name="payment/{id}")
 
     async def validate_address(self, address: str, currency: str, extra_id: Optional[str] = None) -> bool:
         """
@@ -67,13 +258,13 @@ class NOWPaymentsService:
             "extra_id": extra_id
         }
         try:
-            # The API returns 200 OK for valid addresses, but we should check the response body if needed.
-            # However, the documentation says "400 Bad Request" for invalid.
-            # Let's assume 200 is valid.
+            # The API returns 200 OK for valid addresses and 400 Bad Request for invalid ones.
             await self._post("payout/validate-address", payload)
             return True
-        except httpx.HTTPStatusError:
-            return False
+        except NOWPaymentsAPIError as e:
+            if e.status_code is not None and 400 <= e.status_code < 500:
+                return False
+            raise
 
     async def create_payout(self, withdrawals: List[Dict[str, Any]], ipn_callback_url: Optional[str] = None, payout_description: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -94,19 +285,152 @@ class NOWPaymentsService:
             "verification_code": verification_code
         }
         try:
-            await self._post(f"payout/{batch_withdrawal_id}/verify", payload)
+            await self._post(f"payout/{batch_withdrawal_id}/verify", payload, name="payout/{id}/verify")
             return True
-        except httpx.HTTPStatusError:
-            return False
+        except NOWPaymentsAPIError as e:
+            if e.status_code is not None and 400 <= e.status_code < 500:
+                return False
+            raise
 
     async def get_payout_status(self, payout_id: str) -> Dict[str, Any]:
         """
         Get status of a single payout.
         """
-        return await self._get(f"payout/{payout_id}")
+        return await self._get(f"payout/{payout_id}", name="payout/{id}")
 
     async def get_payouts(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         List payouts.
         """
         return await self._get("payout", params)
+
+    # ============= Payments (database backed) =============
+
+    async def create_payment(self, payment_data: NOWPaymentsPaymentRequest, user_id: UUID) -> CryptoPayment:
+        """Create a direct payment and store it"""
+        payload = payment_data.model_dump(exclude_none=True)
+        payload.setdefault("ipn_callback_url", settings.NOWPAYMENTS_IPN_CALLBACK_URL)
+        response = await self._post("payment", payload)
+
+        return await self.repo.create({
+            "user_id": user_id,
+            "payment_id": str(response["payment_id"]) if response.get("payment_id") is not None else None,
+            "order_id": payment_data.order_id,
+            "order_description": payment_data.order_description,
+            "price_amount": payment_data.price_amount,
+            "price_currency": payment_data.price_currency,
+            "pay_amount": response.get("pay_amount", payment_data.pay_amount),
+            "pay_currency": response.get("pay_currency", payment_data.pay_currency),
+            "pay_address": response.get("pay_address"),
+            "payin_extra_id": response.get("payin_extra_id"),
+            "payment_status": response.get("payment_status", "waiting"),
+            "purchase_id": str(response["purchase_id"]) if response.get("purchase_id") is not None else None,
+            "ipn_callback_url": payload.get("ipn_callback_url"),
+            "is_fixed_rate": payment_data.is_fixed_rate,
+            "is_fee_paid_by_user": payment_data.is_fee_paid_by_user,
+        })
+
+    async def create_invoice(self, invoice_data: NOWPaymentsInvoiceRequest, user_id: UUID) -> CryptoPayment:
+        """Create a payment invoice and store it"""
+        payload = invoice_data.model_dump(exclude_none=True)
+        payload.setdefault("ipn_callback_url", settings.NOWPAYMENTS_IPN_CALLBACK_URL)
+        response = await self._post("invoice", payload)
+
+        return await self.repo.create({
+            "user_id": user_id,
+            "invoice_id": str(response["id"]) if response.get("id") is not None else None,
+            "order_id": invoice_data.order_id,
+            "order_description": invoice_data.order_description,
+            "price_amount": invoice_data.price_amount,
+            "price_currency": invoice_data.price_currency,
+            "pay_currency": invoice_data.pay_currency or "",
+            "invoice_url": response.get("invoice_url"),
+            "ipn_callback_url": payload.get("ipn_callback_url"),
+            "is_fixed_rate": invoice_data.is_fixed_rate,
+            "is_fee_paid_by_user": invoice_data.is_fee_paid_by_user,
+        })
+
+    async def get_user_payments(self, user_id: UUID) -> List[CryptoPayment]:
+        """Get all crypto payments for a user"""
+        return await self.repo.get_by_user(user_id)
+
+    async def get_payment_by_id(self, payment_db_id: UUID) -> Optional[Dict[str, Any]]:
+        """Get a crypto payment with its linked prop firm registration"""
+        payment = await self.repo.get(payment_db_id)
+        if not payment:
+            return None
+
+        data = CryptoPaymentRead.model_validate(payment).model_dump()
+        if payment.order_id:
+            from app.models.propfirm_registration import PropFirmRegistration
+            from app.repository.propfirm_registration_repo import PropFirmRegistrationRepository
+
+            registration = await PropFirmRegistrationRepository(PropFirmRegistration, self.session).get_by_order_id(payment.order_id)
+            if registration:
+                data["propfirm_registration"] = {
+                    "id": registration.id,
+                    "propfirm_name": registration.propfirm_name,
+                    "order_id": registration.order_id,
+                    "payment_status": registration.payment_status,
+                    "account_status": registration.account_status,
+                }
+        return data
+
+    # ============= IPN =============
+
+    @staticmethod
+    def sign_ipn_payload(payload: Dict[str, Any], secret: str) -> str:
+        """HMAC-SHA512 over the key-sorted JSON body, as NOWPayments signs IPNs"""
+        message = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hmac.new(secret.encode(), message.encode(), hashlib.sha512).hexdigest()
+
+    def verify_ipn_signature(self, payload: Dict[str, Any], signature: str) -> bool:
+        if not settings.NOWPAYMENTS_IPN_SECRET:
+            return False
+        expected = self.sign_ipn_payload(payload, settings.NOWPAYMENTS_IPN_SECRET)
+        return hmac.compare_digest(expected, signature)
+
+    async def process_ipn_callback(
+        self,
+        payload: NOWPaymentsIPNPayload,
+        signature: str,
+        raw_body: Optional[Dict[str, Any]] = None,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> Optional[CryptoPayment]:
+        """
+        Verify an IPN callback and apply it to the stored payment.
+        The status change side effects (registration, referral earning, notification) are
+        committed together with the payment update; emails go on background_tasks.
+        """
+        signed_body = raw_body if raw_body is not None else payload.model_dump(exclude_none=True)
+        if not self.verify_ipn_signature(signed_body, signature):
+            raise ValueError("Invalid IPN signature")
+
+        payment = await self.repo.get_by_payment_id(str(payload.payment_id))
+        if not payment and payload.invoice_id is not None:
+            payment = await self.repo.get_by_invoice_id(str(payload.invoice_id))
+        if not payment:
+            return None
+
+        previous_status = payment.payment_status
+        payment.payment_id = str(payload.payment_id)
+        payment.payment_status = payload.payment_status
+        payment.pay_address = payload.pay_address
+        payment.pay_amount = payload.pay_amount
+        payment.actually_paid = payload.actually_paid
+        payment.payin_extra_id = payload.payin_extra_id
+        payment.outcome_amount = payload.outcome_amount
+        payment.outcome_currency = payload.outcome_currency
+        if payload.purchase_id is not None:
+            payment.purchase_id = str(payload.purchase_id)
+        payment.updated_at = datetime.now(timezone.utc)
+        self.session.add(payment)
+
+        from app.service.payment_completion_service import PaymentCompletionService
+        await PaymentCompletionService(self.session).handle_status_change(
+            payment, previous_status, background_tasks
+        )
+
+        await self.session.commit()
+        await self.session.refresh(payment)
+        return payment
@@ -0,0 +1,158 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional
+
+from fastapi import BackgroundTasks
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.models.crypto_payment import CryptoPayment
+from app.models.propfirm_registration import PropFirmRegistration, PaymentStatus
+from app.models.user import User
+from app.service.notification_service import NotificationService
+
+# NOWPayments statuses that settle the registration's payment status
+SETTLED_STATUSES = {
+    "finished": PaymentStatus.completed,
+    "failed": PaymentStatus.failed,
+    "expired": PaymentStatus.failed,
+}
+
+EMAIL_TEMPLATES = {
+    "finished": ("Payment Successful - Crypto Payment Confirmed", "crypto_payment_success.html"),
+    "partially_paid": ("Payment Partially Received", "crypto_payment_partial.html"),
+    "failed": ("Payment Failed", "crypto_payment_failed.html"),
+    "expired": ("Payment Failed", "crypto_payment_failed.html"),
+}
+
+
+class PaymentCompletionService:
+    """
+    Applies the side effects of a crypto payment status change.
+    Nothing here commits: the caller commits once, so the payment update, the registration status,
+    the referral earning and the notification land in the same transaction.
+    Emails are only queued on background_tasks and are sent after the response.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.notification_service = NotificationService(session)
+
+    async def handle_status_change(
+        self,
+        payment: CryptoPayment,
+        previous_status: Optional[str],
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> None:
+        status = payment.payment_status
+        # NOWPayments redelivers IPNs; a repeated status must not notify or credit twice
+        if status == previous_status or status not in EMAIL_TEMPLATES:
+            return
+
+        # User and registration in one round trip
+        query = (
+            select(User, PropFirmRegistration)
+            .select_from(CryptoPayment)
+            .join(User, User.id == CryptoPayment.user_id)
+            .outerjoin(PropFirmRegistration, PropFirmRegistration.order_id == CryptoPayment.order_id)
+            .where(CryptoPayment.id == payment.id)
+        )
+        row = (await self.session.exec(query)).first()
+        if not row:
+            return
+        user, registration = row
+
+        if registration and status in SETTLED_STATUSES:
+            settled = await self._settle_registration(registration, SETTLED_STATUSES[status])
+            if not settled:
+                # Another delivery already settled this registration
+                return
+            if settled == PaymentStatus.completed and user.referred_by:
+                from app.service.wallet_service import process_referral_purchase
+
+                await process_referral_purchase(
+                    self.session,
+                    referred_user_id=user.id,
+                    referrer_code=user.referred_by,
+                    pass_type=registration.pass_type,
+                    purchase_amount=Decimal(str(registration.propfirm_account_cost)),
+                    registration_id=registration.id,
+                    commit=False
+                )
+
+        await self._create_notification(user, payment, registration)
+
+        if background_tasks:
+            self._queue_emails(background_tasks, user, payment)
+
+    async def _settle_registration(
+        self,
+        registration: PropFirmRegistration,
+        new_status: PaymentStatus
+    ) -> Optional[PaymentStatus]:
+        """
+        Guarded UPDATE so concurrent deliveries settle the registration exactly once.
+        A completed registration is never downgraded.
+        """
+        stmt = (
+            update(PropFirmRegistration)
+            .where(PropFirmRegistration.id == registration.id)
+            .where(PropFirmRegistration.payment_status != new_status)
+            .where(PropFirmRegistration.payment_status != PaymentStatus.completed)
+            .values(payment_status=new_status, updated_at=datetime.now(timezone.utc))
+        )
+        result = await self.session.execute(stmt)
+        return new_status if result.rowcount else None
+
+    async def _create_notification(
+        self,
+        user: User,
+        payment: CryptoPayment,
+        registration: Optional[PropFirmRegistration]
+    ) -> None:
+        status = payment.payment_status
+        order_id = payment.order_id or str(payment.id)
+        if status == "finished":
+            propfirm_name = registration.propfirm_name if registration else (payment.order_description or order_id)
+            await self.notification_service.create_payment_success_notification(
+                user_id=user.id, order_id=order_id, propfirm_name=propfirm_name, commit=False
+            )
+        elif status == "partially_paid":
+            await self.notification_service.create_payment_partial_notification(
+                user_id=user.id, order_id=order_id, commit=False
+            )
+        else:
+            await self.notification_service.create_payment_failed_notification(
+                user_id=user.id, order_id=order_id, commit=False
+            )
+
+    def _queue_emails(self, background_tasks: BackgroundTasks, user: User, payment: CryptoPayment) -> None:
+        from app.service.mail import send_email
+
+        status = payment.payment_status
+        subject, template_name = EMAIL_TEMPLATES[status]
+        background_tasks.add_task(
+            send_email,
+            email_to=user.email,
+            subject=subject,
+            template_name=template_name,
+            context={
+                "user_name": user.name,
+                "payment_id": str(payment.id),
+                "status": status
+            }
+        )
+
+        if status == "finished" and settings.ADMIN_EMAIL:
+            background_tasks.add_task(
+                send_email,
+                email_to=settings.ADMIN_EMAIL,
+                subject="New Crypto Payment Received",
+                template_name="admin_crypto_payment_received.html",
+                context={
+                    "user_email": user.email,
+                    "payment_id": str(payment.id),
+                    "status": status
+                }
+            )
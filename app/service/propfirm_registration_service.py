@@ -1,13 +1,36 @@
+from collections import defaultdict
+from decimal import Decimal
 from uuid import UUID
 from typing import List
 from fastapi import BackgroundTasks
 from sqlmodel.ext.asyncio.session import AsyncSession
-from app.models.propfirm_registration import PropFirmRegistration
+from app.models.propfirm_registration import PropFirmRegistration, AccountStatus
 from app.models.user import User
-from app.schema.propfirm_registration import PropFirmRegistrationCreate, PropFirmRegistrationUpdate
+from app.schema.propfirm_registration import (
+    PropFirmRegistrationCreate, PropFirmRegistrationUpdate, ChallengeResultItem, BulkChallengeResultResponse
+)
 from app.repository.propfirm_registration_repo import PropFirmRegistrationRepository
 from app.utils.order_id import generate_order_id
 
+# (subject, template) of the emails sent when an account reaches a final status
+ADMIN_STATUS_EMAILS = {
+    AccountStatus.passed: ("Prop Firm Account Passed", "admin_account_passed.html"),
+    AccountStatus.failed: ("Prop Firm Account Failed", "admin_account_failed.html"),
+}
+USER_STATUS_EMAILS = {
+    AccountStatus.passed: ("Congratulations! You Passed!", "user_account_passed.html"),
+    AccountStatus.failed: ("Prop Firm Challenge Update", "user_account_failed.html"),
+}
+
+
+async def _create_status_change_notifications(changes) -> None:
+    """Background task: the bulk update's notifications, in their own session"""
+    from app.db.session import AsyncSessionLocal
+    from app.service.notification_service import NotificationService
+
+    async with AsyncSessionLocal() as session:
+        await NotificationService(session).create_status_change_notifications(changes)
+
 class PropFirmRegistrationService:
     def __init__(self, session: AsyncSession):
         self.repo = PropFirmRegistrationRepository(PropFirmRegistration, session)
@@ -46,62 +69,119 @@ class PropFirmRegistrationService:
             # Notify Admin
             from app.service.mail import send_email
             from app.config import settings
-            from app.models.propfirm_registration import AccountStatus
-
-            user = None
-            if settings.ADMIN_EMAIL:
-                template = None
-                subject = None
-                if updated_registration.account_status == AccountStatus.passed:
-                    template = "admin_account_passed.html"
-                    subject = "Prop Firm Account Passed"
-                elif updated_registration.account_status == AccountStatus.failed:
-                    template = "admin_account_failed.html"
-                    subject = "Prop Firm Account Failed"
-
-                if template:
-                    # Fetch user email
-                    user = await self.repo.session.get(User, updated_registration.user_id)
-                    user_email = user.email if user else "Unknown"
-
-                    background_tasks.add_task(
-                        send_email,
-                        email_to=settings.ADMIN_EMAIL,
-                        subject=subject,
-                        template_name=template,
-                        context={
-                            "user_email": user_email,
-                            "propfirm_name": updated_registration.propfirm_name,
-                            "login_id": updated_registration.login_id
-                        }
-                    )
-
-            # Ensure user is fetched for user notification
-            if not user:
-                user = await self.repo.session.get(User, updated_registration.user_id)
+
+            status = AccountStatus(updated_registration.account_status)
+            user = await self.repo.session.get(User, updated_registration.user_id)
+            if settings.ADMIN_EMAIL and status in ADMIN_STATUS_EMAILS:
+                subject, template = ADMIN_STATUS_EMAILS[status]
+                background_tasks.add_task(
+                    send_email,
+                    email_to=settings.ADMIN_EMAIL,
+                    subject=subject,
+                    template_name=template,
+                    context={
+                        "user_email": user.email if user else "Unknown",
+                        "propfirm_name": updated_registration.propfirm_name,
+                        "login_id": updated_registration.login_id
+                    }
+                )
 
             # Notify User
-            if user:
-                user_template = None
-                user_subject = None
-                if updated_registration.account_status == AccountStatus.passed:
-                    user_template = "user_account_passed.html"
-                    user_subject = "Congratulations! You Passed!"
-                elif updated_registration.account_status == AccountStatus.failed:
-                    user_template = "user_account_failed.html"
-                    user_subject = "Prop Firm Challenge Update"
-
-                if user_template:
-                    background_tasks.add_task(
-                        send_email,
-                        email_to=user.email,
-                        subject=user_subject,
-                        template_name=user_template,
-                        context={
-                            "name": user.name,
-                            "propfirm_name": updated_registration.propfirm_name,
-                            "login_id": updated_registration.login_id
-                        }
-                    )
+            if user and status in USER_STATUS_EMAILS:
+                subject, template = USER_STATUS_EMAILS[status]
+                background_tasks.add_task(
+                    send_email,
+                    email_to=user.email,
+                    subject=subject,
+                    template_name=template,
+                    context={
+                        "name": user.name,
+                        "propfirm_name": updated_registration.propfirm_name,
+                        "login_id": updated_registration.login_id
+                    }
+                )
 
         return updated_registration
+
+    async def apply_challenge_results(
+        self,
+        results: List[ChallengeResultItem],
+        background_tasks: BackgroundTasks
+    ) -> BulkChallengeResultResponse:
+        """
+        Apply many challenge outcomes at once. Status updates, the release of locked referral
+        earnings for passed accounts and the matching wallet balance moves are set-wise
+        statements in one transaction; notifications and emails follow in the background.
+        """
+        from app.config import settings
+        from app.repository.wallet_repo import ReferralEarningRepository, WalletRepository
+        from app.service.mail import send_email
+
+        session = self.repo.session
+        # Last entry wins for a registration listed twice
+        wanted = {item.registration_id: AccountStatus(item.account_status.value) for item in results}
+        rows = {registration.id: (registration, user) for registration, user in
+                await self.repo.get_many_with_users(list(wanted))}
+        not_found = [registration_id for registration_id in wanted if registration_id not in rows]
+
+        by_status = defaultdict(list)
+        for registration_id, status in wanted.items():
+            if registration_id in rows:
+                by_status[status].append(registration_id)
+
+        try:
+            changed = {}
+            for status, registration_ids in by_status.items():
+                for registration_id in await self.repo.set_account_status(registration_ids, status):
+                    changed[registration_id] = status
+
+            # Guarded by the earning status, so passed accounts released earlier are skipped
+            released = await ReferralEarningRepository(session).release_locked_by_registrations(
+                by_status.get(AccountStatus.passed, [])
+            )
+            await WalletRepository(session).move_locked_to_available(released)
+
+            # Plain values for the background work, read before commit can expire the rows
+            notices = []
+            for registration_id, status in changed.items():
+                registration, user = rows[registration_id]
+                notices.append((
+                    status, registration.user_id, registration.propfirm_name, registration.login_id,
+                    user.email, user.name
+                ))
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+        if notices:
+            background_tasks.add_task(_create_status_change_notifications, [
+                (user_id, status.value, propfirm_name) for status, user_id, propfirm_name, *_ in notices
+            ])
+        for status, _, propfirm_name, login_id, email, name in notices:
+            if settings.ADMIN_EMAIL and status in ADMIN_STATUS_EMAILS:
+                subject, template = ADMIN_STATUS_EMAILS[status]
+                background_tasks.add_task(
+                    send_email,
+                    email_to=settings.ADMIN_EMAIL,
+                    subject=subject,
+                    template_name=template,
+                    context={"user_email": email, "propfirm_name": propfirm_name, "login_id": login_id}
+                )
+            if status in USER_STATUS_EMAILS:
+                subject, template = USER_STATUS_EMAILS[status]
+                background_tasks.add_task(
+                    send_email,
+                    email_to=email,
+                    subject=subject,
+                    template_name=template,
+                    context={"name": name, "propfirm_name": propfirm_name, "login_id": login_id}
+                )
+
+        return BulkChallengeResultResponse(
+            updated=len(notices),
+            unchanged=len(rows) - len(notices),
+            not_found=not_found,
+            earnings_released=len(released),
+            amount_released=float(sum((amount for _, _, amount in released), Decimal("0")))
+        )
@@ -0,0 +1,103 @@
+import asyncio
+import contextlib
+import json
+from uuid import UUID
+
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from app.core.logging_config import logger
+from app.core.pubsub import get_pubsub
+from app.models.support import SenderType
+from app.schema.support import SupportMessageCreate
+from app.service.support_service import SupportTicketService, ticket_channel, publish_ticket_event
+
+
+class SupportChatService:
+    """
+    Live chat on one support ticket over an accepted, authenticated WebSocket.
+
+    Server -> client events (shared with every worker through the pub/sub):
+        {"type": "ready"}  once subscribed, sent to this socket only
+        {"type": "message", "message": {...SupportMessageRead}}
+        {"type": "status", "status": "in_progress"}
+        {"type": "typing", "sender_type": "admin", "sender_id": "..."}
+        {"type": "error", "detail": "..."}
+    Client -> server:
+        {"type": "message", "message": "text"}  persisted like POST .../messages, then broadcast
+        {"type": "typing"}
+    """
+
+    def __init__(self, websocket: WebSocket, ticket_id: UUID, sender_id: UUID, sender_type: SenderType):
+        self.websocket = websocket
+        self.ticket_id = ticket_id
+        self.sender_id = sender_id
+        self.sender_type = sender_type
+
+    async def run(self) -> None:
+        async with get_pubsub().subscribe(ticket_channel(self.ticket_id)) as events:
+            # Events published from here on reach this socket
+            await self.websocket.send_json({"type": "ready"})
+            forward = asyncio.create_task(self._forward(events))
+            try:
+                await self._receive()
+            except WebSocketDisconnect:
+                pass
+            finally:
+                forward.cancel()
+                # Collect the task so a send error surfaces here, not as "never retrieved"
+                with contextlib.suppress(asyncio.CancelledError):
+                    await forward
+
+    async def _forward(self, events: asyncio.Queue) -> None:
+        while True:
+            event = await events.get()
+            # Own typing indicator is noise for the sender
+            if event.get("type") == "typing" and event.get("sender_id") == str(self.sender_id):
+                continue
+            await self.websocket.send_json(event)
+
+    async def _receive(self) -> None:
+        while True:
+            try:
+                data = json.loads(await self.websocket.receive_text())
+            except (KeyError, ValueError):
+                # A binary frame or text that is not JSON
+                await self.websocket.send_json({"type": "error", "detail": "Invalid JSON"})
+                continue
+            event_type = data.get("type") if isinstance(data, dict) else None
+            if event_type == "typing":
+                await publish_ticket_event(self.ticket_id, {
+                    "type": "typing",
+                    "sender_type": self.sender_type.value,
+                    "sender_id": str(self.sender_id),
+                })
+            elif event_type == "message":
+                await self._add_message(data)
+            else:
+                await self.websocket.send_json({"type": "error", "detail": "Unknown event type"})
+
+    async def _add_message(self, data: dict) -> None:
+        from app.db.session import AsyncSessionLocal
+
+        try:
+            message_data = SupportMessageCreate(message=data.get("message"))
+        except ValidationError:
+            await self.websocket.send_json({"type": "error", "detail": "Message text is required"})
+            return
+
+        # A session per message: the socket stays open far longer than any transaction should
+        async with AsyncSessionLocal() as session:
+            try:
+                await SupportTicketService(session).add_message(
+                    ticket_id=self.ticket_id,
+                    sender_id=self.sender_id,
+                    sender_type=self.sender_type,
+                    message_data=message_data,
+                    is_admin=self.sender_type == SenderType.ADMIN
+                )
+            except HTTPException as e:
+                await self.websocket.send_json({"type": "error", "detail": e.detail})
+            except Exception as e:
+                logger.error(f"Live chat message on ticket {self.ticket_id} failed: {e}")
+                await self.websocket.send_json({"type": "error", "detail": "Could not send message"})
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
@@ -5,12 +6,27 @@ from fastapi import BackgroundTasks, HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.support import Support, SupportTicket, SupportMessage, TicketStatus, SenderType
+from app.models.user import User
 from app.schema.support import (
     SupportCreate, SupportTicketCreate, SupportMessageCreate,
     SupportTicketRead, SupportTicketListItem, SupportMessageRead,
-    PaginatedTicketResponse, TicketStatusUpdate
+    PaginatedTicketResponse, PaginatedMessageResponse, TicketStatusUpdate
 )
 from app.repository.support_repo import SupportRepository, SupportTicketRepository
+from app.repository.support_search_repo import SupportSearchRepository
+from app.core.pubsub import get_pubsub
+
+# Messages embedded in the ticket detail view; older ones are paged via get_ticket_messages
+MESSAGE_PAGE_SIZE = 50
+
+
+def ticket_channel(ticket_id: UUID) -> str:
+    """Pub/sub channel carrying a ticket's live chat events"""
+    return f"support_ticket_{ticket_id.hex}"
+
+
+async def publish_ticket_event(ticket_id: UUID, event: dict) -> None:
+    await get_pubsub().publish(ticket_channel(ticket_id), event)
 
 
 class SupportService:
@@ -61,9 +77,9 @@ class SupportTicketService:
             initial_message=ticket_data.message
         )
 
-        # Reload ticket with messages
+        # Reload ticket with user and messages
         ticket = await self.repo.get_ticket_with_user(ticket.id)
-        return self._ticket_to_read(ticket)
+        return await self._ticket_to_read(ticket)
 
     async def get_user_tickets(
         self,
@@ -75,7 +91,7 @@ class SupportTicketService:
         tickets = await self.repo.get_tickets_by_user(user_id, skip, limit)
         total = await self.repo.count_tickets(user_id=user_id)
 
-        items = [self._ticket_to_list_item(t) for t in tickets]
+        items = [self._ticket_to_list_item(ticket) for ticket in tickets]
         return PaginatedTicketResponse(
             items=items,
             total=total,
@@ -89,23 +105,31 @@ class SupportTicketService:
         user_id: Optional[UUID] = None,
         is_admin: bool = False
     ) -> SupportTicketRead:
-        """Get ticket details with messages. Validates access for non-admins."""
+        """Get ticket details with the latest page of messages. Validates access for non-admins."""
         ticket = await self.repo.get_ticket_with_user(ticket_id)
+        self._check_access(ticket, user_id, is_admin)
+        return await self._ticket_to_read(ticket)
 
-        if not ticket:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Ticket not found"
-            )
-
-        # Non-admins can only view their own tickets
-        if not is_admin and ticket.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ticket"
-            )
-
-        return self._ticket_to_read(ticket)
+    async def get_ticket_messages(
+        self,
+        ticket_id: UUID,
+        user_id: Optional[UUID] = None,
+        is_admin: bool = False,
+        before: Optional[datetime] = None,
+        limit: int = MESSAGE_PAGE_SIZE,
+        before_id: Optional[UUID] = None
+    ) -> PaginatedMessageResponse:
+        """Get a page of a ticket's messages older than (`before`, `before_id`). Validates access for non-admins."""
+        ticket = await self.repo.get_ticket_by_id(ticket_id)
+        self._check_access(ticket, user_id, is_admin)
+
+        messages, has_more = await self.repo.get_message_page(ticket_id, before, limit, before_id)
+        return PaginatedMessageResponse(
+            items=[self._message_to_read(m) for m in messages],
+            has_more=has_more,
+            next_before=messages[0].created_at if has_more else None,
+            next_before_id=messages[0].id if has_more else None
+        )
 
     async def add_message(
         self,
@@ -117,19 +141,8 @@ class SupportTicketService:
     ) -> SupportMessageRead:
         """Add a message to a ticket. Validates access."""
         ticket = await self.repo.get_ticket_by_id(ticket_id)
-
-        if not ticket:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Ticket not found"
-            )
-
         # Non-admins can only message on their own tickets
-        if not is_admin and ticket.user_id != sender_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this ticket"
-            )
+        self._check_access(ticket, sender_id, is_admin)
 
         # Cannot add messages to closed tickets
         if ticket.status == TicketStatus.CLOSED:
@@ -138,6 +151,7 @@ class SupportTicketService:
                 detail="Cannot add messages to closed tickets"
             )
 
+        previous_status = ticket.status
         message = await self.repo.add_message(
             ticket_id=ticket_id,
             sender_id=sender_id,
@@ -145,14 +159,12 @@ class SupportTicketService:
             message_content=message_data.message
         )
 
-        return SupportMessageRead(
-            id=message.id,
-            ticket_id=message.ticket_id,
-            sender_id=message.sender_id,
-            sender_type=message.sender_type,
-            message=message.message,
-            created_at=message.created_at
-        )
+        message_read = self._message_to_read(message)
+        # Live chat subscribers on any worker get the message once it is committed
+        await publish_ticket_event(ticket_id, {"type": "message", "message": message_read.model_dump(mode="json")})
+        if ticket.status != previous_status:
+            await publish_ticket_event(ticket_id, {"type": "status", "status": TicketStatus(ticket.status).value})
+        return message_read
 
     # ============= Admin Operations =============
 
@@ -163,10 +175,45 @@ class SupportTicketService:
         status_filter: Optional[TicketStatus] = None
     ) -> PaginatedTicketResponse:
         """Get all tickets for admin view"""
-        tickets = await self.repo.get_all_tickets(skip, limit, status_filter)
+        rows = await self.repo.get_all_tickets(skip, limit, status_filter)
         total = await self.repo.count_tickets(status=status_filter)
 
-        items = [self._ticket_to_list_item(t) for t in tickets]
+        items = [self._ticket_to_list_item(ticket, user) for ticket, user in rows]
+        return PaginatedTicketResponse(
+            items=items,
+            total=total,
+            skip=skip,
+            limit=limit
+        )
+
+    async def get_awaiting_reply(
+        self,
+        skip: int = 0,
+        limit: int = 20
+    ) -> PaginatedTicketResponse:
+        """Open tickets whose latest message is from the user, longest waiting first"""
+        rows = await self.repo.get_awaiting_reply(skip, limit)
+        total = await self.repo.count_awaiting_reply()
+
+        items = [self._ticket_to_list_item(ticket, user) for ticket, user in rows]
+        return PaginatedTicketResponse(
+            items=items,
+            total=total,
+            skip=skip,
+            limit=limit
+        )
+
+    async def search_tickets(
+        self,
+        query: str,
+        skip: int = 0,
+        limit: int = 20
+    ) -> PaginatedTicketResponse:
+        """Full-text search over ticket subjects, messages and user emails, best match first"""
+        ticket_ids, total = await SupportSearchRepository(self.session).search(query, skip, limit)
+        rows = await self.repo.get_tickets_by_ids(ticket_ids)
+
+        items = [self._ticket_to_list_item(ticket, user) for ticket, user in rows]
         return PaginatedTicketResponse(
             items=items,
             total=total,
@@ -188,25 +235,41 @@ class SupportTicketService:
                 detail="Ticket not found"
             )
 
+        await publish_ticket_event(ticket_id, {"type": "status", "status": TicketStatus(ticket.status).value})
+
         # Reload with user info
         ticket = await self.repo.get_ticket_with_user(ticket_id)
-        return self._ticket_to_read(ticket)
+        return await self._ticket_to_read(ticket)
 
     # ============= Helper Methods =============
 
-    def _ticket_to_read(self, ticket: SupportTicket) -> SupportTicketRead:
-        """Convert ticket model to read schema"""
-        messages = [
-            SupportMessageRead(
-                id=m.id,
-                ticket_id=m.ticket_id,
-                sender_id=m.sender_id,
-                sender_type=m.sender_type,
-                message=m.message,
-                created_at=m.created_at
+    def _check_access(self, ticket: Optional[SupportTicket], user_id: Optional[UUID], is_admin: bool) -> None:
+        if not ticket:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Ticket not found"
             )
-            for m in sorted(ticket.messages, key=lambda x: x.created_at)
-        ] if ticket.messages else []
+
+        # Non-admins can only view their own tickets
+        if not is_admin and ticket.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this ticket"
+            )
+
+    def _message_to_read(self, message: SupportMessage) -> SupportMessageRead:
+        return SupportMessageRead(
+            id=message.id,
+            ticket_id=message.ticket_id,
+            sender_id=message.sender_id,
+            sender_type=message.sender_type,
+            message=message.message,
+            created_at=message.created_at
+        )
+
+    async def _ticket_to_read(self, ticket: SupportTicket) -> SupportTicketRead:
+        """Convert ticket model to read schema with the latest page of messages"""
+        messages, has_more = await self.repo.get_message_page(ticket.id, limit=MESSAGE_PAGE_SIZE)
 
         user_name = None
         user_email = None
@@ -222,18 +285,22 @@ class SupportTicketService:
             priority=ticket.priority,
             created_at=ticket.created_at,
             updated_at=ticket.updated_at,
-            messages=messages,
+            messages=[self._message_to_read(m) for m in messages],
+            has_more_messages=has_more,
+            next_before=messages[0].created_at if has_more else None,
+            next_before_id=messages[0].id if has_more else None,
             user_name=user_name,
             user_email=user_email
         )
 
-    def _ticket_to_list_item(self, ticket: SupportTicket) -> SupportTicketListItem:
+    def _ticket_to_list_item(
+        self,
+        ticket: SupportTicket,
+        user: Optional[User] = None
+    ) -> SupportTicketListItem:
         """Convert ticket model to list item schema"""
-        user_name = None
-        user_email = None
-        if hasattr(ticket, 'user') and ticket.user:
-            user_name = ticket.user.name
-            user_email = ticket.user.email
+        user_name = user.name if user else None
+        user_email = user.email if user else None
 
         return SupportTicketListItem(
             id=ticket.id,
@@ -243,7 +310,9 @@ class SupportTicketService:
             priority=ticket.priority,
             created_at=ticket.created_at,
             updated_at=ticket.updated_at,
-            message_count=len(ticket.messages) if ticket.messages else 0,
+            message_count=ticket.message_count or 0,
+            last_message_at=ticket.last_message_at,
+            last_sender_type=ticket.last_sender_type,
             user_name=user_name,
             user_email=user_email
         )
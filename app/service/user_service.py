@@ -5,8 +5,15 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.user import User
 from app.schema.user import UserCreate, UserUpdate
 from app.repository.user_repo import UserRepository
+from app.repository.wallet_repo import WalletRepository
+from app.schema.referral import ReferralStatsResponse
+from app.config import settings
+from app.core.cache import TTLCache
 from app.core.security import get_password_hash
 
+# Referral stats change only when a referred user registers or a challenge is settled
+_referral_stats_cache = TTLCache("referral_stats", ttl=settings.REFERRAL_STATS_CACHE_TTL)
+
 class UserService:
     def __init__(self, session: AsyncSession):
         self.repo = UserRepository(User, session)
@@ -16,7 +23,11 @@ class UserService:
         user_data["password"] = get_password_hash(user_in.password)
         # Handle referral code generation logic if needed, but model handles default factory
         # Handle referred_by if needed
-        user = await self.repo.create(user_data)
+        user = await self.repo.create(user_data, commit=False)
+        # The wallet comes with the account, so wallet reads never have to create one
+        await WalletRepository(self.repo.session).ensure(user.id)
+        await self.repo.session.commit()
+        await self.repo.session.refresh(user)
 
         # Notify Admin
         from app.service.mail import send_email
@@ -63,6 +74,25 @@ class UserService:
     async def update_user(self, user: User, user_in: UserUpdate) -> User:
         return await self.repo.update(db_obj=user, obj_in=user_in)
 
+    async def get_referral_stats(self, user: User) -> ReferralStatsResponse:
+        """Referral stats for `user`, cached per user for REFERRAL_STATS_CACHE_TTL seconds"""
+        stats = _referral_stats_cache.get(user.id)
+        if stats is not None:
+            return stats
+
+        total_referrals, successful_passes, pending_referrals, passed_cost = \
+            await self.repo.get_referral_stats(user.referral_code)
+        stats = ReferralStatsResponse(
+            referral_code=user.referral_code,
+            total_referrals=total_referrals,
+            successful_passes=successful_passes,
+            pending_referrals=pending_referrals,
+            # 2% of account cost for passed accounts
+            total_earned=float(passed_cost) * 0.02
+        )
+        _referral_stats_cache.set(user.id, stats)
+        return stats
+
     async def recover_password(self, email: str, background_tasks: BackgroundTasks) -> None:
         user = await self.get_user_by_email(email)
         if not user:
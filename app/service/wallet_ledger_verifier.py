@@ -0,0 +1,135 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.core.logging_config import logger
+from app.models.wallet import Wallet, LedgerEntryType
+from app.repository.wallet_repo import WalletLedgerRepository
+from app.service.background_jobs import run_periodic
+
+
+@dataclass
+class WalletDrift:
+    """A wallet whose balance columns disagree with the sum of its ledger entries"""
+    wallet_id: UUID
+    available_balance: Decimal
+    locked_balance: Decimal
+    total_withdrawn: Decimal
+    ledger_available: Decimal
+    ledger_locked: Decimal
+    ledger_withdrawn: Decimal
+
+
+@dataclass
+class VerificationResult:
+    checked: int = 0
+    drifts: List[WalletDrift] = field(default_factory=list)
+    repaired: int = 0
+
+
+class WalletLedgerVerifier:
+    """
+    Compares every wallet's balance columns with the sums of its ledger entries, walking the
+    wallets in id order `batch_size` at a time (one aggregate query per batch), and reports drift.
+    With `repair` on, drifted wallets are reset to the ledger totals, the source of truth.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        batch_size: int = settings.WALLET_LEDGER_VERIFY_BATCH_SIZE,
+        repair: bool = False,
+    ):
+        self.session = session
+        self.batch_size = batch_size
+        self.repair = repair
+        self.ledger_repo = WalletLedgerRepository(session)
+
+    async def verify(self) -> VerificationResult:
+        result = VerificationResult()
+        after: Optional[UUID] = None
+        while True:
+            chunk = await self.ledger_repo.get_projection_chunk(self.batch_size, after)
+            if not chunk:
+                break
+            after = chunk[-1][0]
+            result.checked += len(chunk)
+            drifts = [WalletDrift(*row) for row in chunk if row[1:4] != row[4:7]]
+            result.drifts.extend(drifts)
+            if drifts and self.repair:
+                await self._repair(drifts)
+                result.repaired += len(drifts)
+            # End the read transaction between batches so a long run does not pin a snapshot
+            await self.session.commit()
+            if len(chunk) < self.batch_size:
+                break
+        return result
+
+    async def _repair(self, drifts: List[WalletDrift]) -> None:
+        for drift in drifts:
+            await self.session.exec(
+                update(Wallet)
+                .where(Wallet.id == drift.wallet_id)
+                .values(
+                    available_balance=drift.ledger_available,
+                    locked_balance=drift.ledger_locked,
+                    total_withdrawn=drift.ledger_withdrawn
+                )
+            )
+
+
+async def backfill_opening_balances(session: AsyncSession, batch_size: int = 500) -> int:
+    """
+    Give every wallet that has no ledger entry yet an opening_balance entry carrying its current
+    balances, so the ledger sums match the columns from the start. Returns the number of wallets.
+    """
+    ledger_repo = WalletLedgerRepository(session)
+    total = 0
+    while True:
+        wallets = await ledger_repo.get_wallets_without_entries(batch_size)
+        if not wallets:
+            break
+        await ledger_repo.append([
+            {
+                "wallet_id": wallet.id,
+                "entry_type": LedgerEntryType.opening_balance,
+                "available_delta": wallet.available_balance,
+                "locked_delta": wallet.locked_balance,
+                "withdrawn_delta": wallet.total_withdrawn,
+                "created_at": wallet.created_at
+            }
+            for wallet in wallets
+        ])
+        await session.commit()
+        total += len(wallets)
+        if len(wallets) < batch_size:
+            break
+    return total
+
+
+async def verify_wallet_ledger() -> None:
+    """One report-only verification, logged"""
+    from app.db.session import AsyncSessionLocal
+
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await WalletLedgerVerifier(session).verify()
+        if result.drifts:
+            logger.error(
+                f"Wallet ledger drift: {len(result.drifts)} of {result.checked} wallets, e.g. "
+                + ", ".join(str(drift.wallet_id) for drift in result.drifts[:10])
+            )
+        else:
+            logger.info(f"Wallet ledger verified: {result.checked} wallets, no drift")
+    except Exception as e:
+        logger.error(f"Wallet ledger verification failed: {e}")
+
+
+async def run_wallet_ledger_verifier(interval: int = settings.WALLET_LEDGER_VERIFY_INTERVAL) -> None:
+    """Background loop started from the app lifespan; verifies on one worker at a time, never repairs"""
+    await run_periodic("wallet_ledger_verifier", interval, verify_wallet_ledger)
@@ -8,7 +8,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.wallet import (
     Wallet, ReferralEarning, WithdrawalRequest,
-    EarningStatus, PaymentMethod, WithdrawalStatus
+    EarningStatus, PaymentMethod, WithdrawalStatus, LedgerEntryType
 )
 from app.models.propfirm_registration import PassType
 from app.repository.wallet_repo import WalletRepository, ReferralEarningRepository, WithdrawalRequestRepository
@@ -38,30 +38,44 @@ class WalletService:
         # But here we can just instantiate it when needed.
 
     async def get_wallet(self, user_id: UUID) -> Wallet:
-        """Get or create wallet for user"""
+        """Get wallet for user (created at signup; only accounts older than that get one here)"""
         return await self.wallet_repo.get_or_create(user_id)
 
-    async def get_wallet_summary(self, user_id: UUID) -> WalletSummaryResponse:
-        """Get wallet dashboard summary"""
-        wallet = await self.get_wallet(user_id)
-        total_referrals = await self.earning_repo.count_by_referrer(user_id)
-        pending_earnings = await self.earning_repo.count_locked_by_wallet(wallet.id)
+    async def get_wallet_balance(self, user_id: UUID) -> WalletResponse:
+        """Get wallet balance: read-only, zeros if the user has no wallet yet"""
+        wallet = await self.wallet_repo.get_by_user_id(user_id)
+        if not wallet:
+            return WalletResponse(user_id=user_id, available_balance=0.0, locked_balance=0.0, total_withdrawn=0.0)
 
-        available = float(wallet.available_balance)
-        locked = float(wallet.locked_balance)
+        return WalletResponse(
+            id=wallet.id,
+            user_id=wallet.user_id,
+            available_balance=float(wallet.available_balance),
+            locked_balance=float(wallet.locked_balance),
+            total_withdrawn=float(wallet.total_withdrawn),
+            created_at=wallet.created_at,
+            updated_at=wallet.updated_at
+        )
+
+    async def get_wallet_summary(self, user_id: UUID) -> WalletSummaryResponse:
+        """Get wallet dashboard summary: one read-only query, zeros if the user has no wallet yet"""
+        available, locked, withdrawn, total_referrals, pending_earnings = \
+            await self.wallet_repo.get_summary(user_id)
 
         return WalletSummaryResponse(
-            available_balance=available,
-            locked_balance=locked,
-            total_balance=available + locked,
-            total_withdrawn=float(wallet.total_withdrawn),
+            available_balance=float(available),
+            locked_balance=float(locked),
+            total_balance=float(available + locked),
+            total_withdrawn=float(withdrawn),
             total_referrals=total_referrals,
             pending_earnings=pending_earnings
         )
 
     async def get_earnings(self, user_id: UUID) -> List[ReferralEarning]:
         """Get all referral earnings for user"""
-        wallet = await self.get_wallet(user_id)
+        wallet = await self.wallet_repo.get_by_user_id(user_id)
+        if not wallet:
+            return []
         return await self.earning_repo.get_by_wallet_id(wallet.id)
 
     async def process_referral_purchase(
@@ -70,11 +84,13 @@ class WalletService:
         referrer_code: str,
         pass_type: PassType,
         purchase_amount: Decimal,
-        registration_id: Optional[UUID] = None
+        registration_id: Optional[UUID] = None,
+        commit: bool = True
     ) -> Optional[ReferralEarning]:
         """
         Process referral earnings when a referred user makes a purchase.
         Called by payment processing when payment is confirmed.
+        With commit=False everything is only flushed, leaving the transaction to the caller.
         """
         # Find the referrer by their referral code
         referrer = await self.user_repo.get_by_referral_code(referrer_code)
@@ -82,17 +98,13 @@ class WalletService:
             return None
 
         # Get or create referrer's wallet
-        wallet = await self.wallet_repo.get_or_create(referrer.id)
-
-        # Check for custom commission rate
-        from app.repository.affiliate_settings_repo import AffiliateSettingsRepository
-        from app.repository.global_settings_repo import GlobalSettingsRepository
+        wallet = await self.wallet_repo.get_or_create(referrer.id, commit=commit)
 
-        settings_repo = AffiliateSettingsRepository(self.session)
-        global_repo = GlobalSettingsRepository(self.session)
+        # Check for custom commission rate (both usually served from the in-process cache)
+        from app.service.affiliate_settings_cache import affiliate_settings_cache
 
-        user_settings = await settings_repo.get_by_user_id(referrer.id)
-        global_settings = await global_repo.get_settings()
+        user_settings = await affiliate_settings_cache.get_user(self.session, referrer.id)
+        global_settings = await affiliate_settings_cache.get_global(self.session, commit=commit)
 
         # Check if program is enabled globally
         if not global_settings.is_program_enabled:
@@ -110,22 +122,12 @@ class WalletService:
         # Calculate commission
         commission = purchase_amount * rate
 
-        # Determine status based on pass type
+        # Determine status based on pass type: standard pass is available immediately,
+        # guaranteed pass stays locked until the challenge is passed
         if pass_type == PassType.standard_pass:
             status = EarningStatus.available
-            # Add to available balance immediately
-            await self.wallet_repo.update_balances(
-                wallet.id,
-                available_delta=commission
-            )
         else:
-            # Guaranteed pass - lock until challenge passed
             status = EarningStatus.locked
-            # Add to locked balance
-            await self.wallet_repo.update_balances(
-                wallet.id,
-                locked_delta=commission
-            )
 
         # Create earning record
         earning = ReferralEarning(
@@ -139,8 +141,28 @@ class WalletService:
             challenge_passed=(pass_type == PassType.standard_pass)  # Standard pass doesn't need challenge
         )
         self.session.add(earning)
-        await self.session.commit()
-        await self.session.refresh(earning)
+
+        # Credit the wallet in the same transaction as the earning
+        if status == EarningStatus.available:
+            await self.wallet_repo.update_balances(
+                wallet.id,
+                available_delta=commission,
+                commit=False,
+                entry_type=LedgerEntryType.credit,
+                reference_id=earning.id
+            )
+        else:
+            await self.wallet_repo.update_balances(
+                wallet.id,
+                locked_delta=commission,
+                commit=False,
+                entry_type=LedgerEntryType.lock,
+                reference_id=earning.id
+            )
+
+        if commit:
+            await self.session.commit()
+            await self.session.refresh(earning)
 
         return earning
 
@@ -165,7 +187,9 @@ class WalletService:
             await self.wallet_repo.update_balances(
                 wallet.id,
                 available_delta=Decimal(str(earning.amount)),
-                locked_delta=-Decimal(str(earning.amount))
+                locked_delta=-Decimal(str(earning.amount)),
+                entry_type=LedgerEntryType.release,
+                reference_id=earning.id
             )
 
         return earning
@@ -191,7 +215,9 @@ class WalletService:
             await self.wallet_repo.update_balances(
                 wallet.id,
                 available_delta=Decimal(str(earning.amount)),
-                locked_delta=-Decimal(str(earning.amount))
+                locked_delta=-Decimal(str(earning.amount)),
+                entry_type=LedgerEntryType.release,
+                reference_id=earning.id
             )
 
         return earning
@@ -252,7 +278,9 @@ class WalletService:
         # Deduct from available balance (pending withdrawal)
         await self.wallet_repo.update_balances(
             wallet.id,
-            available_delta=-amount
+            available_delta=-amount,
+            entry_type=LedgerEntryType.withdrawal_hold,
+            reference_id=withdrawal.id
         )
 
         # Store ID before commit expires the object
@@ -303,7 +331,9 @@ class WalletService:
 
     async def get_withdrawals(self, user_id: UUID) -> List[WithdrawalRequest]:
         """Get all withdrawals for user"""
-        wallet = await self.get_wallet(user_id)
+        wallet = await self.wallet_repo.get_by_user_id(user_id)
+        if not wallet:
+            return []
         return await self.withdrawal_repo.get_by_wallet_id(wallet.id)
 
     async def update_withdrawal_status(
@@ -314,60 +344,72 @@ class WalletService:
         rejection_reason: Optional[str] = None,
         background_tasks: Optional[BackgroundTasks] = None
     ) -> Optional[WithdrawalRequest]:
-        """Update withdrawal status (admin action)"""
+        """
+        Update withdrawal status (admin action). Only pending -> completed and pending -> rejected
+        apply; anything else leaves the withdrawal as it is. The status change and its ledger
+        entry are committed together.
+        """
         withdrawal = await self.withdrawal_repo.get(withdrawal_id)
         if not withdrawal:
             return None
 
-        old_status = withdrawal.status
-        withdrawal = await self.withdrawal_repo.update_status(
+        updated = await self.withdrawal_repo.update_status(
             withdrawal_id=withdrawal_id,
             status=status,
             admin_notes=admin_notes,
-            rejection_reason=rejection_reason
+            rejection_reason=rejection_reason,
+            commit=False
         )
+        if not updated:
+            return withdrawal
+        withdrawal = updated
 
-        if withdrawal:
-            wallet = await self.wallet_repo.get(withdrawal.wallet_id)
+        wallet = await self.wallet_repo.get(withdrawal.wallet_id)
+        if status == WithdrawalStatus.completed:
+            # Add to total withdrawn
+            await self.wallet_repo.update_balances(
+                wallet.id,
+                withdrawn_delta=Decimal(str(withdrawal.amount)),
+                commit=False,
+                entry_type=LedgerEntryType.payout,
+                reference_id=withdrawal.id
+            )
+        else:
+            # Refund to available balance
+            await self.wallet_repo.update_balances(
+                wallet.id,
+                available_delta=Decimal(str(withdrawal.amount)),
+                commit=False,
+                entry_type=LedgerEntryType.refund,
+                reference_id=withdrawal.id
+            )
+        await self.session.commit()
 
-            if status == WithdrawalStatus.completed:
-                # Add to total withdrawn
-                await self.wallet_repo.update_balances(
-                    wallet.id,
-                    withdrawn_delta=Decimal(str(withdrawal.amount))
-                )
-            elif status == WithdrawalStatus.rejected and old_status == WithdrawalStatus.pending:
-                # Refund to available balance
-                await self.wallet_repo.update_balances(
-                    wallet.id,
-                    available_delta=Decimal(str(withdrawal.amount))
-                )
+        # Send notification if background_tasks provided
+        if background_tasks and wallet:
+            # Get user from wallet
+            user = await self.user_repo.get(wallet.user_id)
+            if user:
+                from app.service.mail import send_email
 
-            # Send notification if background_tasks provided
-            if background_tasks and wallet:
-                # Get user from wallet
-                user = await self.user_repo.get(wallet.user_id)
-                if user:
-                    from app.service.mail import send_email
-
-                    email_context = {
-                        "name": user.name,
-                        "amount": float(withdrawal.amount),
-                        "status": status.value,
-                        "payment_method": withdrawal.payment_method.value,
-                        "admin_notes": admin_notes or ""
-                    }
+                email_context = {
+                    "name": user.name,
+                    "amount": float(withdrawal.amount),
+                    "status": status.value,
+                    "payment_method": withdrawal.payment_method.value,
+                    "admin_notes": admin_notes or ""
+                }
 
-                    if rejection_reason:
-                        email_context["rejection_reason"] = rejection_reason
+                if rejection_reason:
+                    email_context["rejection_reason"] = rejection_reason
 
-                    background_tasks.add_task(
-                        send_email,
-                        email_to=user.email,
-                        subject=f"Withdrawal {status.value.capitalize()}",
-                        template_name="withdrawal_completed.html",
-                        context=email_context
-                    )
+                background_tasks.add_task(
+                    send_email,
+                    email_to=user.email,
+                    subject=f"Withdrawal {status.value.capitalize()}",
+                    template_name="withdrawal_completed.html",
+                    context=email_context
+                )
 
         return withdrawal
 
@@ -475,7 +517,8 @@ async def process_referral_purchase(
     referrer_code: str,
     pass_type: PassType,
     purchase_amount: Decimal,
-    registration_id: Optional[UUID] = None
+    registration_id: Optional[UUID] = None,
+    commit: bool = True
 ) -> Optional[ReferralEarning]:
     """Convenience function to process referral from payment flow"""
     service = WalletService(db)
@@ -484,5 +527,6 @@ async def process_referral_purchase(
         referrer_code=referrer_code,
         pass_type=pass_type,
         purchase_amount=purchase_amount,
-        registration_id=registration_id
+        registration_id=registration_id,
+        commit=commit
     )
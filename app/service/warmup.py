@@ -0,0 +1,70 @@
+"""
+Startup warm-up, run once per worker before it takes traffic (lifespan, and the Passenger
+bridge which has no lifespan): opens DB connections, loads the global affiliate settings
+into the cache and pays for the imports deferred out of app.main (jinja2 templates, httpx),
+so the first requests don't. Every step is best effort: a failure is logged, never raised.
+"""
+import asyncio
+import os
+import time
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.logging_config import logger
+
+
+async def _ping(engine) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def warm_db_pool(engine, connections: int) -> int:
+    """Open up to `connections` at once so they are checked back into the pool idle"""
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        connections = min(connections, size())
+    connections = max(connections, 1)
+    await asyncio.gather(*(_ping(engine) for _ in range(connections)))
+    return connections
+
+
+async def warm_affiliate_settings() -> None:
+    from app.db.session import AsyncSessionLocal
+    from app.service.affiliate_settings_cache import affiliate_settings_cache
+
+    async with AsyncSessionLocal() as session:
+        await affiliate_settings_cache.get_global(session)
+
+
+def warm_templates() -> int:
+    from app.service.mail import get_template_env, template_dir
+
+    env = get_template_env()
+    names = [name for name in os.listdir(template_dir) if name.endswith(".html")]
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def warm_imports() -> None:
+    import httpx  # noqa: F401
+    import mailjet_rest  # noqa: F401
+
+
+async def warm_up() -> None:
+    from app.db.session import engine
+
+    start = time.perf_counter()
+    steps = [
+        ("db pool", lambda: warm_db_pool(engine, settings.WARMUP_DB_CONNECTIONS)),
+        ("affiliate settings", warm_affiliate_settings),
+        ("templates", lambda: asyncio.to_thread(warm_templates)),
+        ("imports", lambda: asyncio.to_thread(warm_imports)),
+    ]
+    for name, step in steps:
+        try:
+            await step()
+        except Exception as e:
+            logger.warning(f"Warm-up step '{name}' failed: {e}")
+    logger.info(f"Warm-up finished in {(time.perf_counter() - start) * 1000:.0f}ms")
@@ -0,0 +1,46 @@
+"""
+gunicorn settings for the native ASGI deployment:
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Each worker is a uvicorn event loop (uvloop + httptools when installed), so a worker serves
+many requests concurrently; start with WEB_CONCURRENCY = 2 x CPUs + 1 and adjust from the
+/metrics in-flight and DB pool gauges. See app/server.py for the uvicorn-only launcher.
+"""
+import os
+import shutil
+
+from app.config import settings
+from app.server import worker_count
+
+bind = f"{settings.HOST}:{settings.PORT}"
+workers = worker_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+backlog = settings.SERVER_BACKLOG
+keepalive = settings.SERVER_KEEPALIVE
+forwarded_allow_ips = settings.FORWARDED_ALLOW_IPS
+
+# Long NOWPayments calls stay well below this; a worker silent for longer is restarted
+timeout = 60
+graceful_timeout = 30
+# Recycle workers now and then, staggered so they don't all restart together
+max_requests = 10000
+max_requests_jitter = 1000
+
+# The app logs each request itself (app.requests)
+accesslog = None
+errorlog = "-"
+
+
+def on_starting(server):
+    # Multiprocess metrics: start from an empty directory so stale worker files don't linger
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -21,8 +21,10 @@ packages = [
     "email-validator==2.3.0",
     "fastapi==0.124.4",
     "greenlet==3.3.0",
+    "gunicorn==23.0.0", # Production process manager (gunicorn.conf.py)
     "h11==0.16.0",
     "httpcore==1.0.9",
+    "httptools==0.6.4", # Faster HTTP parser for uvicorn
     "httpx==0.28.1", # Required for HTTP requests
     "idna==3.11",
     "Jinja2==3.1.6", # Required for templating
@@ -31,10 +33,12 @@ packages = [
     "mailjet-rest==1.5.1",
     "Mako==1.3.10",
     "MarkupSafe==3.0.3",
+    "orjson==3.11.4", # Default JSON response renderer (app/core/responses.py)
     "outcome==1.3.0.post0",
     "packaging==25.0",
     "passlib==1.7.4",
     "pyasn1==0.6.1",
+    "prometheus_client==0.21.1", # Metrics
     "pydantic==2.12.5",
     "pydantic-settings==2.12.0",
     "pydantic_core==2.41.5",
@@ -58,6 +62,7 @@ packages = [
     "typing_extensions==4.15.0",
     "urllib3==2.6.2",
     "uvicorn==0.38.0",
+    "uvloop==0.21.0; sys_platform != 'win32'", # Faster event loop for uvicorn
     "webdriver-manager==4.0.2",
     "websocket-client==1.9.0",
     "wrapt==2.0.1",
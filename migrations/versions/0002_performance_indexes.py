@@ -0,0 +1,74 @@
+"""performance indexes
+
+Foreign keys and list queries that had no index, plus the composite indexes added with
+the scripts/ migrations, so a database stamped at 0001 ends up with all of them.
+On Postgres every index is built with CREATE INDEX CONCURRENTLY outside a transaction,
+so writes to the tables are not blocked while it builds.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 23:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, table, columns), as declared on the models
+INDEXES = [
+    ("ix_withdrawal_request_wallet_id_created_at", "withdrawal_request", ["wallet_id", "created_at"]),
+    ("ix_withdrawal_request_status_created_at", "withdrawal_request", ["status", "created_at"]),
+    ("ix_notification_user_id_created_at", "notification", ["user_id", "created_at"]),
+    ("ix_prop_firm_registration_user_id_account_status", "prop_firm_registration", ["user_id", "account_status"]),
+    ("ix_prop_firm_registration_order_id", "prop_firm_registration", ["order_id"]),
+    ("ix_support_ticket_user_id_updated_at", "support_ticket", ["user_id", "updated_at"]),
+    ("ix_support_ticket_status_last_sender_type_last_message_at", "support_ticket",
+     ["status", "last_sender_type", "last_message_at"]),
+    ("ix_support_message_ticket_id_created_at", "support_message", ["ticket_id", "created_at"]),
+    ("ix_transactions_users_id", "transactions", ["users_id"]),
+    ("ix_cryptopayment_user_id_created_at", "cryptopayment", ["user_id", "created_at"]),
+    ("ix_cryptopayment_order_id", "cryptopayment", ["order_id"]),
+    ("ix_cryptopayment_payment_status_created_at", "cryptopayment", ["payment_status", "created_at"]),
+    ("ix_referral_earning_wallet_id_status", "referral_earning", ["wallet_id", "status"]),
+    ("ix_wallet_ledger_wallet_id_created_at", "wallet_ledger", ["wallet_id", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        for name, table, columns in INDEXES:
+            op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" ({", ".join(columns)})')
+        return
+
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            # An interrupted concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+            invalid = not op.get_context().as_sql and op.get_bind().execute(sa.text(
+                "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ), {"name": name}).first()
+            if invalid:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON "{table}" ({", ".join(columns)})')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+        return
+
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -1,3 +1,20 @@
+"""
+Passenger (WSGI) fallback, for shared hosts that can only run WSGI apps.
+
+This is not the preferred way to run the API. a2wsgi runs the ASGI app on a background event
+loop and parks one WSGI thread per in-flight request, so concurrency is capped by Passenger's
+thread/process count, and every request pays a thread <-> event loop hop. The lifespan
+(startup schema check, payment sweeper, ledger verifier) is not run either; run those as
+scripts/cron there; only the warm-up (app/service/warmup.py) runs, before the first request.
+Where a long-running process is allowed, use the native ASGI mode instead:
+
+    gunicorn -c gunicorn.conf.py app.main:app     (or: python -m app.server)
+
+When staying on Passenger, give the app several processes (PassengerMinInstances /
+PassengerMaxPoolSize) and set RATE_LIMIT_STORAGE_URI to shared storage so limits hold across them.
+scripts/benchmark_server_modes.py compares the two modes.
+"""
+import asyncio
 import sys
 import os
 import traceback
@@ -14,6 +31,12 @@ try:
     # Wrap the ASGI app with a2wsgi to make it WSGI compatible
     application = ASGIMiddleware(app)
 
+    # Pool connections belong to the loop that opened them, so warm up on the bridge's loop
+    from app.config import settings
+    if settings.WARMUP_ENABLED:
+        from app.service.warmup import warm_up
+        asyncio.run_coroutine_threadsafe(warm_up(), application.loop).result(timeout=60)
+
 except Exception as e:
     # Log the error to a file in the current directory
     with open("passenger_startup_error.log", "w") as f:
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Serialization cost per list endpoint, for the same ORM rows rendered three ways:
+
+    json         FastAPI's response_model validation and conversion, then the stdlib json
+                 JSONResponse (the app's previous default)
+    orjson       the same conversion, rendered by app.core.responses.ORJSONResponse (the default now)
+    typeadapter  app.core.responses.model_response: cached TypeAdapter, JSON written by pydantic-core
+                 (what the hot list endpoints return)
+
+Rows are built in memory, so only serialization is measured: no database, no HTTP.
+
+Usage:
+    python scripts/benchmark_serialization.py
+    python scripts/benchmark_serialization.py --rows 500 --repeat 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+sys.path.append(os.getcwd())
+os.environ.setdefault("DB_ECHO", "false")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app.core.responses import ORJSONResponse, model_response
+from app.main import app
+from app.models import Notification, Transaction, User
+from app.models.notification import NotificationType
+from app.models.transactions import TxnStatus, TxnType
+from app.models.wallet import PaymentMethod, WithdrawalRequest, WithdrawalStatus
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=100, help="Responses rendered per path")
+    return parser.parse_args()
+
+
+def build_content(rows: int):
+    """(method, path, content) as each endpoint's handler hands it over"""
+    now = datetime.now(timezone.utc)
+    user_id = uuid.uuid4()
+    notifications = [
+        Notification(user_id=user_id, title=f"Payment {n}", message="Your payment was received." * 3,
+                     type=NotificationType.PAYMENT_SUCCESS, created_at=now, updated_at=now)
+        for n in range(rows)
+    ]
+    withdrawals = [
+        WithdrawalRequest(wallet_id=uuid.uuid4(), amount=Decimal("150.25") + n, payment_method=PaymentMethod.crypto,
+                          status=WithdrawalStatus.pending, crypto_wallet_address="0x" + "ab" * 20,
+                          crypto_network="eth", crypto_currency="usdt", created_at=now)
+        for n in range(rows)
+    ]
+    users = [
+        User(email=f"user{n}@example.com", name=f"User {n}", password="x", Status=True, email_verified=True,
+             created_at=now, updated_at=now)
+        for n in range(rows)
+    ]
+    transactions = [
+        Transaction(users_id=user_id, type=TxnType.payment, amount_cents=10000 + n, status=TxnStatus.completed,
+                    reference=f"ref-{n}", created_at=now, updated_at=now)
+        for n in range(rows)
+    ]
+    return [
+        ("GET", "/api/v1/notifications/my-notifications", notifications),
+        ("GET", "/api/v1/wallet/withdrawals", {"withdrawals": withdrawals, "total_count": rows}),
+        ("GET", "/api/v1/admin/users", users),
+        ("GET", "/api/v1/admin/transactions", transactions),
+    ]
+
+
+def find_route(method: str, path: str):
+    for route in app.routes:
+        if getattr(route, "path", None) == path and method in getattr(route, "methods", ()):
+            return route
+    raise SystemExit(f"No route {method} {path}")
+
+
+async def render_default(route, content, response_class) -> bytes:
+    data = await serialize_response(field=route.response_field, response_content=content)
+    return response_class(data).body
+
+
+async def time_path(render, repeat: int):
+    body = await render()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await render()
+    return (time.perf_counter() - start) / repeat * 1e6, len(body)
+
+
+async def benchmark(args):
+    results = []
+    for method, path, content in build_content(args.rows):
+        route = find_route(method, path)
+
+        async def typeadapter():
+            return model_response(route.response_model, content).body
+
+        timings = {
+            "json": await time_path(lambda: render_default(route, content, JSONResponse), args.repeat),
+            "orjson": await time_path(lambda: render_default(route, content, ORJSONResponse), args.repeat),
+            "typeadapter": await time_path(typeadapter, args.repeat),
+        }
+        results.append((path, timings))
+    return results
+
+
+def main():
+    args = parse_args()
+    results = asyncio.run(benchmark(args))
+
+    print(f"{args.rows} rows per response, {args.repeat} responses per path (µs per response)\n")
+    print(f"{'path':<42} {'json':>9} {'orjson':>9} {'typeadapter':>12} {'bytes':>8} {'speedup':>8}")
+    for path, timings in results:
+        json_us, size = timings["json"]
+        orjson_us, _ = timings["orjson"]
+        adapter_us, _ = timings["typeadapter"]
+        print(f"{path:<42} {json_us:>9.0f} {orjson_us:>9.0f} {adapter_us:>12.0f} {size:>8} {json_us / adapter_us:>7.1f}x")
+    print("\n✓ speedup = json / typeadapter")
+
+
+if __name__ == "__main__":
+    main()
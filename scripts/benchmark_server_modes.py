@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Throughput of the two ways to serve the API, on the same endpoints and the same database:
+
+    asgi  uvicorn serving app.main:app directly, as app/server.py and gunicorn.conf.py do
+    wsgi  passenger_wsgi.application (the a2wsgi bridge) in a threaded WSGI server, standing in
+          for Passenger: gunicorn gthread when installed, else wsgiref (no keep-alive)
+
+Both run one process, so the numbers compare one event loop against a pool of WSGI threads.
+Rate limits are lifted and the per-request log line sampled out so neither mode measures those.
+
+Usage:
+    python scripts/benchmark_server_modes.py
+    python scripts/benchmark_server_modes.py --requests 5000 --concurrency 100 --wsgi-threads 16
+    python scripts/benchmark_server_modes.py --modes wsgi --paths /api/v1/discounts/vat
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+DEFAULT_PATHS = ["/api/v1/discounts/vat", "/metrics", "/openapi.json"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default="asgi,wsgi")
+    parser.add_argument("--paths", default=",".join(DEFAULT_PATHS))
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per mode and path")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--wsgi-threads", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--db", default="benchmark.db")
+    parser.add_argument("--serve-wsgi", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Inherited by the server processes; must be set before the app is imported"""
+    os.environ["DB_URI"] = f"sqlite+aiosqlite:///./{args.db}"
+    os.environ["DB_ECHO"] = "false"
+    os.environ["RATE_LIMIT_STORAGE_URI"] = "memory://"
+    os.environ["RATE_LIMIT_DEFAULT"] = "1000000/minute"
+    os.environ["LOG_SAMPLE_RATES"] = "app.requests=0"
+    os.environ["CRYPTO_PAYMENT_SWEEP_INTERVAL"] = "0"
+    os.environ["WALLET_LEDGER_VERIFY_INTERVAL"] = "0"
+
+
+async def seed():
+    from app.db.session import AsyncSessionLocal, engine, init_db
+    from app.models import Vat
+
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        session.add_all([Vat(vat_name=f"VAT {n}", percentage=5.0 + n) for n in range(10)])
+        await session.commit()
+    await engine.dispose()
+
+
+def serve_wsgi(port: int, threads: int):
+    """wsgiref fallback server: one thread per connection, like a small Passenger pool"""
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+    from passenger_wsgi import application
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    print(f"wsgiref serving on {port} (thread per connection; --wsgi-threads applies to gunicorn only)")
+    make_server("127.0.0.1", port, application, server_class=ThreadingWSGIServer, handler_class=QuietHandler).serve_forever()
+
+
+def start_server(mode: str, args) -> subprocess.Popen:
+    port = str(args.port)
+    if mode == "asgi":
+        from app.server import event_loop, http_protocol
+        command = [
+            sys.executable, "-m", "uvicorn", "app.main:app", "--port", port, "--log-level", "warning",
+            "--no-access-log", "--loop", event_loop(), "--http", http_protocol(),
+        ]
+    else:
+        try:
+            import gunicorn  # noqa: F401
+            command = [
+                sys.executable, "-m", "gunicorn", "passenger_wsgi:application", "--bind", f"127.0.0.1:{port}",
+                "--worker-class", "gthread", "--workers", "1", "--threads", str(args.wsgi_threads),
+                "--log-level", "warning",
+            ]
+        except ImportError:
+            command = [sys.executable, __file__, "--serve-wsgi", port]
+    return subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+
+async def wait_until_ready(client, path: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(path)).status_code < 500:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not come up")
+
+
+async def run_load(client, path: str, total: int, concurrency: int):
+    latencies, errors = [], 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def benchmark(mode: str, paths, args):
+    import httpx
+
+    server = start_server(mode, args)
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=30) as client:
+            await wait_until_ready(client, paths[0])
+            results = {}
+            for path in paths:
+                # Warm-up: connections, caches, first-call imports
+                await run_load(client, path, min(200, args.requests), args.concurrency)
+                results[path] = await run_load(client, path, args.requests, args.concurrency)
+            return results
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    if args.serve_wsgi:
+        serve_wsgi(args.serve_wsgi, args.wsgi_threads)
+        return
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    asyncio.run(seed())
+    print(f"✓ Seeded {args.db}")
+
+    paths = [p for p in args.paths.split(",") if p]
+    modes = [m for m in args.modes.split(",") if m]
+    results = {}
+    for mode in modes:
+        print(f"Benchmarking {mode} ({args.requests} requests per path, concurrency {args.concurrency})...")
+        results[mode] = asyncio.run(benchmark(mode, paths, args))
+
+    print(f"\n{'mode':<6} {'path':<26} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for path in paths:
+        for mode in modes:
+            r = results[mode][path]
+            print(f"{mode:<6} {path:<26} {r['rps']:>9.1f} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} {r['errors']:>7}")
+    if len(modes) == 2:
+        for path in paths:
+            ratio = results[modes[0]][path]["rps"] / results[modes[1]][path]["rps"]
+            print(f"✓ {path}: {modes[0]} / {modes[1]} throughput = {ratio:.2f}x")
+
+    os.remove(args.db)
+
+
+if __name__ == "__main__":
+    main()
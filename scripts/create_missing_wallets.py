@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Create the zero-balance wallet of every user who signed up before wallets were created with
+the account, so wallet reads never have to write. Safe to run repeatedly, against SQLite or Postgres.
+
+Usage:
+    python scripts/create_missing_wallets.py
+"""
+import asyncio
+import os
+import sys
+
+# Add app to path
+sys.path.append(os.getcwd())
+
+from sqlmodel import select
+
+from app.db.session import engine, AsyncSessionLocal
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.repository.wallet_repo import WalletRepository
+
+BATCH_SIZE = 500
+
+
+async def migrate():
+    engine.echo = False
+    created = 0
+    async with AsyncSessionLocal() as session:
+        wallet_repo = WalletRepository(session)
+        has_wallet = select(Wallet.id).where(Wallet.user_id == User.id)
+        while True:
+            user_ids = (await session.exec(
+                select(User.id).where(~has_wallet.exists()).limit(BATCH_SIZE)
+            )).all()
+            if not user_ids:
+                break
+            for user_id in user_ids:
+                await wallet_repo.ensure(user_id)
+            await session.commit()
+            created += len(user_ids)
+    await engine.dispose()
+    print(f"✓ Created {created} missing wallets")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
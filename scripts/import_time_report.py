@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cold start import cost of the API: runs `python -X importtime -c "import app.main"` in a fresh
+interpreter and reports the total, the slowest modules and the cost per top-level package.
+With --budget-ms it exits 1 when the total is over budget, so CI can catch regressions
+(e.g. a heavy library imported at module level again instead of where it is used).
+
+Usage:
+    python scripts/import_time_report.py
+    python scripts/import_time_report.py --top 30 --module app.main --budget-ms 2500
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+sys.path.append(os.getcwd())
+
+# Must stay out of `import app.main`: loaded where used, or by the warm-up
+DEFERRED_MODULES = ["httpx", "jinja2", "mailjet_rest"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, help="Fail when the total import time is over this")
+    return parser.parse_args()
+
+
+def measure(module: str):
+    """Returns [(name, depth, self_us, cumulative_us)] in import order, and the deferred modules loaded"""
+    check = f"import sys; import {module}; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    env = dict(os.environ, DB_ECHO="false")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check],
+        capture_output=True, text=True, env=env,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"Importing {module} failed")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return rows, loaded
+
+
+def main():
+    args = parse_args()
+    rows, loaded = measure(args.module)
+    # Top-level rows (depth 0 after the leading indent) add up to the whole import
+    total_ms = sum(cumulative for _, depth, _, cumulative in rows if depth == 0) / 1000
+
+    print(f"import {args.module}: {total_ms:.0f}ms, {len(rows)} modules\n")
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for name, _, self_us, cumulative_us in sorted(rows, key=lambda r: r[3], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name}")
+
+    packages = defaultdict(int)
+    for name, _, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    print(f"\n{'self ms':>8}  package")
+    for package, self_us in sorted(packages.items(), key=lambda p: p[1], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:>8.1f}  {package}")
+
+    failed = False
+    if loaded:
+        print(f"\n✗ Deferred modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    if args.budget_ms is not None:
+        if total_ms > args.budget_ms:
+            print(f"\n✗ {total_ms:.0f}ms is over the {args.budget_ms:.0f}ms budget")
+            failed = True
+        else:
+            print(f"\n✓ {total_ms:.0f}ms is within the {args.budget_ms:.0f}ms budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
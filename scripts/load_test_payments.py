@@ -0,0 +1,192 @@
+"""
+End-to-end load scenario for the crypto checkout flow against the fake NOWPayments server.
+
+For every payment it:
+    1. creates a prop firm registration (POST /api/v1/prop-firm)
+    2. creates a crypto payment for its order id (POST /api/v1/crypto-payments/payment)
+    3. lets the fake provider fire signed IPN callbacks back at /crypto-payments/ipn-callback
+and at the end checks the database for finished payments and completed registrations.
+
+The backend runs in-process (httpx ASGI transport) on a throwaway SQLite database; the fake
+NOWPayments API runs on a local port so the real HTTP client code path is exercised.
+
+Usage:
+    python scripts/load_test_payments.py --payments 2000 --concurrency 50
+    python scripts/load_test_payments.py --latency-ms 20-150 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+
+# Add app and the tests directory (for the fake provider) to path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "tests"))
+
+BACKEND_URL = "http://backend"
+FAKE_SECRET = "load-test-ipn-secret"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payments", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default="loadtest.db")
+    parser.add_argument("--latency-ms", default="0", help='Fake provider latency, "50" or "20-200"')
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--ipn-statuses", default="confirming,finished")
+    parser.add_argument("--ipn-delay-ms", default="200", help="Delay before each IPN, so it lands after the payment row is stored")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Must run before the app is imported: Settings and the engine read the environment at import"""
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    os.environ["DB_URI"] = f"sqlite+aiosqlite:///./{args.db}"
+    os.environ["NOWPAYMENTS_API_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ["NOWPAYMENTS_API_KEY"] = "fake-api-key"
+    os.environ["NOWPAYMENTS_IPN_SECRET"] = FAKE_SECRET
+    os.environ["NOWPAYMENTS_IPN_CALLBACK_URL"] = f"{BACKEND_URL}/api/v1/crypto-payments/ipn-callback"
+    os.environ["FAKE_NOWPAYMENTS_IPN_SECRET"] = FAKE_SECRET
+    os.environ["FAKE_NOWPAYMENTS_LATENCY_MS"] = args.latency_ms
+    os.environ["FAKE_NOWPAYMENTS_ERROR_RATE"] = str(args.error_rate)
+    os.environ["FAKE_NOWPAYMENTS_IPN_STATUSES"] = args.ipn_statuses
+    os.environ["FAKE_NOWPAYMENTS_IPN_DELAY_MS"] = args.ipn_delay_ms
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def registration_payload(i: int) -> dict:
+    return {
+        "login_id": f"login-{i}",
+        "password": "secret",
+        "propfirm_name": "FTMO",
+        "propfirm_website_link": "https://ftmo.com",
+        "server_name": "FTMO-Demo",
+        "server_type": "demo",
+        "challenges_step": 2,
+        "propfirm_account_cost": 155.0,
+        "account_size": 10000.0,
+        "account_phases": 2,
+        "trading_platform": "MT5",
+        "propfirm_rules": "standard",
+        "whatsapp_no": "+10000000000",
+        "telegram_username": "@loadtest",
+    }
+
+
+async def main():
+    args = parse_args()
+    configure_environment(args)
+
+    import httpx
+    import uvicorn
+    from sqlmodel import select, func
+
+    from app.main import app as backend
+    from app.db.session import engine, init_db, AsyncSessionLocal
+    from app.models.crypto_payment import CryptoPayment
+    from app.models.propfirm_registration import PropFirmRegistration
+    import fake_nowpayments
+
+    # Keep the load test about throughput, not about logging every SQL statement or tripping rate limits
+    engine.echo = False
+    backend.state.limiter.enabled = False
+
+    await init_db()
+
+    server = uvicorn.Server(uvicorn.Config(fake_nowpayments.app, host="127.0.0.1", port=args.port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    transport = httpx.ASGITransport(app=backend, raise_app_exceptions=False)
+    fake_nowpayments.state.ipn_transport = transport
+
+    latencies = defaultdict(list)
+    failures = Counter()
+
+    async with httpx.AsyncClient(transport=transport, base_url=BACKEND_URL, timeout=60.0) as client:
+        # Users are created once; bcrypt makes signup/login far too slow to do per payment
+        tokens = []
+        for i in range(args.users):
+            email = f"load{i}@example.com"
+            await client.post("/api/v1/users", json={"email": email, "name": f"Load {i}", "password": "password"})
+            response = await client.post("/api/v1/auth/login/access-token", data={"username": email, "password": "password"})
+            response.raise_for_status()
+            tokens.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def timed(step, method, url, **kwargs):
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies[step].append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                failures[f"{step} {response.status_code}"] += 1
+                return None
+            return response.json()
+
+        async def checkout(i: int):
+            async with semaphore:
+                headers = tokens[i % len(tokens)]
+                registration = await timed("registration", "POST", "/api/v1/prop-firm", json=registration_payload(i), headers=headers)
+                if not registration:
+                    return
+                await timed("payment", "POST", "/api/v1/crypto-payments/payment", json={
+                    "price_amount": registration["propfirm_account_cost"],
+                    "price_currency": "usd",
+                    "pay_currency": "btc",
+                    "order_id": registration["order_id"],
+                    "order_description": f"{registration['propfirm_name']} registration",
+                }, headers=headers)
+
+        print(f"Running {args.payments} checkouts with concurrency {args.concurrency}...")
+        start = time.perf_counter()
+        await asyncio.gather(*(checkout(i) for i in range(args.payments)))
+        checkout_elapsed = time.perf_counter() - start
+        await fake_nowpayments.state.wait_for_ipns()
+        total_elapsed = time.perf_counter() - start
+
+    async with AsyncSessionLocal() as session:
+        payment_statuses = dict((await session.exec(
+            select(CryptoPayment.payment_status, func.count()).group_by(CryptoPayment.payment_status)
+        )).all())
+        registration_statuses = dict((await session.exec(
+            select(PropFirmRegistration.payment_status, func.count()).group_by(PropFirmRegistration.payment_status)
+        )).all())
+    # aiosqlite's connection threads would otherwise keep the process alive after the results print
+    await engine.dispose()
+
+    server.should_exit = True
+    await server_task
+
+    print("\n=== Results ===")
+    print(f"Checkouts: {args.payments} in {checkout_elapsed:.2f}s ({args.payments / checkout_elapsed:.1f}/s)")
+    print(f"Including IPN delivery: {total_elapsed:.2f}s")
+    for step, values in latencies.items():
+        print(
+            f"{step:>12}: n={len(values)} mean={statistics.mean(values):.1f}ms "
+            f"p50={percentile(values, 50):.1f}ms p95={percentile(values, 95):.1f}ms p99={percentile(values, 99):.1f}ms"
+        )
+    print(f"IPNs: sent={fake_nowpayments.state.ipn_sent} failed={fake_nowpayments.state.ipn_failed}")
+    print(f"Crypto payments by status: {payment_statuses}")
+    print(f"Registrations by payment status: {registration_statuses}")
+    if failures:
+        print(f"Failures: {dict(failures)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Add indexes declared on PropFirmRegistration to an existing database
+(create_all only creates missing tables). Safe to run repeatedly, against SQLite or Postgres.
+
+Usage:
+    python scripts/migrate_prop_firm_registrations.py
+"""
+import asyncio
+import os
+import sys
+
+# Add app to path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import text
+
+from app.db.session import engine
+
+STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS ix_prop_firm_registration_user_id_account_status "
+    "ON prop_firm_registration (user_id, account_status)",
+]
+
+
+async def migrate():
+    engine.echo = False
+    async with engine.begin() as conn:
+        for statement in STATEMENTS:
+            print(f"Running: {statement}")
+            await conn.execute(text(statement))
+    await engine.dispose()
+    print("✓ Prop firm registration indexes are up to date")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Bring an existing database's support ticket tables up to the current models.
+create_all only creates missing tables, so columns and indexes added to existing tables
+need this. New ticket activity columns are backfilled from the messages. Also creates the
+full-text search index and, when it is empty, fills it from the existing tickets and
+messages. Safe to run repeatedly, against SQLite or Postgres.
+
+--rebuild-search empties the search index and fills it again, e.g. after tickets were
+deleted outside the app (the SQLite index has no foreign key to drop their rows).
+
+Usage:
+    python scripts/migrate_support_tickets.py
+    python scripts/migrate_support_tickets.py --rebuild-search
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# Add app to path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import inspect, text
+from sqlmodel import select
+
+from app.db.session import engine, AsyncSessionLocal
+from app.models.support import SupportTicket, SupportMessage
+from app.models.user import User
+from app.repository.support_search_repo import SupportSearchRepository, create_support_search_schema
+
+# Denormalized ticket activity, maintained by SupportTicketRepository from now on
+TICKET_ACTIVITY_COLUMNS = ["message_count", "last_message_at", "last_sender_type"]
+BACKFILL_TICKET_ACTIVITY = (
+    "UPDATE support_ticket SET "
+    "message_count = (SELECT COUNT(*) FROM support_message m WHERE m.ticket_id = support_ticket.id), "
+    "last_message_at = (SELECT MAX(m.created_at) FROM support_message m WHERE m.ticket_id = support_ticket.id), "
+    "last_sender_type = (SELECT m.sender_type FROM support_message m WHERE m.ticket_id = support_ticket.id "
+    "ORDER BY m.created_at DESC LIMIT 1)"
+)
+
+STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS ix_support_message_ticket_id_created_at "
+    "ON support_message (ticket_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_support_ticket_status_last_sender_type_last_message_at "
+    "ON support_ticket (status, last_sender_type, last_message_at)",
+]
+
+
+async def add_ticket_activity_columns(conn) -> bool:
+    """Add any missing activity columns (typed as in the model); True if any were added"""
+    existing = await conn.run_sync(
+        lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns("support_ticket")}
+    )
+    missing = [name for name in TICKET_ACTIVITY_COLUMNS if name not in existing]
+    for name in missing:
+        column_type = SupportTicket.__table__.c[name].type.compile(dialect=conn.dialect)
+        default = " NOT NULL DEFAULT 0" if name == "message_count" else ""
+        statement = f"ALTER TABLE support_ticket ADD COLUMN {name} {column_type}{default}"
+        print(f"Running: {statement}")
+        await conn.execute(text(statement))
+    return bool(missing)
+
+
+async def backfill_search_index(rebuild: bool = False):
+    async with AsyncSessionLocal() as session:
+        search = SupportSearchRepository(session)
+        if rebuild:
+            print(f"Emptying {search.table}")
+            await session.execute(text(f"DELETE FROM {search.table}"))
+        elif (await session.execute(text(f"SELECT COUNT(*) FROM {search.table}"))).scalar():
+            print("Search index already populated")
+            return
+
+        tickets = (await session.exec(
+            select(SupportTicket.id, SupportTicket.subject, User.email)
+            .join(User, User.id == SupportTicket.user_id)
+        )).all()
+        for ticket_id, subject, email in tickets:
+            messages = (await session.exec(
+                select(SupportMessage.message).where(SupportMessage.ticket_id == ticket_id)
+            )).all()
+            await search.index_documents(
+                ticket_id,
+                [("ticket", f"{subject} {email}")] + [("message", message) for message in messages]
+            )
+        await session.commit()
+        print(f"Indexed {len(tickets)} tickets for search")
+
+
+async def migrate(rebuild_search: bool = False):
+    engine.echo = False
+    async with engine.begin() as conn:
+        if await add_ticket_activity_columns(conn):
+            print("Backfilling ticket activity from messages")
+            await conn.execute(text(BACKFILL_TICKET_ACTIVITY))
+        for statement in STATEMENTS:
+            print(f"Running: {statement}")
+            await conn.execute(text(statement))
+        await create_support_search_schema(conn)
+    await backfill_search_index(rebuild_search)
+    await engine.dispose()
+    print("✓ Support ticket tables are up to date")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild-search", action="store_true", help="Empty and refill the search index")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.rebuild_search))
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Rewrite UUID keys stored in a mixed format so every table uses the one UUIDType stores.
+On SQLite, rows written by raw SQL or older code kept dashed or upper case strings, which
+a primary key lookup (32 char lowercase hex) silently misses. Postgres columns are native
+UUID and need nothing. All columns are rewritten in one transaction, so foreign keys stay
+consistent. Safe to run repeatedly.
+
+Usage:
+    python scripts/migrate_uuid_storage.py
+"""
+import asyncio
+import os
+import sys
+
+# Add app to path
+sys.path.append(os.getcwd())
+
+import app.models  # noqa: F401  (registers every table)
+from app.db.session import engine
+from app.db.types import normalize_uuid_storage
+
+
+async def migrate():
+    engine.echo = False
+    async with engine.begin() as conn:
+        changed = await normalize_uuid_storage(conn)
+    await engine.dispose()
+    for column, count in changed.items():
+        print(f"Rewrote {count} values in {column}")
+    print("✓ UUID storage is consistent")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
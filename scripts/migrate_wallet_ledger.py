@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Create the wallet ledger on an existing database and give every wallet that has no entries
+yet an opening_balance entry carrying its current balances, so the ledger and the wallet
+columns agree from the start. Safe to run repeatedly, against SQLite or Postgres.
+
+Usage:
+    python scripts/migrate_wallet_ledger.py
+"""
+import asyncio
+import os
+import sys
+
+# Add app to path
+sys.path.append(os.getcwd())
+
+from app.db.session import engine, AsyncSessionLocal
+from app.models.wallet import WalletLedgerEntry
+from app.service.wallet_ledger_verifier import backfill_opening_balances
+
+
+async def migrate():
+    engine.echo = False
+    async with engine.begin() as conn:
+        # Also creates ix_wallet_ledger_wallet_id_created_at with the table
+        await conn.run_sync(WalletLedgerEntry.__table__.create, checkfirst=True)
+
+    async with AsyncSessionLocal() as session:
+        backfilled = await backfill_opening_balances(session)
+    await engine.dispose()
+    print(f"✓ Wallet ledger is up to date ({backfilled} opening balances recorded)")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Run the stale crypto payment sweeper once, e.g. from cron when the app runs under a
+server that does not keep the lifespan sweeper loop alive (Passenger).
+
+Usage:
+    python scripts/sweep_crypto_payments.py
+    python scripts/sweep_crypto_payments.py --stale-after-minutes 60 --no-confirm
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import timedelta
+
+# Add app to path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.db.session import engine, AsyncSessionLocal
+from app.service.crypto_payment_sweeper import CryptoPaymentSweeper
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stale-after-minutes", type=int, default=settings.CRYPTO_PAYMENT_STALE_AFTER_MINUTES)
+    parser.add_argument("--batch-size", type=int, default=settings.CRYPTO_PAYMENT_SWEEP_BATCH_SIZE)
+    parser.add_argument("--no-confirm", action="store_true", help="Expire without asking NOWPayments first")
+    args = parser.parse_args()
+
+    engine.echo = False
+
+    # Tables created before the index existed do not get it from create_all
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_cryptopayment_payment_status_created_at "
+            "ON cryptopayment (payment_status, created_at)"
+        ))
+
+    async with AsyncSessionLocal() as session:
+        sweeper = CryptoPaymentSweeper(
+            session,
+            stale_after=timedelta(minutes=args.stale_after_minutes),
+            batch_size=args.batch_size,
+            confirm=settings.CRYPTO_PAYMENT_SWEEP_CONFIRM and not args.no_confirm,
+        )
+        result = await sweeper.sweep()
+
+    print(
+        f"Scanned {result.scanned}, expired {result.expired}, failed {result.registrations_failed} registrations, "
+        f"reconciled {result.reconciled}, skipped {result.skipped}"
+    )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -13,6 +13,7 @@ from app.config import settings
 from app.service.wallet_service import WalletService
 from app.repository.user_repo import UserRepository
 from app.models.user import User
+from app.models.wallet import LedgerEntryType
 from app.schema.wallet import WithdrawalCreate, PaymentMethod, CryptoDetails
 
 async def main():
@@ -80,7 +81,8 @@ async def main():
         print(f"Adding ${amount_to_add} to available balance...")
         await wallet_service.wallet_repo.update_balances(
             wallet.id,
-            available_delta=amount_to_add
+            available_delta=amount_to_add,
+            entry_type=LedgerEntryType.adjustment
         )
 
         # Refresh wallet
@@ -12,7 +12,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from app.service.wallet_service import WalletService
 from app.schema.wallet import WithdrawalCreate, PaymentMethod, CryptoDetails
 from app.models.user import User
-from app.models.wallet import Wallet
+from app.models.wallet import Wallet, LedgerEntryType
 from fastapi import BackgroundTasks
 
 async def main():
@@ -34,7 +34,9 @@ async def main():
         wallet = await service.get_wallet(user.id)
 
         # Add fake balance
-        await service.wallet_repo.update_balances(wallet.id, available_delta=Decimal("200.00"))
+        await service.wallet_repo.update_balances(
+            wallet.id, available_delta=Decimal("200.00"), entry_type=LedgerEntryType.adjustment
+        )
         print("Added balance to wallet.")
 
         # 3. Create withdrawal request that triggers validation
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Check every wallet's balance columns against the sum of its ledger entries and list the
+wallets that drifted. Exits with status 1 when drift is found, so it can run from cron.
+--repair resets drifted wallets to the ledger totals.
+
+Usage:
+    python scripts/verify_wallet_ledger.py
+    python scripts/verify_wallet_ledger.py --batch-size 1000 --repair
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# Add app to path
+sys.path.append(os.getcwd())
+
+from app.config import settings
+from app.db.session import engine, AsyncSessionLocal
+from app.service.wallet_ledger_verifier import WalletLedgerVerifier
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=settings.WALLET_LEDGER_VERIFY_BATCH_SIZE)
+    parser.add_argument("--repair", action="store_true", help="Reset drifted wallets to the ledger totals")
+    args = parser.parse_args()
+
+    engine.echo = False
+    async with AsyncSessionLocal() as session:
+        result = await WalletLedgerVerifier(session, batch_size=args.batch_size, repair=args.repair).verify()
+    await engine.dispose()
+
+    for drift in result.drifts:
+        print(
+            f"{drift.wallet_id}: available {drift.available_balance} vs {drift.ledger_available}, "
+            f"locked {drift.locked_balance} vs {drift.ledger_locked}, "
+            f"withdrawn {drift.total_withdrawn} vs {drift.ledger_withdrawn}"
+        )
+    print(f"Checked {result.checked} wallets, {len(result.drifts)} drifted, {result.repaired} repaired")
+    return 1 if result.drifts and not args.repair else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,367 @@
+"""
+Local stand-in for the NOWPayments API, for integration and load tests.
+
+Run it standalone:
+    uvicorn fake_nowpayments:app --app-dir tests --port 8765
+and point the backend at it with NOWPAYMENTS_API_URL=http://127.0.0.1:8765/v1.
+
+Behaviour is configured with environment variables or at runtime through
+POST /_control/config:
+    FAKE_NOWPAYMENTS_LATENCY_MS    "50" or "20-200" (uniform range) added to every call
+    FAKE_NOWPAYMENTS_ERROR_RATE    fraction of calls answered with FAKE_NOWPAYMENTS_ERROR_STATUS
+    FAKE_NOWPAYMENTS_ERROR_STATUS  status code for injected errors (default 503)
+    FAKE_NOWPAYMENTS_TIMEOUT_RATE  fraction of calls that hang for FAKE_NOWPAYMENTS_HANG_SECONDS
+    FAKE_NOWPAYMENTS_IPN_SECRET    secret used to sign IPN callbacks
+    FAKE_NOWPAYMENTS_IPN_STATUSES  comma separated statuses sent for each new payment (default "finished")
+    FAKE_NOWPAYMENTS_IPN_DELAY_MS  delay before each IPN is fired
+    FAKE_NOWPAYMENTS_IPN_RETRIES   redeliveries of an IPN the backend rejected (default 3)
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.service.nowpayments_service import NOWPaymentsService
+
+
+def _parse_latency(raw: str) -> tuple[float, float]:
+    if "-" in raw:
+        low, high = raw.split("-", 1)
+        return float(low), float(high)
+    return float(raw), float(raw)
+
+
+class FakeConfig:
+    def __init__(self):
+        self.latency_ms = _parse_latency(os.getenv("FAKE_NOWPAYMENTS_LATENCY_MS", "0"))
+        self.error_rate = float(os.getenv("FAKE_NOWPAYMENTS_ERROR_RATE", "0"))
+        self.error_status = int(os.getenv("FAKE_NOWPAYMENTS_ERROR_STATUS", "503"))
+        self.timeout_rate = float(os.getenv("FAKE_NOWPAYMENTS_TIMEOUT_RATE", "0"))
+        self.hang_seconds = float(os.getenv("FAKE_NOWPAYMENTS_HANG_SECONDS", "60"))
+        self.ipn_secret = os.getenv("FAKE_NOWPAYMENTS_IPN_SECRET") or os.getenv("NOWPAYMENTS_IPN_SECRET") or "fake-secret"
+        self.ipn_statuses = [s for s in os.getenv("FAKE_NOWPAYMENTS_IPN_STATUSES", "finished").split(",") if s]
+        self.ipn_delay_ms = float(os.getenv("FAKE_NOWPAYMENTS_IPN_DELAY_MS", "0"))
+        self.ipn_retries = int(os.getenv("FAKE_NOWPAYMENTS_IPN_RETRIES", "3"))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "latency_ms": list(self.latency_ms),
+            "error_rate": self.error_rate,
+            "error_status": self.error_status,
+            "timeout_rate": self.timeout_rate,
+            "hang_seconds": self.hang_seconds,
+            "ipn_statuses": self.ipn_statuses,
+            "ipn_delay_ms": self.ipn_delay_ms,
+            "ipn_retries": self.ipn_retries,
+        }
+
+
+class FakeState:
+    def __init__(self):
+        self.config = FakeConfig()
+        self.payments: Dict[str, Dict[str, Any]] = {}
+        self.invoices: Dict[str, Dict[str, Any]] = {}
+        self.payouts: Dict[str, Dict[str, Any]] = {}
+        self.ipn_sent = 0
+        self.ipn_failed = 0
+        # Set to an httpx transport (e.g. ASGITransport(app=backend)) to deliver IPNs in-process
+        self.ipn_transport: Optional[httpx.AsyncBaseTransport] = None
+        self._ipn_tasks: set[asyncio.Task] = set()
+        self._next_id = 5_000_000_000
+
+    def next_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    async def wait_for_ipns(self) -> None:
+        """Wait until every scheduled IPN callback has been delivered"""
+        while self._ipn_tasks:
+            await asyncio.gather(*list(self._ipn_tasks), return_exceptions=True)
+
+
+state = FakeState()
+app = FastAPI(title="Fake NOWPayments")
+
+
+@app.middleware("http")
+async def inject_faults(request: Request, call_next):
+    if request.url.path.startswith("/_control"):
+        return await call_next(request)
+    config = state.config
+    low, high = config.latency_ms
+    if high > 0:
+        await asyncio.sleep(random.uniform(low, high) / 1000)
+    if config.timeout_rate and random.random() < config.timeout_rate:
+        await asyncio.sleep(config.hang_seconds)
+    if config.error_rate and random.random() < config.error_rate:
+        return JSONResponse(status_code=config.error_status, content={"message": "Injected error"})
+    if not request.headers.get("x-api-key"):
+        return JSONResponse(status_code=403, content={"message": "Invalid api key"})
+    return await call_next(request)
+
+
+# ============= IPN =============
+
+async def send_ipn(payment: Dict[str, Any], status: str) -> bool:
+    """POST a signed IPN for the payment to its callback URL"""
+    url = payment.get("ipn_callback_url")
+    if not url:
+        return False
+    payment["payment_status"] = status
+    if status == "finished":
+        payment["actually_paid"] = payment["pay_amount"]
+    elif status == "partially_paid":
+        payment["actually_paid"] = round(payment["pay_amount"] / 2, 8)
+    body = {
+        "payment_id": payment["payment_id"],
+        "invoice_id": payment.get("invoice_id"),
+        "payment_status": status,
+        "pay_address": payment["pay_address"],
+        "price_amount": payment["price_amount"],
+        "price_currency": payment["price_currency"],
+        "pay_amount": payment["pay_amount"],
+        "actually_paid": payment["actually_paid"],
+        "pay_currency": payment["pay_currency"],
+        "order_id": payment.get("order_id"),
+        "order_description": payment.get("order_description"),
+        "purchase_id": payment["purchase_id"],
+        "outcome_amount": payment["pay_amount"],
+        "outcome_currency": payment["pay_currency"],
+    }
+    body = {k: v for k, v in body.items() if v is not None}
+    signature = NOWPaymentsService.sign_ipn_payload(body, state.config.ipn_secret)
+    try:
+        async with httpx.AsyncClient(transport=state.ipn_transport, timeout=30.0) as client:
+            response = await client.post(url, json=body, headers={"x-nowpayments-sig": signature})
+        ok = response.status_code < 400
+    except httpx.HTTPError:
+        ok = False
+    if ok:
+        state.ipn_sent += 1
+    else:
+        state.ipn_failed += 1
+    return ok
+
+
+async def _ipn_sequence(payment: Dict[str, Any]) -> None:
+    delay = state.config.ipn_delay_ms / 1000
+    for status in state.config.ipn_statuses:
+        if delay:
+            await asyncio.sleep(delay)
+        # Like the real provider, redeliver rejected IPNs with a growing delay
+        for attempt in range(1 + state.config.ipn_retries):
+            if await send_ipn(payment, status):
+                break
+            await asyncio.sleep(0.5 * (attempt + 1))
+
+
+def schedule_ipns(payment: Dict[str, Any]) -> None:
+    if not payment.get("ipn_callback_url") or not state.config.ipn_statuses:
+        return
+    task = asyncio.create_task(_ipn_sequence(payment))
+    state._ipn_tasks.add(task)
+    task.add_done_callback(state._ipn_tasks.discard)
+
+
+# ============= Public API =============
+
+@app.get("/v1/status")
+async def status():
+    return {"message": "OK"}
+
+
+@app.get("/v1/currencies")
+async def currencies():
+    return {"currencies": ["btc", "eth", "ltc", "trx", "usdttrc20", "usdterc20"]}
+
+
+@app.get("/v1/min-amount")
+async def min_amount(currency_from: str, currency_to: str | None = None):
+    return {"currency_from": currency_from, "currency_to": currency_to or currency_from, "min_amount": 0.0001}
+
+
+@app.get("/v1/estimate")
+async def estimate(amount: float, currency_from: str, currency_to: str):
+    return {
+        "currency_from": currency_from,
+        "amount_from": amount,
+        "currency_to": currency_to,
+        "estimated_amount": round(amount / 50000, 8),
+    }
+
+
+def _new_payment(data: Dict[str, Any], invoice_id: Optional[str] = None) -> Dict[str, Any]:
+    payment_id = state.next_id()
+    price_amount = float(data["price_amount"])
+    payment = {
+        "payment_id": payment_id,
+        "invoice_id": invoice_id,
+        "payment_status": "waiting",
+        "pay_address": f"fake{uuid.uuid4().hex[:30]}",
+        "price_amount": price_amount,
+        "price_currency": data.get("price_currency", "usd"),
+        "pay_amount": data.get("pay_amount") or round(price_amount / 50000, 8),
+        "actually_paid": 0,
+        "pay_currency": data.get("pay_currency") or "btc",
+        "order_id": data.get("order_id"),
+        "order_description": data.get("order_description"),
+        "ipn_callback_url": data.get("ipn_callback_url"),
+        "purchase_id": str(state.next_id()),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+    }
+    state.payments[str(payment_id)] = payment
+    return payment
+
+
+@app.post("/v1/payment", status_code=201)
+async def create_payment(request: Request):
+    data = await request.json()
+    if not data.get("price_amount") or not data.get("pay_currency"):
+        raise HTTPException(status_code=400, detail="price_amount and pay_currency are required")
+    payment = _new_payment(data)
+    schedule_ipns(payment)
+    return {k: v for k, v in payment.items() if k != "invoice_id"}
+
+
+@app.get("/v1/payment/{payment_id}")
+async def get_payment(payment_id: str):
+    payment = state.payments.get(payment_id)
+    if not payment:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    return payment
+
+
+@app.post("/v1/invoice")
+async def create_invoice(request: Request):
+    data = await request.json()
+    if not data.get("price_amount"):
+        raise HTTPException(status_code=400, detail="price_amount is required")
+    invoice_id = str(state.next_id())
+    invoice = {
+        "id": invoice_id,
+        "order_id": data.get("order_id"),
+        "order_description": data.get("order_description"),
+        "price_amount": str(data["price_amount"]),
+        "price_currency": data.get("price_currency", "usd"),
+        "pay_currency": data.get("pay_currency"),
+        "ipn_callback_url": data.get("ipn_callback_url"),
+        "invoice_url": f"https://nowpayments.io/payment/?iid={invoice_id}",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+    }
+    state.invoices[invoice_id] = invoice
+    return invoice
+
+
+@app.post("/v1/payout/validate-address")
+async def validate_address(request: Request):
+    data = await request.json()
+    address = data.get("address") or ""
+    if len(address) < 20 or address.startswith("invalid"):
+        raise HTTPException(status_code=400, detail="Invalid payout_address")
+    return "OK"
+
+
+@app.post("/v1/payout")
+async def create_payout(request: Request):
+    data = await request.json()
+    withdrawals: List[Dict[str, Any]] = data.get("withdrawals") or []
+    if not withdrawals:
+        raise HTTPException(status_code=400, detail="withdrawals are required")
+    batch_id = str(state.next_id())
+    items = []
+    for w in withdrawals:
+        item = {
+            "id": str(state.next_id()),
+            "address": w.get("address"),
+            "currency": w.get("currency"),
+            "amount": str(w.get("amount")),
+            "batch_withdrawal_id": batch_id,
+            "ipn_callback_url": w.get("ipn_callback_url"),
+            "status": "WAITING",
+            "extra_id": w.get("extra_id"),
+        }
+        state.payouts[item["id"]] = item
+        items.append(item)
+    return {"id": batch_id, "withdrawals": items}
+
+
+@app.post("/v1/payout/{batch_id}/verify")
+async def verify_payout(batch_id: str, request: Request):
+    data = await request.json()
+    if data.get("verification_code") != "123456":
+        raise HTTPException(status_code=400, detail="Invalid verification code")
+    for payout in state.payouts.values():
+        if payout["batch_withdrawal_id"] == batch_id:
+            payout["status"] = "SENDING"
+    return "OK"
+
+
+@app.get("/v1/payout/{payout_id}")
+async def get_payout(payout_id: str):
+    payout = state.payouts.get(payout_id)
+    if not payout:
+        raise HTTPException(status_code=404, detail="Payout not found")
+    return [payout]
+
+
+@app.get("/v1/payout")
+async def list_payouts(limit: int = 10, page: int = 0):
+    payouts = list(state.payouts.values())
+    return {"payouts": payouts[page * limit:(page + 1) * limit], "total": len(payouts)}
+
+
+# ============= Control API =============
+
+@app.get("/_control/config")
+async def get_config():
+    return state.config.as_dict()
+
+
+@app.post("/_control/config")
+async def update_config(request: Request):
+    data = await request.json()
+    config = state.config
+    if "latency_ms" in data:
+        value = data["latency_ms"]
+        config.latency_ms = _parse_latency(str(value)) if not isinstance(value, list) else (float(value[0]), float(value[1]))
+    for key in ("error_rate", "timeout_rate", "hang_seconds", "ipn_delay_ms"):
+        if key in data:
+            setattr(config, key, float(data[key]))
+    for key in ("error_status", "ipn_retries"):
+        if key in data:
+            setattr(config, key, int(data[key]))
+    if "ipn_statuses" in data:
+        config.ipn_statuses = list(data["ipn_statuses"])
+    if "ipn_secret" in data:
+        config.ipn_secret = data["ipn_secret"]
+    return config.as_dict()
+
+
+@app.post("/_control/payments/{payment_id}/ipn")
+async def fire_ipn(payment_id: str, status: str = "finished"):
+    payment = state.payments.get(payment_id)
+    if not payment:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    return {"delivered": await send_ipn(payment, status)}
+
+
+@app.get("/_control/stats")
+async def stats():
+    return {
+        "payments": len(state.payments),
+        "invoices": len(state.invoices),
+        "payouts": len(state.payouts),
+        "ipn_sent": state.ipn_sent,
+        "ipn_failed": state.ipn_failed,
+    }
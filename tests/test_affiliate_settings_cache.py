@@ -0,0 +1,49 @@
+import asyncio
+import sys
+import os
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import User
+from app.service.affiliate_admin_service import AffiliateAdminService
+from app.service.affiliate_settings_cache import AffiliateSettingsCache, affiliate_settings_cache
+
+
+def test_affiliate_settings_cache_follows_admin_updates_across_workers():
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        session = AsyncSession(engine, expire_on_commit=False)
+        # Settings cached against another test's database must not leak in
+        affiliate_settings_cache.clear()
+        referrer = User(email="referrer@example.com", name="Referrer", password="x", Status=True, email_verified=True)
+        session.add(referrer)
+        await session.commit()
+
+        # A second worker's cache, checking the shared version on every read
+        other_worker = AffiliateSettingsCache(ttl=300, version_check_interval=0)
+        try:
+            before = await other_worker.get_user(session, referrer.id)
+            global_before = await other_worker.get_global(session)
+            await AffiliateAdminService(session).update_user_settings(referrer.id, 0.05, None, None)
+            after = await other_worker.get_user(session, referrer.id)
+            local = await affiliate_settings_cache.get_user(session, referrer.id)
+            return before, global_before, after, local
+        finally:
+            await session.close()
+            await engine.dispose()
+
+    before, global_before, after, local = asyncio.run(scenario())
+
+    assert before is None
+    assert global_before.default_commission_rate == Decimal("0.02")
+    assert after.custom_commission_rate == Decimal("0.05")
+    assert local.custom_commission_rate == Decimal("0.05")
@@ -0,0 +1,78 @@
+import asyncio
+import sys
+import os
+from datetime import timedelta
+from unittest.mock import patch
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import JobLease
+from app.repository.job_lease_repo import JobLeaseRepository
+from app.service.background_jobs import run_periodic
+
+
+def test_one_holder_at_a_time_until_the_lease_expires():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with session_factory() as session:
+            repo = JobLeaseRepository(session)
+            minute = timedelta(minutes=1)
+            first = await repo.acquire("sweep", "a", minute)
+            taken = await repo.acquire("sweep", "b", minute)
+            renewed = await repo.acquire("sweep", "a", minute)
+            # a stops renewing
+            expired = await repo.acquire("sweep", "a", -minute)
+            taken_over = await repo.acquire("sweep", "b", minute)
+            await repo.release("sweep", "a")
+            kept = await repo.acquire("sweep", "a", minute)
+            await repo.release("sweep", "b")
+            released = await repo.acquire("sweep", "a", minute)
+            return first, taken, renewed, expired, taken_over, kept, released
+
+    results = asyncio.run(scenario())
+    asyncio.run(engine.dispose())
+
+    assert results == (True, False, True, True, True, False, True)
+
+
+def test_only_the_lease_holder_runs_the_job_and_it_releases_on_shutdown(tmp_path):
+    # A file database: each worker's session needs its own connection
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/jobs.db")
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    runs = []
+
+    def job(worker):
+        async def run():
+            runs.append(worker)
+        return run
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        with patch("app.db.session.AsyncSessionLocal", session_factory):
+            workers = [
+                asyncio.create_task(run_periodic("sweep", 0.05, job(worker), holder=worker))
+                for worker in ("a", "b")
+            ]
+            await asyncio.sleep(0.3)
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        async with session_factory() as session:
+            return (await session.exec(select(JobLease))).all()
+
+    leases = asyncio.run(scenario())
+    asyncio.run(engine.dispose())
+
+    assert len(runs) > 1 and len(set(runs)) == 1
+    assert leases == []
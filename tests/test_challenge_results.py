@@ -0,0 +1,91 @@
+import asyncio
+import sys
+import os
+from decimal import Decimal
+from unittest.mock import patch
+from uuid import uuid4
+
+from fastapi import BackgroundTasks
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.models import User, PropFirmRegistration, PassType, Notification, Wallet, ReferralEarning, EarningStatus
+from app.models.propfirm_registration import AccountStatus
+from app.schema.propfirm_registration import ChallengeResultItem
+from app.service.propfirm_registration_service import PropFirmRegistrationService
+
+
+def _registration(user, order_id, status=AccountStatus.in_progress):
+    return PropFirmRegistration(
+        user_id=user.id, login_id=order_id, password="p", propfirm_name="FTMO", propfirm_website_link="https://ftmo.com",
+        server_name="s", server_type="demo", challenges_step=2, order_id=order_id, propfirm_account_cost=200.0,
+        account_size=10000.0, account_phases=2, trading_platform="MT5", propfirm_rules="r", whatsapp_no="1",
+        telegram_username="@b", pass_type=PassType.guaranteed_pass, account_status=status,
+    )
+
+
+def test_bulk_challenge_results_release_earnings_in_one_transaction():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with session_factory() as session:
+            referrer = User(email="ref@example.com", name="Ref", password="x", Status=True, email_verified=True)
+            buyer = User(email="buyer@example.com", name="Buyer", password="x", Status=True, email_verified=True,
+                         referred_by=referrer.referral_code)
+            passing, failing, done = (_registration(buyer, "A"), _registration(buyer, "B"),
+                                      _registration(buyer, "C", AccountStatus.passed))
+            wallet = Wallet(user_id=referrer.id, available_balance=Decimal("0"), locked_balance=Decimal("10"),
+                            total_withdrawn=Decimal("0"))
+            session.add_all([referrer, buyer, passing, failing, done, wallet])
+            for registration in (passing, failing):
+                session.add(ReferralEarning(
+                    wallet_id=wallet.id, referrer_id=referrer.id, referred_user_id=buyer.id,
+                    registration_id=registration.id, pass_type="guaranteed_pass", amount=Decimal("5.00"),
+                    status=EarningStatus.locked,
+                ))
+            await session.commit()
+
+            background_tasks = BackgroundTasks()
+            results = [
+                ChallengeResultItem(registration_id=passing.id, account_status="passed"),
+                ChallengeResultItem(registration_id=failing.id, account_status="failed"),
+                ChallengeResultItem(registration_id=done.id, account_status="passed"),
+                ChallengeResultItem(registration_id=uuid4(), account_status="passed"),
+            ]
+            response = await PropFirmRegistrationService(session).apply_challenge_results(results, background_tasks)
+            # Applying the same batch again changes nothing
+            again = await PropFirmRegistrationService(session).apply_challenge_results(results, BackgroundTasks())
+
+            email_tasks = [t for t in background_tasks.tasks if t.func.__name__ == "send_email"]
+            for task in background_tasks.tasks:
+                if task.func.__name__ != "send_email":
+                    await task()
+
+            wallet = (await session.exec(select(Wallet))).one()
+            await session.refresh(wallet)
+            earnings = {e.registration_id: e for e in (await session.exec(select(ReferralEarning))).all()}
+            notifications = (await session.exec(select(Notification))).all()
+            return response, again, wallet, earnings, notifications, email_tasks, passing.id, failing.id
+
+    with patch.object(settings, "ADMIN_EMAIL", None), patch("app.db.session.AsyncSessionLocal", session_factory):
+        response, again, wallet, earnings, notifications, email_tasks, passing_id, failing_id = asyncio.run(scenario())
+    asyncio.run(engine.dispose())
+
+    assert (response.updated, response.unchanged, len(response.not_found)) == (2, 1, 1)
+    assert (response.earnings_released, response.amount_released) == (1, 5.0)
+    assert (again.updated, again.earnings_released) == (0, 0)
+    assert wallet.available_balance == Decimal("5.00")
+    assert wallet.locked_balance == Decimal("5.00")
+    assert earnings[passing_id].status == EarningStatus.released and earnings[passing_id].challenge_passed
+    assert earnings[failing_id].status == EarningStatus.locked
+    assert sorted(n.title for n in notifications) == ["PropFirm Account Failed", "PropFirm Account Passed"]
+    assert sorted(t.kwargs["template_name"] for t in email_tasks) == ["user_account_failed.html", "user_account_passed.html"]
@@ -0,0 +1,83 @@
+import asyncio
+import sys
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.http_cache import etag_matches
+from app.db.session import get_session
+from app.dependencies.auth import get_current_user
+from app.models import User, Vat, UserPurchasedPackage
+
+
+def test_etag_matching_follows_if_none_match_rules():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_cacheable_gets_answer_304_until_the_rows_change():
+    from app.api.v1.endpoints import discounts, users
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    owner = User(email="owner@example.com", name="Owner", password="x", Status=True, email_verified=True)
+    other = User(email="other@example.com", name="Other", password="x", Status=True, email_verified=True)
+    current = {"user": owner}
+
+    async def add(*rows):
+        async with session_factory() as session:
+            session.add_all(rows)
+            await session.commit()
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+    asyncio.run(create_tables())
+    asyncio.run(add(owner, other, Vat(vat_name="Standard", percentage=7.5)))
+    asyncio.run(add(UserPurchasedPackage(user_id=owner.id, package_name="Gold", amount=100.0)))
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(discounts.router, prefix="/discounts")
+    app.include_router(users.router, prefix="/users")
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_current_user] = lambda: current["user"]
+    client = TestClient(app)
+
+    first = client.get("/discounts/vat")
+    etag = first.headers["ETag"]
+    revalidated = client.get("/discounts/vat", headers={"If-None-Match": etag})
+    asyncio.run(add(Vat(vat_name="Reduced", percentage=5.0)))
+    changed = client.get("/discounts/vat", headers={"If-None-Match": etag})
+
+    packages = client.get("/users/packages")
+    packages_again = client.get("/users/packages", headers={"If-None-Match": packages.headers["ETag"]})
+    current["user"] = other
+    # Another user's (empty) list never matches the owner's ETag
+    other_packages = client.get("/users/packages", headers={"If-None-Match": packages.headers["ETag"]})
+    asyncio.run(engine.dispose())
+
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "public, max-age=300"
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag and len(changed.json()) == 2
+
+    assert packages.headers["Cache-Control"] == "private, no-cache"
+    assert [p["package_name"] for p in packages.json()] == ["Gold"]
+    assert packages_again.status_code == 304
+    assert other_packages.status_code == 200 and other_packages.json() == []
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import get_session
+from app.dependencies.auth import get_current_user
+from app.models import User, PropFirmRegistration
+from app.service.idempotency_service import run_idempotent
+
+REGISTRATION = {
+    "login_id": "1", "password": "p", "propfirm_name": "FTMO", "propfirm_website_link": "https://ftmo.com",
+    "server_name": "s", "server_type": "demo", "challenges_step": 2, "propfirm_account_cost": 200.0,
+    "account_size": 10000.0, "account_phases": 2, "trading_platform": "MT5", "propfirm_rules": "r",
+    "whatsapp_no": "1", "telegram_username": "@b",
+}
+
+
+def _engine(url=None):
+    if url:
+        engine = create_async_engine(url)
+    else:
+        # One shared in-memory connection: fine as long as requests don't overlap
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+    asyncio.run(create_tables())
+    return engine, async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def test_prop_firm_registration_replays_retries_with_the_same_key():
+    from app.api.v1.endpoints import prop_firm
+
+    engine, session_factory = _engine()
+    user = User(email="u@example.com", name="U", password="x", Status=True, email_verified=True)
+
+    async def add_user():
+        async with session_factory() as session:
+            session.add(user)
+            await session.commit()
+
+    asyncio.run(add_user())
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(prop_firm.router, prefix="/prop-firm")
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_current_user] = lambda: user
+
+    async def count_registrations():
+        async with session_factory() as session:
+            return len((await session.exec(select(PropFirmRegistration))).all())
+
+    with patch("app.db.session.AsyncSessionLocal", session_factory), TestClient(app) as client:
+        headers = {"Idempotency-Key": "retry-1"}
+        first = client.post("/prop-firm", json=REGISTRATION, headers=headers)
+        retry = client.post("/prop-firm", json=REGISTRATION, headers=headers)
+        changed = client.post("/prop-firm", json={**REGISTRATION, "account_size": 5.0}, headers=headers)
+        unkeyed = client.post("/prop-firm", json=REGISTRATION)
+
+    registrations = asyncio.run(count_registrations())
+    asyncio.run(engine.dispose())
+
+    assert first.status_code == 200 and retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert changed.status_code == 422
+    assert unkeyed.status_code == 200
+    assert registrations == 2
+
+
+def test_concurrent_duplicates_wait_for_the_first_result(tmp_path):
+    # Each session needs its own connection for the claims to race like they do in production
+    engine, session_factory = _engine(f"sqlite+aiosqlite:///{tmp_path / 'idempotency.db'}")
+    calls = []
+
+    async def scenario():
+        async def slow_handler():
+            calls.append(1)
+            await asyncio.sleep(0.3)
+            return {"withdrawal": len(calls)}
+
+        async def failing_handler():
+            raise HTTPException(status_code=400, detail="Insufficient balance")
+
+        first, duplicate = await asyncio.gather(
+            run_idempotent("k", "scope", {"amount": 100}, slow_handler),
+            run_idempotent("k", "scope", {"amount": 100}, slow_handler),
+        )
+        errors = []
+        for _ in range(2):
+            try:
+                await run_idempotent("k2", "scope", {"amount": 1000}, failing_handler)
+            except HTTPException as e:
+                errors.append((e.status_code, e.detail))
+            else:
+                errors.append("replayed")
+        return first, duplicate, errors
+
+    with patch("app.db.session.AsyncSessionLocal", session_factory):
+        first, duplicate, errors = asyncio.run(scenario())
+    asyncio.run(engine.dispose())
+
+    assert len(calls) == 1
+    assert json.loads(first.body) == json.loads(duplicate.body) == {"withdrawal": 1}
+    assert "Idempotent-Replayed" in duplicate.headers
+    # A client error is stored and replayed as a response, not re-run
+    assert errors[0] == (400, "Insufficient balance")
+    assert errors[1] == "replayed"
+
+
+def test_a_key_released_during_the_claim_is_claimed_again_before_running(tmp_path):
+    from app.models.idempotency_key import IdempotencyKey
+    from app.repository.idempotency_repo import IdempotencyRepository
+    from app.service.idempotency_service import _request_hash
+
+    engine, session_factory = _engine(f"sqlite+aiosqlite:///{tmp_path / 'idempotency.db'}")
+    calls = []
+    real_get = IdempotencyRepository.get
+    reads = []
+
+    async def get_missing_once(self, key):
+        # The holder released the key just before our re-read, then a new holder took it
+        reads.append(key)
+        return None if len(reads) == 1 else await real_get(self, key)
+
+    async def handler():
+        calls.append(1)
+        return {"ok": True}
+
+    async def scenario():
+        async with session_factory() as session:
+            session.add(IdempotencyKey(
+                key="scope:k", request_hash=_request_hash({"amount": 100}),
+                expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+            ))
+            await session.commit()
+        try:
+            await run_idempotent("k", "scope", {"amount": 100}, handler)
+        except HTTPException as e:
+            return e.status_code
+
+    with patch("app.db.session.AsyncSessionLocal", session_factory), \
+         patch.object(IdempotencyRepository, "get", get_missing_once), \
+         patch("app.service.idempotency_service.settings.IDEMPOTENCY_WAIT_TIMEOUT", 0.3):
+        status_code = asyncio.run(scenario())
+    asyncio.run(engine.dispose())
+
+    # Never ran without owning the key row: it waited for the new holder instead
+    assert calls == []
+    assert status_code == 409
+    assert len(reads) > 1
+
+
+def test_an_abandoned_claim_expires_and_a_completed_key_is_kept_for_the_ttl(tmp_path):
+    from app.models.idempotency_key import IdempotencyKey, IdempotencyStatus
+    from app.service.idempotency_service import _request_hash
+
+    engine, session_factory = _engine(f"sqlite+aiosqlite:///{tmp_path / 'idempotency.db'}")
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        return {"ok": True}
+
+    async def scenario():
+        async with session_factory() as session:
+            # Claimed by a worker that died mid-request: its lease ran out
+            session.add(IdempotencyKey(
+                key="scope:k", request_hash=_request_hash({"amount": 100}),
+                expires_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+            ))
+            await session.commit()
+        claimed_at = datetime.now(timezone.utc)
+        response = await run_idempotent("k", "scope", {"amount": 100}, handler)
+        async with session_factory() as session:
+            row = (await session.exec(select(IdempotencyKey))).one()
+        return claimed_at, response, row
+
+    with patch("app.db.session.AsyncSessionLocal", session_factory):
+        claimed_at, response, row = asyncio.run(scenario())
+    asyncio.run(engine.dispose())
+
+    assert calls == [1]
+    assert json.loads(response.body) == {"ok": True}
+    assert row.status == IdempotencyStatus.completed
+    # SQLite hands the timestamp back naive, in UTC
+    assert row.expires_at.replace(tzinfo=timezone.utc) > claimed_at + timedelta(hours=1)
+
+
+def test_a_claim_is_a_short_lease(tmp_path):
+    from app.models.idempotency_key import IdempotencyKey
+
+    engine, session_factory = _engine(f"sqlite+aiosqlite:///{tmp_path / 'idempotency.db'}")
+    seen = []
+
+    async def handler():
+        async with session_factory() as session:
+            seen.append((await session.exec(select(IdempotencyKey))).one())
+        return {"ok": True}
+
+    with patch("app.db.session.AsyncSessionLocal", session_factory), \
+         patch("app.service.idempotency_service.settings.IDEMPOTENCY_WAIT_TIMEOUT", 5):
+        started = datetime.now(timezone.utc)
+        asyncio.run(run_idempotent("k", "scope", {"amount": 100}, handler))
+    asyncio.run(engine.dispose())
+
+    lease = seen[0].expires_at.replace(tzinfo=timezone.utc) - started
+    assert timedelta(seconds=5) < lease < timedelta(minutes=5)
@@ -0,0 +1,81 @@
+import json
+import logging
+import queue
+import sys
+import os
+import threading
+from logging.handlers import QueueListener
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.logging_config import JsonFormatter, LazyQueueHandler, SamplingFilter, parse_sample_rates
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+        self.threads = []
+
+    def emit(self, record):
+        self.threads.append(threading.current_thread())
+        self.lines.append(self.format(record))
+
+
+def _logger(name, *filters):
+    log_queue = queue.SimpleQueue()
+    target = _Collect()
+    target.setFormatter(JsonFormatter())
+    listener = QueueListener(log_queue, target)
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(LazyQueueHandler(log_queue))
+    for f in filters:
+        logger.addFilter(f)
+    return logger, listener, target
+
+
+def test_records_are_formatted_as_json_on_the_listener_thread():
+    class Formatted:
+        calls = []
+
+        def __str__(self):
+            Formatted.calls.append(threading.current_thread())
+            return "lazy"
+
+    logger, listener, target = _logger("test.queue")
+    logger.info("value=%s n=%d", Formatted(), 3)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+    # Nothing is rendered on the calling thread
+    assert Formatted.calls == []
+
+    listener.start()
+    listener.stop()
+
+    first, second = (json.loads(line) for line in target.lines)
+    assert (first["level"], first["logger"], first["message"]) == ("INFO", "test.queue", "value=lazy n=3")
+    assert second["message"] == "failed" and "ValueError: boom" in second["exc_info"]
+    assert Formatted.calls and all(t is not threading.main_thread() for t in Formatted.calls + target.threads)
+
+
+def test_sampling_drops_info_but_keeps_warnings():
+    logger, listener, target = _logger("test.sampled", SamplingFilter(0.0))
+    for _ in range(20):
+        logger.info("request")
+    logger.warning("slow request")
+    listener.start()
+    listener.stop()
+
+    assert [json.loads(line)["message"] for line in target.lines] == ["slow request"]
+
+
+def test_parse_sample_rates(caplog):
+    with caplog.at_level(logging.WARNING, logger="app"):
+        assert parse_sample_rates("app.requests=0.1, other = 2,bad=x,junk") == {"app.requests": 0.1, "other": 1.0}
+
+    assert [r.getMessage() for r in caplog.records] == ["Ignoring invalid log sample rate: bad=x"]
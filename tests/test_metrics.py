@@ -0,0 +1,105 @@
+import subprocess
+import sys
+import os
+from unittest.mock import patch
+
+from fastapi import APIRouter, BackgroundTasks, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import TTLCache
+from app.core.metrics import MetricsRoute
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_routes_record_latency_by_template_and_track_background_tasks():
+    router = APIRouter(route_class=MetricsRoute)
+    seen_pending = []
+
+    def background_job():
+        seen_pending.append(_sample("background_tasks_pending"))
+
+    @router.get("/items/{item_id}")
+    async def read_item(item_id: int, background_tasks: BackgroundTasks):
+        if item_id == 0:
+            raise HTTPException(status_code=404, detail="Not found")
+        background_tasks.add_task(background_job)
+        background_tasks.add_task(background_job)
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/metrics-test")
+    route = "/metrics-test/items/{item_id}"
+    before_ok = _sample("http_request_duration_seconds_count", method="GET", route=route, status="200")
+    before_missing = _sample("http_request_duration_seconds_count", method="GET", route=route, status="404")
+
+    client = TestClient(app)
+    assert client.get("/metrics-test/items/1").status_code == 200
+    assert client.get("/metrics-test/items/2").status_code == 200
+    assert client.get("/metrics-test/items/0").status_code == 404
+
+    assert _sample("http_request_duration_seconds_count", method="GET", route=route, status="200") == before_ok + 2
+    assert _sample("http_request_duration_seconds_count", method="GET", route=route, status="404") == before_missing + 1
+    assert _sample("http_requests_in_progress", method="GET", route=route) == 0
+    # Both tasks of a response are queued before the first runs, and the gauge drains afterwards
+    assert seen_pending[:2] == [2, 1]
+    assert _sample("background_tasks_pending") == 0
+
+
+def test_cache_lookups_are_counted():
+    cache = TTLCache("metrics_test", ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    assert _sample("cache_lookups_total", cache="metrics_test", result="hit") == 2
+    assert _sample("cache_lookups_total", cache="metrics_test", result="miss") == 1
+
+
+def test_multiprocess_mode_aggregates_workers(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = (
+        "from app.core.cache import TTLCache\n"
+        "cache = TTLCache('shared', ttl=60)\n"
+        "cache.get('missing')\n"
+    )
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], cwd=PROJECT_ROOT, env=env, check=True, capture_output=True)
+
+    scrape = "from app.core.metrics import render_metrics\nprint(render_metrics()[0].decode())\n"
+    output = subprocess.run(
+        [sys.executable, "-c", scrape], cwd=PROJECT_ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+
+    assert 'cache_lookups_total{cache="shared",result="miss"} 2.0' in output
+
+
+def test_metrics_endpoint_needs_the_token_or_an_allowed_address():
+    from app.config import settings
+    from app.main import app
+
+    # No context manager: the lifespan (init_db, background loops) stays off; the client is "testclient"
+    client = TestClient(app)
+    with patch.object(settings, "METRICS_TOKEN", ""), patch.object(settings, "METRICS_ALLOWED_IPS", ""):
+        closed = client.get("/metrics")
+    with patch.object(settings, "METRICS_TOKEN", "scrape-secret"), patch.object(settings, "METRICS_ALLOWED_IPS", ""):
+        wrong = client.get("/metrics", headers={"Authorization": "Bearer nope"})
+        token = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    with patch.object(settings, "METRICS_TOKEN", ""), patch.object(settings, "METRICS_ALLOWED_IPS", "10.0.0.0/8"):
+        elsewhere = client.get("/metrics")
+    local = TestClient(app, client=("10.1.2.3", 50000))
+    with patch.object(settings, "METRICS_TOKEN", ""), patch.object(settings, "METRICS_ALLOWED_IPS", "127.0.0.1, 10.0.0.0/8"):
+        allowed = local.get("/metrics")
+
+    assert [closed.status_code, wrong.status_code, elsewhere.status_code] == [404, 404, 404]
+    assert token.status_code == 200 and "http_request_duration_seconds" in token.text
+    assert allowed.status_code == 200
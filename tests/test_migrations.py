@@ -0,0 +1,42 @@
+import sys
+import os
+from unittest.mock import patch
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+from sqlmodel import SQLModel
+
+# Add the project root to the python path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+import app.models  # noqa: F401
+from app.config import settings
+
+
+def test_migrations_build_the_model_schema_and_downgrade(tmp_path):
+    db_path = tmp_path / "migrations.db"
+    config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+
+    with patch.object(settings, "DB_URI", f"sqlite+aiosqlite:///{db_path}"):
+        command.upgrade(config, "head")
+        engine = create_engine(f"sqlite:///{db_path}")
+        with engine.connect() as conn:
+            # Tables outside the models (full-text index) are skipped, as in migrations/env.py
+            diff = [d for d in compare_metadata(MigrationContext.configure(conn), SQLModel.metadata)
+                    if d[0] != "remove_table"]
+            indexes = {index["name"] for index in inspect(conn).get_indexes("withdrawal_request")}
+            tables = set(inspect(conn).get_table_names())
+
+        command.downgrade(config, "0001")
+        with engine.connect() as conn:
+            after_downgrade = {index["name"] for index in inspect(conn).get_indexes("withdrawal_request")}
+        engine.dispose()
+
+    assert diff == []
+    assert {"ix_withdrawal_request_wallet_id_created_at", "ix_withdrawal_request_status_created_at"} <= indexes
+    assert "support_search_fts" in tables
+    assert "ix_withdrawal_request_wallet_id_created_at" not in after_downgrade
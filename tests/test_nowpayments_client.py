@@ -0,0 +1,119 @@
+import asyncio
+import sys
+import os
+from unittest.mock import patch
+
+import httpx
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.core.circuit_breaker import CircuitState
+from app.service import nowpayments_service
+from app.service.nowpayments_service import (
+    NOWPaymentsService,
+    NOWPaymentsError,
+    NOWPaymentsAPIError,
+    NOWPaymentsUnavailableError,
+)
+
+
+def _run_with_responses(responses, coro_factory):
+    """Run a service call while httpx returns the given responses (or raises the given exceptions) in order"""
+    calls = []
+
+    async def fake_request(self, method, url, **kwargs):
+        calls.append((method, url))
+        item = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(item, Exception):
+            raise item
+        return httpx.Response(item[0], json=item[1], request=httpx.Request(method, url))
+
+    async def no_sleep(delay):
+        return None
+
+    nowpayments_service.circuit_breaker.reset()
+    with patch("httpx.AsyncClient.request", new=fake_request), patch("asyncio.sleep", new=no_sleep):
+        try:
+            return asyncio.run(coro_factory(NOWPaymentsService())), calls
+        except Exception as e:
+            return e, calls
+
+
+def test_get_is_retried_until_success():
+    result, calls = _run_with_responses(
+        [(503, {"message": "down"}), (200, {"message": "OK"})],
+        lambda s: s.get_api_status()
+    )
+    assert result == {"message": "OK"}
+    assert len(calls) == 2
+
+
+def test_post_is_not_retried():
+    result, calls = _run_with_responses(
+        [(503, {"message": "down"}), (200, {"id": "batch"})],
+        lambda s: s.create_payout([{"address": "addr", "currency": "btc", "amount": 100}])
+    )
+    assert isinstance(result, NOWPaymentsAPIError)
+    assert result.status_code == 503
+    assert len(calls) == 1
+
+
+def test_invalid_address_returns_false():
+    result, calls = _run_with_responses(
+        [(400, {"message": "invalid address"})],
+        lambda s: s.validate_address("bad", "btc")
+    )
+    assert result is False
+
+
+def test_circuit_opens_and_fails_fast():
+    breaker = nowpayments_service.circuit_breaker
+
+    async def hammer(service):
+        for _ in range(settings.NOWPAYMENTS_CIRCUIT_FAILURE_THRESHOLD):
+            try:
+                await service.create_payout([])
+            except NOWPaymentsError:
+                pass
+        return await service.create_payout([])
+
+    result, calls = _run_with_responses([httpx.ConnectError("refused")], hammer)
+    assert breaker.state == CircuitState.OPEN
+    assert isinstance(result, NOWPaymentsUnavailableError)
+    assert len(calls) == settings.NOWPAYMENTS_CIRCUIT_FAILURE_THRESHOLD
+    breaker.reset()
+
+
+def test_cancelled_half_open_trial_lets_the_next_call_through():
+    breaker = nowpayments_service.circuit_breaker
+    started = []
+
+    async def hang(self, method, url, **kwargs):
+        started.append(url)
+        await asyncio.Event().wait()
+
+    async def ok(self, method, url, **kwargs):
+        return httpx.Response(200, json={"message": "OK"}, request=httpx.Request(method, url))
+
+    async def trial_then_retry(service):
+        breaker._open()
+        breaker._opened_at -= breaker.reset_timeout
+        trial = asyncio.create_task(service.get_api_status())
+        while not started:
+            await asyncio.sleep(0)
+        trial.cancel()
+        try:
+            await trial
+        except asyncio.CancelledError:
+            pass
+        with patch("httpx.AsyncClient.request", new=ok):
+            return await service.get_api_status()
+
+    breaker.reset()
+    with patch("httpx.AsyncClient.request", new=hang):
+        result = asyncio.run(trial_then_retry(NOWPaymentsService()))
+
+    assert result == {"message": "OK"}
+    assert breaker.state == CircuitState.CLOSED
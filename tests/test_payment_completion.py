@@ -0,0 +1,170 @@
+import asyncio
+import sys
+import os
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from fastapi import BackgroundTasks
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.models import (
+    User, CryptoPayment, PropFirmRegistration, PassType, Notification, Wallet, ReferralEarning,
+)
+from app.models.propfirm_registration import PaymentStatus
+from app.schema.crypto_payment import NOWPaymentsIPNPayload
+from app.service.affiliate_settings_cache import affiliate_settings_cache
+from app.service.nowpayments_service import NOWPaymentsService
+
+IPN_SECRET = "test-ipn-secret"
+
+
+async def _setup():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    session = AsyncSession(engine, expire_on_commit=False)
+    # Settings cached against another test's database must not leak in
+    affiliate_settings_cache.clear()
+
+    referrer = User(email="referrer@example.com", name="Referrer", password="x", Status=True, email_verified=True)
+    buyer = User(
+        email="buyer@example.com", name="Buyer", password="x", Status=True, email_verified=True,
+        referred_by=referrer.referral_code,
+    )
+    registration = PropFirmRegistration(
+        user_id=buyer.id, login_id="1", password="p", propfirm_name="FTMO", propfirm_website_link="https://ftmo.com",
+        server_name="s", server_type="demo", challenges_step=2, order_id="ORDER-1", propfirm_account_cost=200.0,
+        account_size=10000.0, account_phases=2, trading_platform="MT5", propfirm_rules="r", whatsapp_no="1",
+        telegram_username="@b", pass_type=PassType.standard_pass,
+    )
+    payment = CryptoPayment(
+        user_id=buyer.id, payment_id="555", order_id="ORDER-1", price_amount=200.0, price_currency="usd",
+        pay_currency="btc",
+    )
+    session.add_all([referrer, buyer, registration, payment])
+    await session.commit()
+    return engine, session, registration
+
+
+async def _deliver(session, status, background_tasks):
+    body = {
+        "payment_id": 555, "payment_status": status, "pay_address": "addr", "price_amount": 200.0,
+        "price_currency": "usd", "pay_amount": 0.01, "actually_paid": 0.01, "pay_currency": "btc",
+        "order_id": "ORDER-1",
+    }
+    signature = NOWPaymentsService.sign_ipn_payload(body, IPN_SECRET)
+    service = NOWPaymentsService(session)
+    return await service.process_ipn_callback(
+        NOWPaymentsIPNPayload(**body), signature, raw_body=body, background_tasks=background_tasks
+    )
+
+
+def test_finished_ipn_completes_registration_and_credits_referrer_once():
+    async def scenario():
+        engine, session, registration = await _setup()
+        background_tasks = BackgroundTasks()
+        try:
+            await _deliver(session, "finished", background_tasks)
+            # Redelivered IPN must not credit or notify again
+            await _deliver(session, "finished", background_tasks)
+
+            await session.refresh(registration)
+            earnings = (await session.exec(select(ReferralEarning))).all()
+            wallet = (await session.exec(select(Wallet))).one()
+            notifications = (await session.exec(select(Notification))).all()
+            return registration.payment_status, earnings, wallet, notifications, background_tasks.tasks
+        finally:
+            await session.close()
+            await engine.dispose()
+
+    with patch.object(settings, "NOWPAYMENTS_IPN_SECRET", IPN_SECRET), patch.object(settings, "ADMIN_EMAIL", None):
+        status, earnings, wallet, notifications, tasks = asyncio.run(scenario())
+
+    assert status == PaymentStatus.completed
+    assert len(earnings) == 1
+    assert earnings[0].amount == Decimal("4.00")
+    assert wallet.available_balance == Decimal("4.00")
+    assert [n.title for n in notifications] == ["Payment Successful"]
+    assert [t.kwargs["template_name"] for t in tasks] == ["crypto_payment_success.html"]
+
+
+def test_failed_ipn_marks_registration_failed_without_earning():
+    async def scenario():
+        engine, session, registration = await _setup()
+        try:
+            await _deliver(session, "failed", BackgroundTasks())
+            await session.refresh(registration)
+            earnings = (await session.exec(select(ReferralEarning))).all()
+            return registration.payment_status, earnings
+        finally:
+            await session.close()
+            await engine.dispose()
+
+    with patch.object(settings, "NOWPAYMENTS_IPN_SECRET", IPN_SECRET):
+        status, earnings = asyncio.run(scenario())
+
+    assert status == PaymentStatus.failed
+    assert earnings == []
+
+
+def _sweep(provider_status=None):
+    from app.service.crypto_payment_sweeper import CryptoPaymentSweeper
+
+    async def get_payment_status(self, payment_id):
+        return {"payment_id": payment_id, "payment_status": provider_status, "actually_paid": 0.01}
+
+    async def scenario():
+        engine, session, registration = await _setup()
+        try:
+            payment = (await session.exec(select(CryptoPayment))).one()
+            payment.created_at = payment.created_at - timedelta(days=2)
+            session.add(payment)
+            await session.commit()
+
+            sweeper = CryptoPaymentSweeper(
+                session, stale_after=timedelta(hours=1), batch_size=10, confirm=provider_status is not None
+            )
+            result = await sweeper.sweep()
+            await session.refresh(payment)
+            await session.refresh(registration)
+            return result, payment.payment_status, registration.payment_status
+        finally:
+            await session.close()
+            await engine.dispose()
+
+    with patch.object(NOWPaymentsService, "get_payment_status", new=get_payment_status), \
+            patch.object(settings, "ADMIN_EMAIL", None), patch("app.service.mail.send_email"):
+        return asyncio.run(scenario())
+
+
+def test_sweeper_expires_stale_waiting_payment():
+    result, payment_status, registration_status = _sweep()
+
+    assert (result.scanned, result.expired, result.registrations_failed) == (1, 1, 1)
+    assert payment_status == "expired"
+    assert registration_status == PaymentStatus.failed
+
+
+def test_sweeper_completes_payment_the_provider_reports_finished():
+    result, payment_status, registration_status = _sweep(provider_status="finished")
+
+    assert (result.reconciled, result.expired) == (1, 0)
+    assert payment_status == "finished"
+    assert registration_status == PaymentStatus.completed
+
+
+def test_sweeper_leaves_payment_the_provider_is_still_processing_waiting():
+    result, payment_status, registration_status = _sweep(provider_status="confirming")
+
+    assert (result.skipped, result.reconciled, result.expired) == (1, 0, 0)
+    # Still in the waiting scan for the next sweep
+    assert payment_status == "waiting"
+    assert registration_status == PaymentStatus.pending
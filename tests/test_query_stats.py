@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import sys
+import os
+from decimal import Decimal
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.core.query_stats import instrument_engine, statement_shape
+from app.db.session import get_session
+from app.dependencies.auth import get_current_admin
+from app.models import Admin, User, Wallet, ReferralEarning, EarningStatus
+
+
+def test_statement_shape_folds_in_lists():
+    assert statement_shape("SELECT a\n  FROM t WHERE id IN (?, ?, ?)") == "SELECT a FROM t WHERE id IN (?)"
+    assert statement_shape("SELECT a FROM t WHERE id IN ($1, $2)") == statement_shape("SELECT a FROM t WHERE id IN ($1)")
+
+
+def test_requests_report_query_stats_and_warn_on_repeats(caplog):
+    from app.main import app
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    instrument_engine(engine)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with session_factory() as session:
+            for n in range(4):
+                referrer = User(email=f"ref{n}@example.com", name=f"Ref {n}", password="x", Status=True, email_verified=True)
+                wallet = Wallet(user_id=referrer.id)
+                session.add_all([referrer, wallet, ReferralEarning(
+                    wallet_id=wallet.id, referrer_id=referrer.id, referred_user_id=referrer.id,
+                    pass_type="guaranteed_pass", amount=Decimal(n + 1), status=EarningStatus.locked,
+                )])
+            await session.commit()
+
+    asyncio.run(seed())
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_current_admin] = lambda: Admin(email="a@example.com", name="A", password="x")
+    try:
+        # No context manager: the lifespan (init_db, background loops) stays off
+        client = TestClient(app)
+        with caplog.at_level(logging.INFO, logger="app"), patch.object(settings, "SQL_REPEATED_STATEMENT_THRESHOLD", 3):
+            response = client.get("/api/v1/admin/affiliates/top")
+            quiet = client.get("/api/v1/admin/affiliates/top?limit=2")
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(engine.dispose())
+
+    assert response.status_code == 200 and len(response.json()) == 4
+    assert 'db;dur=' in response.headers["Server-Timing"]
+    # The earnings query, then one user lookup per affiliate
+    assert 'desc="5 queries"' in response.headers["Server-Timing"]
+    assert "app;dur=" in response.headers["Server-Timing"]
+
+    request_lines = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Request: GET")]
+    assert len(request_lines) == 2 and "Queries: 5 - DB: " in request_lines[0] and "Slowest: " in request_lines[0]
+
+    warnings = [r.getMessage() for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(warnings) == 1
+    assert warnings[0].startswith("Repeated statement: GET /api/v1/admin/affiliates/top ran 4x: SELECT")
+    assert 'desc="3 queries"' in quiet.headers["Server-Timing"]
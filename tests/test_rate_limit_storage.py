@@ -0,0 +1,134 @@
+import asyncio
+import sys
+import os
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from limits import parse
+from limits.strategies import SlidingWindowCounterRateLimiter
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.rate_limit import SQLiteStorage, limiter
+from app.db.session import get_session
+
+
+def test_sqlite_storage_is_shared_between_workers(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'ratelimit.db'}"
+    # Two storages on one file stand in for two worker processes
+    workers = [SlidingWindowCounterRateLimiter(SQLiteStorage(uri)) for _ in range(2)]
+    limit = parse("5/minute")
+
+    allowed = [workers[n % 2].hit(limit, "route", "1.2.3.4") for n in range(8)]
+
+    assert allowed == [True] * 5 + [False] * 3
+    assert workers[1].hit(limit, "route", "5.6.7.8")
+    remaining = workers[0].get_window_stats(limit, "route", "1.2.3.4").remaining
+    assert remaining == 0
+
+
+def test_sqlite_storage_counts_expire(tmp_path):
+    storage = SQLiteStorage(f"sqlite:///{tmp_path / 'ratelimit.db'}")
+    assert storage.incr("k", expiry=60) == 1
+    assert storage.incr("k", expiry=60, amount=2) == 3
+    assert storage.get("k") == 3
+
+    with patch("app.core.rate_limit.time.time", return_value=storage.get_expiry("k") + 1):
+        assert storage.get("k") == 0
+        assert storage.incr("k", expiry=60) == 1
+
+
+def test_login_is_limited_per_account(tmp_path):
+    from app.api.v1.endpoints import auth
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+    asyncio.run(create_tables())
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    app.include_router(auth.router, prefix="/auth")
+    app.dependency_overrides[get_session] = override_session
+
+    shared = SlidingWindowCounterRateLimiter(SQLiteStorage(f"sqlite:///{tmp_path / 'ratelimit.db'}"))
+    with patch.object(limiter, "_limiter", shared), patch("app.api.v1.endpoints.auth.LOGIN_LIMIT", parse("3/minute")):
+        client = TestClient(app)
+
+        def login(username):
+            return client.post(
+                "/auth/login/access-token", data={"username": username, "password": "wrong"}
+            ).status_code
+
+        # The per-account counter trips long before the per-address route limit
+        statuses = [login(" Victim@example.com" if n % 2 else "victim@example.com") for n in range(5)]
+        other_account = login("someone@example.com")
+        # The admin route keeps its own counter for the same name
+        admin = client.post(
+            "/auth/login/admin/access-token", data={"username": "victim@example.com", "password": "wrong"}
+        ).status_code
+    asyncio.run(engine.dispose())
+
+    assert statuses == [400, 400, 400, 429, 429]
+    assert other_account == 400
+    assert admin == 400
+
+
+def test_a_locked_storage_fails_open_quickly(tmp_path):
+    import sqlite3
+    import time
+
+    from fastapi import Request
+
+    from app.core.rate_limit import LOGIN_LIMIT, RateLimitMiddleware, enforce_limit
+
+    path = tmp_path / "ratelimit.db"
+    shared = SlidingWindowCounterRateLimiter(SQLiteStorage(f"sqlite:///{path}"))
+    assert shared.hit(parse("5/minute"), "warm", "up")
+    # Another worker holding the write lock
+    holder = sqlite3.connect(path, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_middleware(RateLimitMiddleware)
+
+    @app.get("/ping")
+    async def ping(request: Request):
+        return {"ok": True}
+
+    @app.get("/limited")
+    @limiter.limit("5/minute")
+    async def limited(request: Request):
+        return {"ok": True}
+
+    try:
+        with patch.object(limiter, "_limiter", shared):
+            start = time.monotonic()
+            client = TestClient(app)
+            statuses = [client.get("/ping").status_code, client.get("/limited").status_code]
+            enforce_limit(LOGIN_LIMIT, "login", "victim@example.com")
+            elapsed = time.monotonic() - start
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+
+    assert statuses == [200, 200]
+    assert elapsed < 1
@@ -0,0 +1,68 @@
+import asyncio
+import sys
+import os
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.models  # noqa: F401  (registers every table)
+from app.models.user import User
+from app.models.propfirm_registration import PropFirmRegistration, AccountStatus
+from app.service.user_service import UserService, _referral_stats_cache
+
+
+def _registration(user, status, cost):
+    return PropFirmRegistration(
+        user_id=user.id, login_id="1", password="p", propfirm_name="FTMO", propfirm_website_link="https://ftmo.com",
+        server_name="s", server_type="demo", challenges_step=2, order_id=f"ORDER-{status.value}-{cost}",
+        propfirm_account_cost=cost, account_size=10000.0, account_phases=2, trading_platform="MT5",
+        propfirm_rules="r", whatsapp_no="1", telegram_username="@b", account_status=status,
+    )
+
+
+def test_referral_stats_aggregate_in_one_query_and_are_cached():
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        _referral_stats_cache.clear()
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                referrer = User(email="ref@example.com", name="Ref", password="x", Status=True, email_verified=True)
+                # One referred user without any registration still counts as a referral
+                referred = [
+                    User(email=f"u{i}@example.com", name="U", password="x", Status=True, email_verified=True,
+                         referred_by=referrer.referral_code)
+                    for i in range(3)
+                ]
+                session.add_all([referrer, *referred])
+                session.add_all([
+                    _registration(referred[0], AccountStatus.passed, 100.0),
+                    _registration(referred[0], AccountStatus.pending, 50.0),
+                    _registration(referred[1], AccountStatus.passed, 300.0),
+                    _registration(referred[1], AccountStatus.failed, 999.0),
+                ])
+                await session.commit()
+
+                service = UserService(session)
+                first = await service.get_referral_stats(referrer)
+                session.add(_registration(referred[2], AccountStatus.passed, 500.0))
+                await session.commit()
+                cached = await service.get_referral_stats(referrer)
+                return first, cached
+        finally:
+            await engine.dispose()
+
+    first, cached = asyncio.run(scenario())
+
+    assert first.total_referrals == 3
+    assert first.successful_passes == 2
+    assert first.pending_referrals == 1
+    assert first.total_earned == 8.0
+    # Served from the per-user cache until it expires
+    assert cached == first
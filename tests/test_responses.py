@@ -0,0 +1,103 @@
+import asyncio
+import json
+import sys
+import os
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.responses import ORJSONResponse, model_response, type_adapter
+from app.db.session import get_session
+from app.dependencies.auth import get_current_user
+from app.models import Notification, User
+from app.models.notification import NotificationType
+from app.models.wallet import PaymentMethod, Wallet, WithdrawalRequest
+from app.schema.notification import NotificationRead
+
+
+def test_orjson_response_encodes_uuid_decimal_and_datetime():
+    key = uuid.uuid4()
+    moment = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    response = ORJSONResponse({"id": key, "whole": Decimal("10"), "part": Decimal("2.50"), "at": moment, 1: "x"})
+
+    assert json.loads(response.body) == {
+        "id": str(key), "whole": 10, "part": 2.5, "at": "2026-01-02T03:04:05+00:00", "1": "x",
+    }
+    assert response.media_type == "application/json"
+
+
+def test_list_endpoints_answer_like_the_default_serializer():
+    from app.api.v1.endpoints import notification, wallet
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    user = User(email="owner@example.com", name="Owner", password="x", Status=True, email_verified=True)
+    user_wallet = Wallet(user_id=user.id, available_balance=Decimal("0"), locked_balance=Decimal("0"))
+
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with session_factory() as session:
+            session.add_all([user, user_wallet])
+            await session.flush()
+            session.add_all([
+                Notification(user_id=user.id, title=f"Note {n}", message="Hello", type=NotificationType.GENERAL)
+                for n in range(3)
+            ])
+            session.add(WithdrawalRequest(
+                wallet_id=user_wallet.id, amount=Decimal("150.25"), payment_method=PaymentMethod.paypal,
+                paypal_email="owner@example.com",
+            ))
+            await session.commit()
+
+    asyncio.run(seed())
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(notification.router, prefix="/notifications")
+    app.include_router(wallet.router, prefix="/wallet")
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_current_user] = lambda: user
+    client = TestClient(app)
+
+    notifications = client.get("/notifications/my-notifications")
+    withdrawals = client.get("/wallet/withdrawals")
+
+    async def load_notifications():
+        async with session_factory() as session:
+            return (await session.exec(select(Notification))).all()
+
+    rows = asyncio.run(load_notifications())
+    asyncio.run(engine.dispose())
+
+    assert notifications.status_code == 200
+    assert notifications.headers["content-type"] == "application/json"
+    expected = [NotificationRead.model_validate(row, from_attributes=True).model_dump(mode="json") for row in rows]
+    assert sorted(notifications.json(), key=lambda n: n["id"]) == sorted(expected, key=lambda n: n["id"])
+
+    body = withdrawals.json()
+    assert body["total_count"] == 1
+    assert body["withdrawals"][0]["amount"] == 150.25
+    assert body["withdrawals"][0]["payment_method"] == "paypal"
+    # The route still documents its model
+    assert "WithdrawalListResponse" in json.dumps(app.openapi())
+
+
+def test_type_adapters_are_built_once_per_response_type():
+    assert type_adapter(List[NotificationRead]) is type_adapter(List[NotificationRead])
+    response = model_response(List[NotificationRead], [], status_code=202, headers={"X-Total": "0"})
+    assert response.status_code == 202 and response.body == b"[]" and response.headers["X-Total"] == "0"
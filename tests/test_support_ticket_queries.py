@@ -0,0 +1,301 @@
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.models  # noqa: F401  (registers every table)
+from app.models.support import SupportTicket, SupportMessage, SenderType
+from app.models.user import User
+from app.repository.support_search_repo import create_support_search_schema
+from app.schema.support import SupportTicketCreate, SupportMessageCreate
+from app.service.support_service import SupportTicketService
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+async def _seed(session, message_counts):
+    """One user with a ticket per entry of message_counts; message i is sent START + i minutes"""
+    user = User(email="user@example.com", name="User", password="x", Status=True, email_verified=True)
+    session.add(user)
+    tickets = []
+    for n, count in enumerate(message_counts):
+        ticket = SupportTicket(user_id=user.id, subject=f"Ticket {n}", updated_at=START + timedelta(days=n))
+        session.add(ticket)
+        for i in range(count):
+            message = SupportMessage(
+                ticket_id=ticket.id,
+                sender_id=user.id,
+                sender_type=SenderType.USER if i % 2 == 0 else SenderType.ADMIN,
+                message=f"message {i}",
+                created_at=START + timedelta(minutes=i),
+            )
+            session.add(message)
+            ticket.message_count += 1
+            ticket.last_message_at = message.created_at
+            ticket.last_sender_type = message.sender_type
+        tickets.append(ticket)
+    await session.commit()
+    return user, tickets
+
+
+def _run(scenario):
+    async def wrapper():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await create_support_search_schema(conn)
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                return await scenario(session)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(wrapper())
+
+
+def test_ticket_lists_report_message_stats():
+    async def scenario(session):
+        user, _ = await _seed(session, [3, 0])
+        service = SupportTicketService(session)
+        return await service.get_user_tickets(user.id), await service.get_all_tickets()
+
+    user_page, admin_page = _run(scenario)
+
+    # Newest updated first
+    assert [t.subject for t in user_page.items] == ["Ticket 1", "Ticket 0"]
+    assert [t.message_count for t in user_page.items] == [0, 3]
+    assert user_page.items[0].last_message_at is None
+    assert user_page.items[1].last_message_at.replace(tzinfo=timezone.utc) == START + timedelta(minutes=2)
+    assert admin_page.total == 2
+    assert [t.user_email for t in admin_page.items] == ["user@example.com"] * 2
+
+
+def test_message_history_pages_backwards_from_latest():
+    async def scenario(session):
+        user, tickets = await _seed(session, [5])
+        service = SupportTicketService(session)
+        detail = await service.get_ticket_details(tickets[0].id, user_id=user.id)
+        first = await service.get_ticket_messages(tickets[0].id, user_id=user.id, limit=2)
+        second = await service.get_ticket_messages(
+            tickets[0].id, user_id=user.id, before=first.next_before, before_id=first.next_before_id, limit=2
+        )
+        third = await service.get_ticket_messages(
+            tickets[0].id, user_id=user.id, before=second.next_before, before_id=second.next_before_id, limit=2
+        )
+        return detail, first, second, third
+
+    detail, first, second, third = _run(scenario)
+
+    assert [m.message for m in detail.messages] == [f"message {i}" for i in range(5)]
+    assert detail.has_more_messages is False
+    assert (detail.next_before, detail.next_before_id) == (None, None)
+    assert [m.message for m in first.items] == ["message 3", "message 4"]
+    assert [m.message for m in second.items] == ["message 1", "message 2"]
+    assert [m.message for m in third.items] == ["message 0"]
+    assert (first.has_more, second.has_more, third.has_more) == (True, True, False)
+    assert third.next_before is None
+
+
+def test_message_pages_keep_messages_sharing_a_timestamp_at_the_page_edge():
+    async def scenario(session):
+        user, tickets = await _seed(session, [1])
+        # Three more messages in the same instant, straddling the edge of two-message pages
+        for i in range(1, 4):
+            session.add(SupportMessage(
+                ticket_id=tickets[0].id, sender_id=user.id, sender_type=SenderType.USER,
+                message=f"message {i}", created_at=START + timedelta(minutes=1),
+            ))
+        await session.commit()
+        service = SupportTicketService(session)
+        pages = [await service.get_ticket_messages(tickets[0].id, user_id=user.id, limit=2)]
+        # The ticket view's cursor leads to the same next page
+        with patch("app.service.support_service.MESSAGE_PAGE_SIZE", 2):
+            detail = await service.get_ticket_details(tickets[0].id, user_id=user.id)
+        assert (detail.next_before, detail.next_before_id) == (pages[0].next_before, pages[0].next_before_id)
+        while pages[-1].has_more:
+            pages.append(await service.get_ticket_messages(
+                tickets[0].id, user_id=user.id, limit=2,
+                before=pages[-1].next_before, before_id=pages[-1].next_before_id
+            ))
+        return pages
+
+    pages = _run(scenario)
+
+    history = [m.message for page in reversed(pages) for m in page.items]
+    assert len(pages) == 2
+    assert sorted(history) == [f"message {i}" for i in range(4)]
+    assert history[0] == "message 0"
+
+
+def test_awaiting_reply_queue_follows_message_inserts():
+    async def scenario(session):
+        user, _ = await _seed(session, [])
+        service = SupportTicketService(session)
+        first = await service.create_ticket(user.id, SupportTicketCreate(subject="First", message="Hello"))
+        second = await service.create_ticket(user.id, SupportTicketCreate(subject="Second", message="Hi"))
+        before = await service.get_awaiting_reply()
+
+        await service.add_message(
+            first.id, user.id, SenderType.ADMIN, SupportMessageCreate(message="On it"), is_admin=True
+        )
+        after_reply = await service.get_awaiting_reply()
+        await service.add_message(second.id, user.id, SenderType.USER, SupportMessageCreate(message="Any news?"))
+        listing = await service.get_user_tickets(user.id)
+        return before, after_reply, listing
+
+    before, after_reply, listing = _run(scenario)
+
+    # Longest waiting first
+    assert [t.subject for t in before.items] == ["First", "Second"]
+    assert [t.subject for t in after_reply.items] == ["Second"] and after_reply.total == 1
+    by_subject = {t.subject: t for t in listing.items}
+    assert by_subject["First"].message_count == 2
+    assert by_subject["First"].last_sender_type == SenderType.ADMIN
+    assert by_subject["First"].status == "in_progress"
+    assert by_subject["Second"].message_count == 2
+    assert by_subject["Second"].last_sender_type == SenderType.USER
+
+
+def test_ticket_search_matches_subject_messages_and_email():
+    async def scenario(session):
+        user, _ = await _seed(session, [])
+        service = SupportTicketService(session)
+        withdrawal = await service.create_ticket(user.id, SupportTicketCreate(
+            subject="Withdrawal pending", message="My payout has not arrived"
+        ))
+        await service.create_ticket(user.id, SupportTicketCreate(
+            subject="Login problem", message="Cannot sign in"
+        ))
+        await service.add_message(
+            withdrawal.id, user.id, SenderType.USER, SupportMessageCreate(message="Still waiting on the payout")
+        )
+        return (
+            await service.search_tickets("payout"),
+            await service.search_tickets("login"),
+            await service.search_tickets("user@example"),
+            await service.search_tickets("refund"),
+        )
+
+    payout, login, email, nothing = _run(scenario)
+
+    assert [t.subject for t in payout.items] == ["Withdrawal pending"]
+    assert payout.items[0].message_count == 2
+    assert [t.subject for t in login.items] == ["Login problem"]
+    assert email.total == 2
+    assert nothing.total == 0 and nothing.items == []
+
+
+def test_search_follows_email_changes_and_ticket_deletes():
+    from sqlalchemy import delete
+
+    from app.repository.support_search_repo import SupportSearchRepository
+    from app.repository.user_repo import UserRepository
+    from app.schema.user import UserUpdate
+
+    async def scenario(session):
+        user, _ = await _seed(session, [])
+        service = SupportTicketService(session)
+        kept = await service.create_ticket(user.id, SupportTicketCreate(subject="Payout", message="Where is it"))
+        deleted = await service.create_ticket(user.id, SupportTicketCreate(subject="Login", message="Locked out"))
+
+        await UserRepository(User, session).update(db_obj=user, obj_in=UserUpdate(email="renamed@example.com"))
+        await SupportSearchRepository(session).delete_ticket_documents(deleted.id)
+        await session.exec(delete(SupportMessage).where(SupportMessage.ticket_id == deleted.id))
+        await session.exec(delete(SupportTicket).where(SupportTicket.id == deleted.id))
+        await session.commit()
+        return (
+            await service.search_tickets("user@example"),
+            await service.search_tickets("renamed@example"),
+            await service.search_tickets("locked"),
+            kept.id,
+        )
+
+    old_email, new_email, gone, kept_id = _run(scenario)
+
+    assert old_email.total == 0
+    assert [t.id for t in new_email.items] == [kept_id]
+    assert gone.total == 0
+
+
+def test_live_chat_broadcasts_messages_and_typing():
+    from fastapi import FastAPI, WebSocketDisconnect
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from app.api.v1.endpoints import support
+    from app.core import security
+    from app.models.admin import Admin
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await create_support_search_schema(conn)
+        async with session_factory() as session:
+            user, tickets = await _seed(session, [1])
+            admin = Admin(email="admin@example.com", name="Admin", password="x", Status=True, email_verified=True)
+            session.add(admin)
+            await session.commit()
+            return user.id, admin.id, tickets[0].id
+
+    user_id, admin_id, ticket_id = asyncio.run(setup())
+    app = FastAPI()
+    app.include_router(support.router, prefix="/support")
+    user_token = security.create_access_token(user_id)
+    admin_token = security.create_access_token(admin_id)
+
+    def denied(token=None, frame=None):
+        try:
+            with client.websocket_connect(f"/support/tickets/{ticket_id}/ws") as ws:
+                if frame is not None:
+                    ws.send_text(frame)
+                elif token is not None:
+                    ws.send_json({"type": "auth", "token": token})
+                ws.receive_json()
+            return None
+        except WebSocketDisconnect as e:
+            return e.code
+
+    with patch.object(support, "AsyncSessionLocal", session_factory), \
+            patch("app.db.session.AsyncSessionLocal", session_factory), \
+            patch.object(support.settings, "SUPPORT_WS_AUTH_TIMEOUT", 0.2):
+        # One portal (event loop) for every socket, as under a real server
+        with TestClient(app) as client:
+            with client.websocket_connect(f"/support/tickets/{ticket_id}/ws") as user_ws, \
+                    client.websocket_connect(f"/support/admin/tickets/{ticket_id}/ws") as admin_ws:
+                user_ws.send_json({"type": "auth", "token": user_token})
+                admin_ws.send_json({"type": "auth", "token": admin_token})
+                ready = [user_ws.receive_json(), admin_ws.receive_json()]
+
+                admin_ws.send_json({"type": "typing"})
+                typing = user_ws.receive_json()
+
+                admin_ws.send_text("{not json")
+                invalid = admin_ws.receive_json()
+
+                admin_ws.send_json({"type": "message", "message": "How can I help?"})
+                received = [user_ws.receive_json(), user_ws.receive_json()]
+
+            # The admin's token is not a user token for this ticket; no auth frame in time; no JSON
+            denied_codes = [denied(token=admin_token), denied(), denied(frame="not json")]
+
+    asyncio.run(engine.dispose())
+
+    assert ready == [{"type": "ready"}, {"type": "ready"}]
+    assert invalid == {"type": "error", "detail": "Invalid JSON"}
+    assert typing == {"type": "typing", "sender_type": "admin", "sender_id": str(admin_id)}
+    assert received[0]["type"] == "message"
+    assert received[0]["message"]["message"] == "How can I help?"
+    assert received[1] == {"type": "status", "status": "in_progress"}
+    assert denied_codes == [support.WS_ACCESS_DENIED] * 3
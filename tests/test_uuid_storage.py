@@ -0,0 +1,68 @@
+import asyncio
+import sys
+import os
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.types import normalize_uuid_storage
+from app.models import User, Wallet, WithdrawalRequest, WithdrawalStatus
+from app.repository.wallet_repo import WithdrawalRequestRepository
+
+
+def test_legacy_dashed_uuids_are_normalized_and_found_by_primary_key():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    withdrawal_id = uuid4()
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with session_factory() as session:
+            user = User(email="ref@example.com", name="Ref", password="x", Status=True, email_verified=True)
+            wallet = Wallet(user_id=user.id, available_balance=Decimal("0"), locked_balance=Decimal("0"),
+                            total_withdrawn=Decimal("0"))
+            session.add_all([user, wallet])
+            await session.commit()
+            # A row written by raw SQL with dashed, upper case keys
+            await session.exec(text(
+                "INSERT INTO withdrawal_request (id, wallet_id, amount, payment_method, status, created_at) "
+                "VALUES (:id, :wallet_id, 150, 'paypal', 'pending', CURRENT_TIMESTAMP)"
+            ), params={"id": str(withdrawal_id).upper(), "wallet_id": str(wallet.id)})
+            await session.commit()
+
+            repo = WithdrawalRequestRepository(session)
+            before = await repo.get(withdrawal_id)
+
+        async with engine.begin() as conn:
+            changed = await normalize_uuid_storage(conn)
+            again = await normalize_uuid_storage(conn)
+
+        async with session_factory() as session:
+            repo = WithdrawalRequestRepository(session)
+            found = await repo.get(withdrawal_id)
+            by_string = (await session.exec(
+                select(WithdrawalRequest).where(WithdrawalRequest.id == str(withdrawal_id))
+            )).first()
+            updated = await repo.update_status(withdrawal_id, WithdrawalStatus.rejected, rejection_reason="Invalid email")
+            joined = (await repo.get_all_with_filters(status="rejected"))[0]
+            return before, changed, again, found, by_string, updated, joined
+
+    before, changed, again, found, by_string, updated, joined = asyncio.run(scenario())
+    asyncio.run(engine.dispose())
+
+    assert before is None
+    assert changed == {"withdrawal_request.id": 1, "withdrawal_request.wallet_id": 1}
+    assert again == {}
+    assert found.id == withdrawal_id and by_string.id == withdrawal_id
+    assert (updated.status, updated.rejection_reason) == (WithdrawalStatus.rejected, "Invalid email")
+    assert updated.processed_at is not None
+    assert len(joined) == 1 and joined[0][1].email == "ref@example.com"
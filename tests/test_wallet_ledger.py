@@ -0,0 +1,93 @@
+import asyncio
+import sys
+import os
+from decimal import Decimal
+from uuid import uuid4
+
+from fastapi import BackgroundTasks
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import User, Wallet, LedgerEntryType, WithdrawalStatus, PaymentMethod
+from app.repository.wallet_repo import WalletRepository, WalletLedgerRepository
+from app.schema.wallet import WithdrawalCreate, PayPalDetails
+from app.service.wallet_ledger_verifier import WalletLedgerVerifier, backfill_opening_balances
+from app.service.wallet_service import WalletService
+
+
+def test_every_balance_movement_is_in_the_ledger_and_drift_is_reported():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with session_factory() as session:
+            user = User(email="ref@example.com", name="Ref", password="x", Status=True, email_verified=True)
+            # Balances from before the ledger existed
+            wallet = Wallet(user_id=user.id, available_balance=Decimal("50.00"), locked_balance=Decimal("20.00"),
+                            total_withdrawn=Decimal("0"))
+            session.add_all([user, wallet])
+            await session.commit()
+            backfilled = await backfill_opening_balances(session, batch_size=1)
+            assert await backfill_opening_balances(session) == 0
+
+            service = WalletService(session)
+            await service.wallet_repo.update_balances(
+                wallet.id, available_delta=Decimal("150.00"), entry_type=LedgerEntryType.credit
+            )
+            earning_id = uuid4()
+            await WalletRepository(session).move_locked_to_available([(earning_id, wallet.id, Decimal("20.00"))])
+            await session.commit()
+
+            paypal = WithdrawalCreate(amount=100, payment_method=PaymentMethod.paypal,
+                                      paypal_details=PayPalDetails(email="ref@example.com"))
+            paid = await service.request_withdrawal(user.id, paypal, BackgroundTasks())
+            rejected = await service.request_withdrawal(user.id, paypal, BackgroundTasks())
+            await service.update_withdrawal_status(paid.id, WithdrawalStatus.completed)
+            await service.update_withdrawal_status(rejected.id, WithdrawalStatus.rejected)
+            # Settled withdrawals stay as they are: no second payout or refund
+            assert (await service.update_withdrawal_status(rejected.id, WithdrawalStatus.completed)).status == WithdrawalStatus.rejected
+            assert (await service.update_withdrawal_status(paid.id, WithdrawalStatus.rejected)).status == WithdrawalStatus.completed
+            assert (await service.update_withdrawal_status(paid.id, WithdrawalStatus.completed)).status == WithdrawalStatus.completed
+
+            clean = await WalletLedgerVerifier(session, batch_size=1).verify()
+            entries = await WalletLedgerRepository(session).get_by_wallet_id(wallet.id)
+
+            # Someone edits the balance directly
+            await session.exec(update(Wallet).where(Wallet.id == wallet.id).values(available_balance=Decimal("1.00")))
+            await session.commit()
+            drifted = await WalletLedgerVerifier(session).verify()
+            repaired = await WalletLedgerVerifier(session, repair=True).verify()
+            after_repair = await WalletLedgerVerifier(session).verify()
+
+            wallet = (await session.exec(select(Wallet))).one()
+            await session.refresh(wallet)
+            return backfilled, clean, entries, drifted, repaired, after_repair, wallet, earning_id, paid.id, rejected.id
+
+    backfilled, clean, entries, drifted, repaired, after_repair, wallet, earning_id, paid_id, rejected_id = asyncio.run(scenario())
+    asyncio.run(engine.dispose())
+
+    assert backfilled == 1
+    assert (clean.checked, clean.drifts) == (1, [])
+    assert [(e.entry_type, e.reference_id) for e in entries] == [
+        (LedgerEntryType.opening_balance, None),
+        (LedgerEntryType.credit, None),
+        (LedgerEntryType.release, earning_id),
+        (LedgerEntryType.withdrawal_hold, paid_id),
+        (LedgerEntryType.withdrawal_hold, rejected_id),
+        (LedgerEntryType.payout, paid_id),
+        (LedgerEntryType.refund, rejected_id),
+    ]
+    assert len(drifted.drifts) == 1
+    assert (drifted.drifts[0].available_balance, drifted.drifts[0].ledger_available) == (Decimal("1.00"), Decimal("120.00"))
+    assert repaired.repaired == 1 and after_repair.drifts == []
+    assert (wallet.available_balance, wallet.locked_balance, wallet.total_withdrawn) == (
+        Decimal("120.00"), Decimal("0.00"), Decimal("100.00")
+    )
@@ -0,0 +1,76 @@
+import asyncio
+import sys
+import os
+from decimal import Decimal
+
+from fastapi import BackgroundTasks
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import User, Wallet, ReferralEarning, EarningStatus
+from app.repository.wallet_repo import WalletRepository
+from app.schema.user import UserCreate
+from app.service.user_service import UserService
+from app.service.wallet_service import WalletService
+
+
+def test_wallet_created_at_signup_and_balance_reads_never_write():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    statements = []
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with session_factory() as session:
+            user = await UserService(session).create_user(
+                UserCreate(email="ref@example.com", name="Ref", password="secret"), BackgroundTasks()
+            )
+            wallet = (await session.exec(select(Wallet).where(Wallet.user_id == user.id))).one()
+            for status in (EarningStatus.locked, EarningStatus.locked, EarningStatus.available):
+                session.add(ReferralEarning(
+                    wallet_id=wallet.id, referrer_id=user.id, referred_user_id=user.id, pass_type="guaranteed_pass",
+                    amount=Decimal("5.00"), status=status,
+                ))
+            # An account from before wallets came with signup
+            legacy = User(email="old@example.com", name="Old", password="x", Status=True, email_verified=True)
+            session.add(legacy)
+            await session.commit()
+
+            event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+            summary = await WalletService(session).get_wallet_summary(user.id)
+            summary_statements = len(statements)
+            legacy_summary = await WalletService(session).get_wallet_summary(legacy.id)
+            before_balance = len(statements)
+            legacy_balance = await WalletService(session).get_wallet_balance(legacy.id)
+            balance_statements = statements[before_balance:]
+            legacy_wallets = (await session.exec(select(Wallet).where(Wallet.user_id == legacy.id))).all()
+
+            # Creating the missing wallet is an upsert, so racing callers both succeed
+            repo = WalletRepository(session)
+            await repo.ensure(legacy.id)
+            await repo.ensure(legacy.id)
+            await session.commit()
+            created = await repo.get_or_create(legacy.id)
+            return (summary, summary_statements, legacy_summary, legacy_balance, balance_statements, legacy_wallets,
+                    created, legacy.id)
+
+    (summary, summary_statements, legacy_summary, legacy_balance, balance_statements, legacy_wallets,
+     created, legacy_id) = asyncio.run(scenario())
+    asyncio.run(engine.dispose())
+
+    assert summary_statements == 1
+    assert (summary.total_referrals, summary.pending_earnings) == (3, 2)
+    assert summary.available_balance == 0.0 and summary.total_balance == 0.0
+    assert (legacy_summary.total_referrals, legacy_summary.total_balance) == (0, 0.0)
+    # GET /wallet for an account without a wallet: zeros from one SELECT, no row written
+    assert (legacy_balance.id, legacy_balance.available_balance, legacy_balance.total_withdrawn) == (None, 0.0, 0.0)
+    assert len(balance_statements) == 1 and balance_statements[0].lstrip().upper().startswith("SELECT")
+    assert legacy_wallets == []
+    assert created.user_id == legacy_id and created.available_balance == Decimal("0.00")
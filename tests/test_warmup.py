@@ -0,0 +1,71 @@
+import asyncio
+import subprocess
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Add the project root to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.service import mail, warmup
+from app.service.affiliate_settings_cache import affiliate_settings_cache
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_app_defers_mail_and_http_clients():
+    check = "import sys, app.main; print(sorted(m for m in ('httpx', 'jinja2', 'mailjet_rest') if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", check], cwd=PROJECT_ROOT, capture_output=True, text=True,
+        env=dict(os.environ, DB_ECHO="false"),
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_warm_up_fills_the_pool_and_caches():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/warmup.db", pool_size=3)
+        session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def run():
+            async with engine.begin() as conn:
+                await conn.run_sync(SQLModel.metadata.create_all)
+            affiliate_settings_cache.clear()
+            with patch("app.db.session.engine", engine), \
+                 patch("app.db.session.AsyncSessionLocal", session_factory), \
+                 patch.object(warmup.settings, "WARMUP_DB_CONNECTIONS", 10):
+                await warmup.warm_up()
+            idle = engine.pool.checkedin()
+            await engine.dispose()
+            return idle
+
+        mail.get_template_env.cache_clear()
+        idle = asyncio.run(run())
+        cached_templates = mail.get_template_env().cache
+
+    # Capped at the pool size, all returned idle
+    assert idle == 3
+    assert len(affiliate_settings_cache._cache) == 1
+    assert len(cached_templates) == len([n for n in os.listdir(mail.template_dir) if n.endswith(".html")])
+    affiliate_settings_cache.clear()
+
+
+def test_a_failing_step_does_not_stop_the_others():
+    mail.get_template_env.cache_clear()
+
+    async def broken(*args):
+        raise RuntimeError("database is down")
+
+    with patch.object(warmup, "warm_db_pool", broken), \
+         patch.object(warmup, "warm_affiliate_settings", broken), \
+         patch.object(warmup.logger, "warning") as warning:
+        asyncio.run(warmup.warm_up())
+
+    assert warning.call_count == 2
+    assert mail.get_template_env.cache_info().currsize == 1
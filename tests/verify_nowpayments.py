@@ -16,8 +16,8 @@ async def test_nowpayments_service():
     mock_response.status_code = 200
     mock_response.raise_for_status.return_value = None
 
-    # Patch httpx.AsyncClient.post
-    with patch("httpx.AsyncClient.post", new_callable=MagicMock) as mock_post:
+    # Patch httpx.AsyncClient.request
+    with patch("httpx.AsyncClient.request", new_callable=MagicMock) as mock_post:
         # Make the mock awaitable (return the response when awaited)
         async def async_return(*args, **kwargs):
             return mock_response